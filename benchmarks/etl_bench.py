@@ -0,0 +1,226 @@
+"""Offline end-to-end ETL benchmark against simulated upstream APIs.
+
+Runs run_pipeline against FakeAPIs (httpx.MockTransport) over synthetic
+corpora and reports wall time, requests issued, peak RSS, and the per-step
+and per-client figures from the run's run_report.json. Each corpus size runs
+in a fresh process so peak RSS is per size.
+
+Usage:
+    uv run python -m benchmarks.etl_bench --sizes 1k
+    uv run python -m benchmarks.etl_bench --sizes 1k,50k,500k --rate-limit 1000 --latency-ms 5
+    uv run python -m benchmarks.etl_bench --sizes 1k --compare benchmarks/results/<previous>.json
+
+Production client rate limits apply unless --rate-limit is given, so large
+sizes at default rates take as long as the real pipeline would.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import multiprocessing
+import resource
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def _count_lines(path: Path) -> int:
+    with open(path) as f:
+        return sum(1 for _ in f)
+
+
+def _run_size(size: str, options: dict) -> dict:
+    from benchmarks.fake_apis import FakeAPIs, fake_transport
+    from benchmarks.synthetic import SyntheticCorpus, parse_size
+    from icc_eval_etl.models.config import CollectionConfig
+    from icc_eval_etl.pipeline.orchestrator import run_pipeline
+    from icc_eval_etl.pipeline.sharding import run_sharded
+    from icc_eval_etl.pipeline.telemetry import REPORT_FILENAME
+
+    logging.basicConfig(
+        level=logging.DEBUG if options["verbose"] else logging.WARNING,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    corpus = SyntheticCorpus(parse_size(size), seed=options["seed"])
+    apis = FakeAPIs(
+        corpus,
+        latency=options["latency_ms"] / 1000.0,
+        rate_limits=options["server_rate_limits"],
+    )
+    config = CollectionConfig.model_validate(corpus.collection_config())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        start = time.perf_counter()
+        if options["shards"] > 1:
+            transport_factory = functools.partial(
+                fake_transport, parse_size(size), options["seed"],
+                options["latency_ms"] / 1000.0, options["server_rate_limits"],
+            )
+            report = run_sharded(
+                [config],
+                output_dir,
+                shards=options["shards"],
+                workers=options["workers"] or options["shards"],
+                transport_factory=transport_factory,
+                log_level=logging.DEBUG if options["verbose"] else logging.WARNING,
+                citation_depth=options["citation_depth"],
+                rate_limit=options["rate_limit"],
+            )
+        else:
+            asyncio.run(
+                run_pipeline(
+                    config,
+                    output_dir,
+                    citation_depth=options["citation_depth"],
+                    transport=apis.transport,
+                    rate_limit=options["rate_limit"],
+                )
+            )
+            report = json.loads((output_dir / REPORT_FILENAME).read_text())
+        wall = time.perf_counter() - start
+        records = sum(_count_lines(p) for p in output_dir.glob("*.jsonl"))
+
+    if options["shards"] > 1:
+        # FakeAPIs live in the shard processes; take traffic from the merged report.
+        traffic = {
+            "requests": {name: c["requests"] for name, c in report["clients"].items()},
+            "statuses": {},
+            "bytes": {name: c["bytes_downloaded"] for name, c in report["clients"].items()},
+        }
+        steps = []
+    else:
+        traffic = apis.summary()
+        steps = [
+            {k: step[k] for k in ("index", "name", "seconds", "records_written", "records_per_sec")}
+            for step in report["steps"]
+        ]
+
+    return {
+        "size": size,
+        "n_pmids": corpus.n_grant + corpus.n_citing,
+        "wall_seconds": round(wall, 3),
+        "records_written": records,
+        "records_per_sec": round(records / wall, 1) if wall else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        **traffic,
+        "total_requests": sum(traffic["requests"].values()),
+        "steps": steps,
+        "clients": report["clients"],
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _print_run(run: dict) -> None:
+    print(
+        f"\n== {run['size']} ({run['n_pmids']:,} PMIDs): {run['wall_seconds']:.2f}s wall, "
+        f"{run['total_requests']:,} requests, {run['records_written']:,} records "
+        f"({run['records_per_sec']}/s), peak RSS {run['peak_rss_mb']} MB"
+    )
+    for host, n in sorted(run["requests"].items()):
+        print(f"   {host:<24} {n:>8,} requests {run['bytes'].get(host, 0) / 1e6:>10.1f} MB")
+    print(f"   {'client':<20} {'requests':>9} {'retries':>8} {'429s':>6} {'errors':>7} {'seconds':>9}")
+    for name, c in run["clients"].items():
+        print(
+            f"   {name:<20} {c['requests']:>9,} {c['retries']:>8,} {c['rate_limited']:>6,} "
+            f"{c['errors']:>7,} {c['request_seconds']:>9.2f}"
+        )
+    print(f"   {'step':<22} {'seconds':>10} {'records':>10} {'records/s':>12}")
+    for step in run["steps"]:
+        label = f"{step['index']} {step['name']}"
+        print(
+            f"   {label:<22} {step['seconds']:>10.3f} {step['records_written']:>10,} "
+            f"{step['records_per_sec'] or 0:>12,.1f}"
+        )
+
+
+def _print_comparison(current: dict, previous: dict) -> None:
+    prev_runs = {r["size"]: r for r in previous["runs"]}
+    print(f"\n== Compared with {previous['git_commit']} ({previous['timestamp']})")
+    print(f"   {'size':<6} {'metric':<16} {'before':>12} {'after':>12} {'change':>9}")
+    for run in current["runs"]:
+        before = prev_runs.get(run["size"])
+        if before is None:
+            continue
+        for metric in ("wall_seconds", "total_requests", "peak_rss_mb", "records_per_sec"):
+            a, b = before.get(metric), run.get(metric)
+            if not a or b is None:
+                continue
+            print(f"   {run['size']:<6} {metric:<16} {a:>12,} {b:>12,} {(b - a) / a:>+9.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline ETL benchmark against simulated APIs")
+    parser.add_argument("--sizes", default="1k", help="Comma-separated corpus sizes in PMIDs (default: 1k)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated per-request latency")
+    parser.add_argument(
+        "--rate-limit", type=float, default=None,
+        help="Override client rate limits (requests/sec); default uses production rates",
+    )
+    parser.add_argument(
+        "--server-rate-limit", type=float, default=None,
+        help="Requests/sec each fake host accepts before answering 429 (default: unlimited)",
+    )
+    parser.add_argument("--citation-depth", type=int, default=1, help="Citation hops to crawl")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--shards", type=int, default=1, help="Run through run_sharded with N shards")
+    parser.add_argument("--workers", type=int, default=None, help="Shard processes (default: --shards)")
+    parser.add_argument("--results-dir", type=Path, default=RESULTS_DIR, help="Where to save results JSON")
+    parser.add_argument("--compare", type=Path, help="Previous results JSON to compare against")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Debug logging")
+    args = parser.parse_args()
+
+    from benchmarks.fake_apis import HOSTS
+
+    options = {
+        "latency_ms": args.latency_ms,
+        "rate_limit": args.rate_limit,
+        "server_rate_limits": {h: args.server_rate_limit for h in HOSTS} if args.server_rate_limit else None,
+        "citation_depth": args.citation_depth,
+        "seed": args.seed,
+        "shards": args.shards,
+        "workers": args.workers,
+        "verbose": args.verbose,
+    }
+    results = {
+        "benchmark": "etl",
+        "git_commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "options": options,
+        "runs": [],
+    }
+    ctx = multiprocessing.get_context("spawn")
+    for size in args.sizes.split(","):
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            run = pool.submit(_run_size, size.strip(), options).result()
+        results["runs"].append(run)
+        _print_run(run)
+
+    args.results_dir.mkdir(parents=True, exist_ok=True)
+    stamp = results["timestamp"].replace(":", "").replace("-", "")
+    path = args.results_dir / f"etl-{stamp}-{results['git_commit']}.json"
+    path.write_text(json.dumps(results, indent=2))
+    print(f"\nResults saved to {path}")
+
+    if args.compare:
+        _print_comparison(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""In-process stand-ins for the upstream APIs, served through httpx.MockTransport.
+
+Each fake mimics the behaviour the clients depend on (see
+agent_docs/api-quirks.md): NIH Reporter offset pagination and offset caps,
+iCite's batch limit and 414 on long URLs, OpenAlex's 100-value filter limit
+and cursor pagination, GitHub's page cap, and per-host rate limits that
+answer 429 when exceeded. Latency is simulated with asyncio.sleep.
+"""
+
+import asyncio
+import json
+import re
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.synthetic import SyntheticCorpus
+
+NIH_HOST = "api.reporter.nih.gov"
+EUROPEPMC_HOST = "www.ebi.ac.uk"
+ICITE_HOST = "icite.od.nih.gov"
+OPENALEX_HOST = "api.openalex.org"
+GITHUB_HOST = "api.github.com"
+HOSTS = (NIH_HOST, EUROPEPMC_HOST, ICITE_HOST, OPENALEX_HOST, GITHUB_HOST)
+
+MAX_URL_LENGTH = 8000
+ICITE_MAX_PMIDS = 1000
+OPENALEX_MAX_FILTER_VALUES = 100
+OPENALEX_MAX_PER_PAGE = 200
+GITHUB_MAX_RESULTS = 1000
+NIH_PROJECTS_MAX_OFFSET = 14999
+NIH_PUBLICATIONS_MAX_OFFSET = 9999
+
+_EPMC_PATH = re.compile(r"^/europepmc/webservices/rest/article/MED/(\d+)$")
+
+
+class _TokenBucket:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+def _json(status: int, payload, headers: dict | None = None) -> httpx.Response:
+    return httpx.Response(status, content=json.dumps(payload).encode(), headers={
+        "Content-Type": "application/json", **(headers or {}),
+    })
+
+
+class FakeAPIs:
+    """Routes requests for all five upstream hosts to corpus-backed handlers.
+
+    ``latency`` is seconds per request (one value, or per host);
+    ``rate_limits`` is requests/sec enforced per host (omit for unlimited).
+    """
+
+    def __init__(
+        self,
+        corpus: SyntheticCorpus,
+        latency: float | dict[str, float] = 0.0,
+        rate_limits: dict[str, float] | None = None,
+    ):
+        self.corpus = corpus
+        self._latency = latency if isinstance(latency, dict) else {h: latency for h in HOSTS}
+        self._buckets = {h: _TokenBucket(r) for h, r in (rate_limits or {}).items()}
+        self.requests: Counter[str] = Counter()
+        self.statuses: Counter[tuple[str, int]] = Counter()
+        self.bytes_sent: Counter[str] = Counter()
+        self._handlers = {
+            NIH_HOST: self._nih,
+            EUROPEPMC_HOST: self._europepmc,
+            ICITE_HOST: self._icite,
+            OPENALEX_HOST: self._openalex,
+            GITHUB_HOST: self._github,
+        }
+
+    @property
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.requests[host] += 1
+        delay = self._latency.get(host, 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        bucket = self._buckets.get(host)
+        if bucket is not None and not bucket.take():
+            response = _json(429, {"error": "rate limited"}, {"Retry-After": "1"})
+        elif len(str(request.url)) > MAX_URL_LENGTH:
+            response = httpx.Response(414, text="URI Too Long")
+        elif host in self._handlers:
+            response = self._handlers[host](request)
+        else:
+            response = httpx.Response(404, text=f"unknown host {host}")
+        self.statuses[(host, response.status_code)] += 1
+        self.bytes_sent[host] += len(response.content)
+        return response
+
+    def summary(self) -> dict:
+        return {
+            "requests": dict(self.requests),
+            "statuses": {f"{h} {s}": n for (h, s), n in sorted(self.statuses.items())},
+            "bytes": dict(self.bytes_sent),
+        }
+
+    # -- NIH Reporter -----------------------------------------------------
+
+    def _nih(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        criteria = body.get("criteria", {})
+        offset, limit = body.get("offset", 0), body.get("limit", 500)
+        if request.url.path == "/v2/projects/search":
+            # project_nums is honoured; core_project_nums is silently ignored
+            # by the real API, which then returns everything.
+            nums = criteria.get("project_nums") or self.corpus.core_project_nums
+            max_offset = NIH_PROJECTS_MAX_OFFSET
+            indices = [i for n in nums if (i := self.corpus.core_index(n)) is not None]
+            results = [r for i in indices for r in self.corpus.project_records(i)]
+        elif request.url.path == "/v2/publications/search":
+            nums = criteria.get("core_project_nums", [])
+            max_offset = NIH_PUBLICATIONS_MAX_OFFSET
+            indices = [i for n in nums if (i := self.corpus.core_index(n)) is not None]
+            results = [r for i in indices for r in self.corpus.publication_links(i)]
+        else:
+            return httpx.Response(404)
+        if offset > max_offset:
+            return _json(400, {"error": f"offset must be <= {max_offset}"})
+        return _json(200, {
+            "meta": {"total": len(results), "offset": offset, "limit": limit},
+            "results": results[offset : offset + limit],
+        })
+
+    # -- Europe PMC -------------------------------------------------------
+
+    def _europepmc(self, request: httpx.Request) -> httpx.Response:
+        match = _EPMC_PATH.match(request.url.path)
+        if not match:
+            return httpx.Response(404)
+        pmid = int(match.group(1))
+        if not self.corpus.is_known(pmid) or self.corpus.is_missing(pmid, "europepmc"):
+            return _json(200, {"hitCount": 0})
+        return _json(200, {"hitCount": 1, "result": self.corpus.europepmc_record(pmid)})
+
+    # -- iCite ------------------------------------------------------------
+
+    def _icite(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/api/pubs":
+            return httpx.Response(404)
+        pmids = [int(p) for p in request.url.params.get("pmids", "").split(",") if p]
+        if len(pmids) > ICITE_MAX_PMIDS:
+            return _json(400, {"error": f"at most {ICITE_MAX_PMIDS} pmids"})
+        data = [self.corpus.icite_record(p) for p in pmids if self.corpus.is_known(p)]
+        return _json(200, {"meta": {"pmids": len(pmids)}, "data": data})
+
+    # -- OpenAlex ---------------------------------------------------------
+
+    def _openalex(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/works":
+            return httpx.Response(404)
+        params = request.url.params
+        flt = params.get("filter", "")
+        if not flt.startswith("ids.pmid:"):
+            return _json(400, {"error": "unsupported filter"})
+        values = flt.removeprefix("ids.pmid:").split("|")
+        if len(values) > OPENALEX_MAX_FILTER_VALUES:
+            return _json(400, {"error": f"at most {OPENALEX_MAX_FILTER_VALUES} filter values"})
+        per_page = int(params.get("per_page", 25))
+        if per_page > OPENALEX_MAX_PER_PAGE:
+            return _json(400, {"error": f"per_page must be <= {OPENALEX_MAX_PER_PAGE}"})
+        works = [
+            self.corpus.openalex_work(p)
+            for p in sorted(int(v) for v in values)
+            if self.corpus.is_known(p) and not self.corpus.is_missing(p, "openalex")
+        ]
+        cursor = params.get("cursor")
+        start = 0 if cursor in (None, "*") else int(cursor)
+        page = works[start : start + per_page]
+        # Like the real API, a cursor is returned with every non-empty page;
+        # the page after the last one comes back empty with no cursor.
+        next_cursor = str(start + per_page) if page else None
+        return _json(200, {
+            "meta": {"count": len(works), "per_page": per_page, "next_cursor": next_cursor},
+            "results": page,
+        })
+
+    # -- GitHub -----------------------------------------------------------
+
+    def _github(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/search/repositories":
+            return httpx.Response(404)
+        params = request.url.params
+        topic = params.get("q", "").removeprefix("topic:")
+        per_page = int(params.get("per_page", 30))
+        page = int(params.get("page", 1))
+        if page * per_page > GITHUB_MAX_RESULTS:
+            return _json(422, {"message": "Only the first 1000 search results are available"})
+        index = self.corpus.core_index(topic)
+        repos = self.corpus.github_repos(index) if index is not None else []
+        start = (page - 1) * per_page
+        return _json(200, {
+            "total_count": len(repos),
+            "incomplete_results": False,
+            "items": repos[start : start + per_page],
+        })
+
+
+def fake_transport(
+    n_pmids: int, seed: int = 0, latency: float = 0.0, rate_limits: dict[str, float] | None = None,
+) -> httpx.MockTransport:
+    """A transport over a fresh corpus; picklable via functools.partial for shard processes."""
+    return FakeAPIs(SyntheticCorpus(n_pmids, seed=seed), latency=latency, rate_limits=rate_limits).transport
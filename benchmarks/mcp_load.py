@@ -0,0 +1,243 @@
+"""Load test for the MCP query server.
+
+Builds a synthetic icc-eval.duckdb with the real view definitions and
+materialize step (or uses --db), starts database_mcp_server.server locally,
+and drives its streamable-HTTP tools from concurrent client sessions with a
+mix of realistic queries (the example queries from the query_sql tool
+description, describe_table, list_tables, and the search tools).
+
+Usage:
+    uv run python -m benchmarks.mcp_load
+    uv run python -m benchmarks.mcp_load --size 500k --clients 16 --duration 60
+    uv run python -m benchmarks.mcp_load --db output/icc-eval.duckdb --compare benchmarks/results/<previous>.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from mcp.client.session import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+from benchmarks.etl_bench import RESULTS_DIR, _git_commit
+from benchmarks.synthetic import SyntheticCorpus, parse_size, write_jsonl_outputs
+from database_mcp_server.materialize import VIEWS_SQL, VIEW_NAMES, materialize
+from database_mcp_server.server import EXAMPLE_QUERIES
+from database_mcp_server.warmup import split_queries
+
+SEARCH_TERMS = ["single cell", "cancer immune", "genome sequencing", "data coordination", "microbiome"]
+
+
+def example_queries() -> list[str]:
+    return split_queries(EXAMPLE_QUERIES)
+
+
+def build_workload(weights: dict[str, float]) -> list[tuple[float, str, dict]]:
+    """(weight, tool, arguments) entries; weights are split evenly within a tool."""
+    calls: dict[str, list[dict]] = {
+        "query_sql": [{"sql": q, "limit": 100} for q in example_queries()],
+        "describe_table": [{"table_name": t} for t in VIEW_NAMES],
+        "list_tables": [{}],
+        "search_publications": [{"query": q, "k": 10} for q in SEARCH_TERMS],
+        "search_projects": [{"query": q, "k": 10} for q in SEARCH_TERMS],
+    }
+    workload = []
+    for tool, weight in weights.items():
+        for arguments in calls[tool]:
+            workload.append((weight / len(calls[tool]), tool, arguments))
+    return workload
+
+
+def build_database(size: str, seed: int, workdir: Path) -> Path:
+    """Materialize a synthetic corpus with the real views into workdir/output."""
+    write_jsonl_outputs(SyntheticCorpus(parse_size(size), seed=seed), workdir / "output")
+    db_path = workdir / "output" / "icc-eval.duckdb"
+    # The view definitions read output/*.jsonl relative to the working directory.
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        materialize(db_path, VIEWS_SQL)
+    finally:
+        os.chdir(cwd)
+    return db_path
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_ready(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{base_url}/ready")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"Server at {base_url} did not become ready")
+
+
+def _is_error(result) -> bool:
+    if result.isError:
+        return True
+    text = result.content[0].text if result.content else ""
+    return text.startswith('{"error"')
+
+
+async def _client(url: str, workload: list, deadline: float, samples: list, seed: int) -> None:
+    rng = random.Random(seed)
+    weights = [w for w, _, _ in workload]
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            while time.monotonic() < deadline:
+                _, tool, arguments = rng.choices(workload, weights)[0]
+                start = time.perf_counter()
+                try:
+                    error = _is_error(await session.call_tool(tool, arguments))
+                except Exception:
+                    error = True
+                samples.append((tool, time.perf_counter() - start, error))
+
+
+def _summarize(latencies: list[float], errors: int, duration: float) -> dict:
+    latencies = sorted(latencies)
+    if len(latencies) >= 2:
+        q = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = q[49], q[94], q[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    n = len(latencies)
+    return {
+        "calls": n,
+        "throughput_per_sec": round(n / duration, 1),
+        "p50_ms": round(p50 * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+        "p99_ms": round(p99 * 1000, 2),
+        "error_rate": round(errors / n, 4) if n else 0.0,
+    }
+
+
+async def run_load(url: str, workload: list, clients: int, duration: float, warmup: float) -> dict:
+    if warmup:
+        await asyncio.gather(*(
+            _client(url, workload, time.monotonic() + warmup, [], seed=-i) for i in range(clients)
+        ))
+    samples: list[tuple[str, float, bool]] = []
+    start = time.monotonic()
+    await asyncio.gather(*(
+        _client(url, workload, start + duration, samples, seed=i) for i in range(clients)
+    ))
+    elapsed = time.monotonic() - start
+
+    by_tool: dict[str, tuple[list[float], int]] = {}
+    for tool, latency, error in samples:
+        lat, errs = by_tool.setdefault(tool, ([], 0))
+        lat.append(latency)
+        by_tool[tool] = (lat, errs + error)
+    return {
+        "overall": _summarize([s[1] for s in samples], sum(s[2] for s in samples), elapsed),
+        "tools": {t: _summarize(lat, errs, elapsed) for t, (lat, errs) in sorted(by_tool.items())},
+    }
+
+
+def _print_report(report: dict) -> None:
+    print(f"\n   {'tool':<22} {'calls':>8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for name, row in [("ALL", report["overall"]), *report["tools"].items()]:
+        print(
+            f"   {name:<22} {row['calls']:>8,} {row['throughput_per_sec']:>8} {row['p50_ms']:>9} "
+            f"{row['p95_ms']:>9} {row['p99_ms']:>9} {row['error_rate']:>8.2%}"
+        )
+
+
+def _print_comparison(current: dict, previous: dict) -> None:
+    print(f"\n== Compared with {previous['git_commit']} ({previous['timestamp']})")
+    for metric in ("throughput_per_sec", "p50_ms", "p95_ms", "p99_ms", "error_rate"):
+        a, b = previous["report"]["overall"][metric], current["report"]["overall"][metric]
+        change = f"{(b - a) / a:+.1%}" if a else "n/a"
+        print(f"   {metric:<20} {a:>10} -> {b:<10} {change}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the ICC evaluation MCP server")
+    parser.add_argument("--db", type=Path, help="Existing DuckDB file (default: build a synthetic one)")
+    parser.add_argument("--size", default="50k", help="Synthetic corpus size in PMIDs (default: 50k)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus and workload seed")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent client sessions (default: 8)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds (default: 30)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured warm-up seconds (default: 5)")
+    parser.add_argument(
+        "--mix", default="query_sql=0.6,describe_table=0.15,list_tables=0.05,search_publications=0.1,search_projects=0.1",
+        help="Tool weights as tool=weight,... ",
+    )
+    parser.add_argument("--results-dir", type=Path, default=RESULTS_DIR, help="Where to save results JSON")
+    parser.add_argument("--compare", type=Path, help="Previous results JSON to compare against")
+    parser.add_argument("--server-log", type=Path, help="Write server stdout/stderr here")
+    args = parser.parse_args()
+
+    weights = {k: float(v) for k, v in (item.split("=") for item in args.mix.split(","))}
+    workload = build_workload(weights)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or build_database(args.size, args.seed, Path(tmp))
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+        server = subprocess.Popen(
+            [sys.executable, "-m", "database_mcp_server.server", "--db", str(db_path),
+             "--host", "127.0.0.1", "--port", str(port)],
+            stdout=log, stderr=log,
+        )
+        try:
+            asyncio.run(_wait_ready(base_url))
+            print(f"Server ready on {base_url}; {args.clients} clients for {args.duration:.0f}s")
+            report = asyncio.run(run_load(f"{base_url}/mcp", workload, args.clients, args.duration, args.warmup))
+            metrics = httpx.get(f"{base_url}/metrics").text
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+            if args.server_log:
+                log.close()
+
+    results = {
+        "benchmark": "mcp_load",
+        "git_commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "options": {
+            "db": str(args.db) if args.db else None,
+            "size": None if args.db else args.size,
+            "clients": args.clients,
+            "duration": args.duration,
+            "mix": weights,
+        },
+        "report": report,
+        "server_metrics": metrics,
+    }
+    _print_report(report)
+    args.results_dir.mkdir(parents=True, exist_ok=True)
+    stamp = results["timestamp"].replace(":", "").replace("-", "")
+    path = args.results_dir / f"mcp-{stamp}-{results['git_commit']}.json"
+    path.write_text(json.dumps(results, indent=2))
+    print(f"\nResults saved to {path}")
+
+    if args.compare:
+        _print_comparison(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""Deterministic synthetic corpus shaped like the real upstream APIs.
+
+Every record is derived on demand from its PMID (or project index) with a
+seeded RNG, so a 500k-PMID corpus costs almost nothing to hold in memory
+and two runs at the same size and seed see identical data.
+"""
+
+import json
+import random
+from pathlib import Path
+
+GRANT_PMID_BASE = 10_000_000
+CITING_PMID_BASE = 20_000_000
+WORDS = (
+    "single cell atlas genome sequencing data coordination cancer immune response "
+    "microbiome neural circuit imaging protein structure metabolic pathway clinical "
+    "trial cohort variant expression network model disease risk kidney brain heart "
+    "tumor therapy resistance pipeline ontology interoperability cloud platform"
+).split()
+
+
+def parse_size(size: str) -> int:
+    """'1k' -> 1000, '500k' -> 500000, '2m' -> 2000000."""
+    size = size.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(size[-1], 1)
+    return int(float(size.rstrip("km")) * multiplier)
+
+
+class SyntheticCorpus:
+    """A grant portfolio with ``n_pmids`` distinct PMIDs (grant + citing).
+
+    ``grant_fraction`` of the PMIDs are linked to grants; the rest form the
+    citing pool. Grant publications receive on average
+    ``citations_per_pub`` citations from the pool, and pool papers cite each
+    other sparsely so multi-hop crawls have something to find.
+    """
+
+    def __init__(
+        self,
+        n_pmids: int,
+        grant_fraction: float = 0.1,
+        citations_per_pub: int = 9,
+        pubs_per_project: int = 10,
+        years_per_project: int = 4,
+        missing_fraction: float = 0.02,
+        seed: int = 0,
+    ):
+        self.seed = seed
+        self.n_grant = max(1, int(n_pmids * grant_fraction))
+        self.n_citing = max(1, n_pmids - self.n_grant)
+        self.citations_per_pub = citations_per_pub
+        self.years_per_project = years_per_project
+        self.missing_fraction = missing_fraction
+        self.n_projects = max(1, self.n_grant // pubs_per_project)
+        self.core_project_nums = [f"U54OD{i:06d}" for i in range(self.n_projects)]
+        self._core_index = {c: i for i, c in enumerate(self.core_project_nums)}
+
+    # -- identity ---------------------------------------------------------
+
+    def _rng(self, *key: int) -> random.Random:
+        return random.Random(hash((self.seed, *key)))
+
+    @property
+    def grant_pmids(self) -> range:
+        return range(GRANT_PMID_BASE, GRANT_PMID_BASE + self.n_grant)
+
+    @property
+    def citing_pmids(self) -> range:
+        return range(CITING_PMID_BASE, CITING_PMID_BASE + self.n_citing)
+
+    def is_known(self, pmid: int) -> bool:
+        return pmid in self.grant_pmids or pmid in self.citing_pmids
+
+    def is_missing(self, pmid: int, source: str) -> bool:
+        """Whether a source has no record for this PMID (coverage gaps)."""
+        return self._rng(pmid, len(source)).random() < self.missing_fraction
+
+    def core_index(self, core_project_num: str) -> int | None:
+        return self._core_index.get(core_project_num.upper())
+
+    def pmids_for_project(self, index: int) -> range:
+        return range(GRANT_PMID_BASE + index, GRANT_PMID_BASE + self.n_grant, self.n_projects)
+
+    def cited_by(self, pmid: int) -> list[int]:
+        rng = self._rng(pmid, 1)
+        if pmid in self.grant_pmids:
+            k = rng.randint(0, 2 * self.citations_per_pub)
+        else:
+            k = rng.randint(0, 3)
+        k = min(k, self.n_citing)
+        return sorted(CITING_PMID_BASE + j for j in rng.sample(range(self.n_citing), k))
+
+    def _text(self, rng: random.Random, n: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    # -- NIH Reporter -----------------------------------------------------
+
+    def project_records(self, index: int) -> list[dict]:
+        core = self.core_project_nums[index]
+        records = []
+        for y in range(self.years_per_project):
+            rng = self._rng(index, y, 2)
+            direct = rng.randint(100_000, 2_000_000)
+            indirect = direct // 2
+            year = 2020 + y
+            records.append({
+                "appl_id": 9_000_000 + index * self.years_per_project + y,
+                "project_num": f"5{core}-{y + 1:02d}",
+                "core_project_num": core,
+                "project_title": self._text(rng, 8).title(),
+                "fiscal_year": year,
+                "award_amount": direct + indirect,
+                "direct_cost_amt": direct,
+                "indirect_cost_amt": indirect,
+                "activity_code": core[:3],
+                "funding_mechanism": "Research Centers",
+                "agency_code": "NIH",
+                "is_active": y == self.years_per_project - 1,
+                "is_new": y == 0,
+                "contact_pi_name": f"PI, SYNTHETIC {index}",
+                "organization": {
+                    "org_name": f"UNIVERSITY {index % 50}",
+                    "org_city": "BALTIMORE",
+                    "org_state": "MD",
+                    "org_country": "UNITED STATES",
+                },
+                "project_start_date": "2020-01-01T00:00:00",
+                "project_end_date": "2025-12-31T00:00:00",
+                "budget_start": f"{year}-01-01T00:00:00",
+                "budget_end": f"{year}-12-31T00:00:00",
+                "award_notice_date": f"{year - 1}-12-15T00:00:00",
+                "pref_terms": ";".join(rng.sample(WORDS, 5)),
+                "abstract_text": self._text(rng, 120),
+            })
+        return records
+
+    def publication_links(self, index: int) -> list[dict]:
+        core = self.core_project_nums[index]
+        appl_id = 9_000_000 + index * self.years_per_project
+        return [{"coreproject": core, "pmid": pmid, "applid": appl_id} for pmid in self.pmids_for_project(index)]
+
+    # -- Europe PMC / iCite / OpenAlex -------------------------------------
+
+    def europepmc_record(self, pmid: int) -> dict:
+        rng = self._rng(pmid, 3)
+        year = rng.randint(2015, 2025)
+        return {
+            "id": str(pmid),
+            "source": "MED",
+            "pmid": str(pmid),
+            "pmcid": f"PMC{pmid}" if rng.random() < 0.6 else None,
+            "doi": f"10.5555/synthetic.{pmid}",
+            "title": self._text(rng, 10).capitalize(),
+            "authorString": ", ".join(f"Author{rng.randint(1, 999)} X" for _ in range(rng.randint(1, 8))),
+            "pubYear": str(year),
+            "abstractText": self._text(rng, 200),
+            "citedByCount": len(self.cited_by(pmid)),
+            "isOpenAccess": "Y" if rng.random() < 0.6 else "N",
+            "language": "eng",
+            "pubModel": "Print-Electronic",
+            "journalInfo": {"journal": {"title": f"Journal of {rng.choice(WORDS).title()}", "isoAbbreviation": "J Synth"}},
+            "firstPublicationDate": f"{year}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+        }
+
+    def icite_record(self, pmid: int) -> dict:
+        rng = self._rng(pmid, 4)
+        cited_by = self.cited_by(pmid)
+        year = rng.randint(2015, 2025)
+        return {
+            "pmid": pmid,
+            "title": self._text(rng, 10).capitalize(),
+            "doi": f"10.5555/synthetic.{pmid}",
+            "year": year,
+            "journal": f"J {rng.choice(WORDS).title()}",
+            "citation_count": len(cited_by),
+            "citations_per_year": round(len(cited_by) / max(1, 2026 - year), 3),
+            "relative_citation_ratio": round(rng.lognormvariate(0, 0.8), 2),
+            "expected_citations_per_year": round(rng.uniform(0.5, 5), 2),
+            "field_citation_rate": round(rng.uniform(1, 8), 2),
+            "nih_percentile": round(rng.uniform(0, 100), 1),
+            "is_research_article": rng.random() < 0.9,
+            "is_clinical": rng.random() < 0.1,
+            "provisional": False,
+            "cited_by": cited_by,
+            "references": sorted(rng.randint(1, 9_999_999) for _ in range(rng.randint(5, 40))),
+        }
+
+    def openalex_work(self, pmid: int) -> dict:
+        rng = self._rng(pmid, 5)
+        year = rng.randint(2015, 2025)
+        title = self._text(rng, 10).capitalize()
+        topic = rng.choice(WORDS).title()
+        return {
+            "id": f"https://openalex.org/W{pmid}",
+            "doi": f"https://doi.org/10.5555/synthetic.{pmid}",
+            "title": title,
+            "display_name": title,
+            "publication_year": year,
+            "publication_date": f"{year}-06-01",
+            "ids": {"openalex": f"https://openalex.org/W{pmid}", "pmid": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}"},
+            "type": "article",
+            "language": "en",
+            "primary_location": {"source": {"display_name": f"Journal of {topic}"}},
+            "open_access": {"is_oa": rng.random() < 0.6, "oa_status": rng.choice(["gold", "green", "hybrid", "closed"])},
+            "authorships": [{"author": {"display_name": f"Author {i}"}} for i in range(rng.randint(1, 8))],
+            "cited_by_count": len(self.cited_by(pmid)),
+            "fwci": round(rng.lognormvariate(0, 0.8), 2),
+            "biblio": {"volume": str(rng.randint(1, 50)), "issue": str(rng.randint(1, 12)), "first_page": "1", "last_page": "10"},
+            "is_retracted": False,
+            "referenced_works_count": rng.randint(5, 80),
+            "primary_topic": {"display_name": topic, "subfield": {"display_name": "Biology"}},
+            "topics": [{"display_name": topic}],
+            "mesh": [],
+            "keywords": [],
+        }
+
+    # -- GitHub -----------------------------------------------------------
+
+    def github_repos(self, index: int) -> list[dict]:
+        core = self.core_project_nums[index]
+        rng = self._rng(index, 6)
+        repos = []
+        for r in range(rng.randint(0, 3)):
+            repo_id = 500_000 + index * 10 + r
+            name = f"{rng.choice(WORDS)}-{repo_id}"
+            repos.append({
+                "id": repo_id,
+                "name": name,
+                "full_name": f"synthetic-lab-{index}/{name}",
+                "html_url": f"https://github.com/synthetic-lab-{index}/{name}",
+                "description": self._text(rng, 8),
+                "topics": [core.lower(), rng.choice(WORDS)],
+                "language": rng.choice(["Python", "R", "JavaScript", None]),
+                "stargazers_count": rng.randint(0, 500),
+                "forks_count": rng.randint(0, 50),
+                "open_issues_count": rng.randint(0, 20),
+                "owner": {"login": f"synthetic-lab-{index}", "type": "Organization"},
+                "license": {"name": "MIT License"},
+                "created_at": "2021-01-01T00:00:00Z",
+                "updated_at": "2025-01-01T00:00:00Z",
+                "pushed_at": "2025-01-01T00:00:00Z",
+                "private": False,
+                "fork": False,
+                "archived": False,
+            })
+        return repos
+
+    def collection_config(self) -> dict:
+        return {"core_project_identifiers": {c.lower(): None for c in self.core_project_nums}}
+
+
+def write_jsonl_outputs(corpus: SyntheticCorpus, output_dir: Path) -> None:
+    """Write the nine pipeline output files for a corpus without going through the APIs.
+
+    Shapes match what run_pipeline writes (one hop of citations), so the
+    files can be materialized with the real view definitions.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    def dump(filename: str, records) -> None:
+        with open(output_dir / filename, "w") as f:
+            for rec in records:
+                f.write(json.dumps(rec) + "\n")
+
+    indices = range(corpus.n_projects)
+    grant = corpus.grant_pmids
+    dump("projects.jsonl", (r for i in indices for r in corpus.project_records(i)))
+    dump("publication_links.jsonl", (r for i in indices for r in corpus.publication_links(i)))
+    dump("publications.jsonl", (corpus.europepmc_record(p) for p in grant if not corpus.is_missing(p, "europepmc")))
+    dump("icite.jsonl", (corpus.icite_record(p) for p in grant))
+    dump(
+        "citation_links.jsonl",
+        ({"cited_pmid": p, "citing_pmid": c, "hop": 1} for p in grant for c in corpus.cited_by(p)),
+    )
+    citing = sorted({c for p in grant for c in corpus.cited_by(p)})
+    dump("citing_icite.jsonl", ({**corpus.icite_record(p), "hop": 1} for p in citing))
+    dump("openalex.jsonl", (corpus.openalex_work(p) for p in grant if not corpus.is_missing(p, "openalex")))
+    dump("citing_openalex.jsonl", (corpus.openalex_work(p) for p in citing if not corpus.is_missing(p, "openalex")))
+    repos = [r for i in indices for r in corpus.github_repos(i)]
+    for r in repos:
+        r["core_project_ids"] = [r["topics"][0].upper()]
+    dump("github_core.jsonl", repos)
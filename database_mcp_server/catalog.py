@@ -0,0 +1,109 @@
+"""Schema catalog: per-column statistics captured at materialize time.
+
+materialize.py writes the catalog into the ``_catalog`` table; the server
+loads it once at startup so ``list_tables``/``describe_table`` answer from
+memory and the ``query_sql`` tool description lists the real columns.
+"""
+
+import logging
+
+import duckdb
+
+from database_mcp_server.db import ReadOnlyDatabase
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TABLE = "_catalog"
+
+_CATALOG_DDL = f"""
+CREATE TABLE {CATALOG_TABLE} (
+    table_name VARCHAR,
+    ordinal INTEGER,
+    column_name VARCHAR,
+    column_type VARCHAR,
+    row_count BIGINT,
+    null_fraction DOUBLE,
+    min_value VARCHAR,
+    max_value VARCHAR,
+    approx_distinct BIGINT
+)
+"""
+
+
+def build_catalog(con: duckdb.DuckDBPyConnection, tables: list[str]) -> None:
+    """(Re)create the catalog table from SUMMARIZE output for each table."""
+    con.execute(f"DROP TABLE IF EXISTS {CATALOG_TABLE}")
+    con.execute(_CATALOG_DDL)
+    for table in tables:
+        con.execute(
+            f"""
+            INSERT INTO {CATALOG_TABLE}
+            SELECT
+                '{table}',
+                c.ordinal_position,
+                s.column_name,
+                s.column_type,
+                s.count,
+                s.null_percentage::DOUBLE / 100.0,
+                s.min,
+                s.max,
+                s.approx_unique
+            FROM (SUMMARIZE {table}) s
+            JOIN information_schema.columns c
+              ON c.table_name = '{table}' AND c.column_name = s.column_name
+            """
+        )
+    n = con.execute(f"SELECT count(*) FROM {CATALOG_TABLE}").fetchone()[0]
+    logger.info("Catalog: %d columns across %d tables", n, len(tables))
+
+
+class Catalog:
+    """In-memory view of the schema catalog."""
+
+    def __init__(self, columns: dict[str, list[dict]]):
+        self._columns = columns
+
+    @classmethod
+    def load(cls, db: ReadOnlyDatabase) -> "Catalog":
+        tables = db.get_table_names()
+        columns: dict[str, list[dict]] = {}
+        if CATALOG_TABLE in tables:
+            rows = db.execute_query(
+                f"SELECT * FROM {CATALOG_TABLE} ORDER BY table_name, ordinal", limit=10000,
+            )
+            for row in rows:
+                table = row.pop("table_name")
+                row.pop("ordinal")
+                columns.setdefault(table, []).append(row)
+        else:
+            # Databases materialized before the catalog existed: fall back to
+            # DESCRIBE once at startup (no statistics).
+            logger.warning(
+                "No %s table in database; re-run materialize for column statistics",
+                CATALOG_TABLE,
+            )
+            for table in tables:
+                rows = db.execute_query(f"DESCRIBE {table}", limit=10000)
+                columns[table] = [
+                    {"column_name": r["column_name"], "column_type": r["column_type"]}
+                    for r in rows
+                ]
+        return cls(columns)
+
+    def table_names(self) -> list[str]:
+        return sorted(self._columns)
+
+    def has_table(self, table_name: str) -> bool:
+        return table_name in self._columns
+
+    def columns(self, table_name: str) -> list[dict]:
+        return self._columns[table_name]
+
+    def column_names(self, table_name: str) -> list[str]:
+        return [c["column_name"] for c in self._columns[table_name]]
+
+    def row_count(self, table_name: str) -> int | None:
+        cols = self._columns.get(table_name)
+        if not cols:
+            return None
+        return cols[0].get("row_count")
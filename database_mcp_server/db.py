@@ -20,16 +20,57 @@ DEFAULT_DB_PATH = Path("output/icc-eval.duckdb")
 class ReadOnlyDatabase:
     """Read-only DuckDB connection with query validation."""
 
-    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH, in_memory: bool = False):
         if not db_path.exists():
             raise FileNotFoundError(
                 f"Database not found: {db_path}. "
                 "Run 'python -m database_mcp_server.materialize' first."
             )
         self._db_path = db_path
-        self._con = duckdb.connect(str(db_path), read_only=True)
+        self.in_memory = in_memory
+        if in_memory:
+            self._con = duckdb.connect(":memory:")
+        else:
+            self._con = duckdb.connect(str(db_path), read_only=True)
+        # Load the full-text search extension (used by the search tools)
+        # before external access is switched off.
+        try:
+            self._con.execute("LOAD fts")
+            self.has_fts = True
+        except duckdb.Error as exc:
+            logger.warning("fts extension unavailable (%s); search falls back to ILIKE", exc)
+            self.has_fts = False
+        if in_memory:
+            # Copy tables, views and the fts schemas into RAM so no query
+            # waits on disk reads; the file is only read once, here.
+            path = str(db_path).replace("'", "''")
+            self._con.execute(f"ATTACH '{path}' AS _disk (READ_ONLY)")
+            self._con.execute("COPY FROM DATABASE _disk TO memory")
+            self._con.execute("DETACH _disk")
         # Disable external file access (blocks read_csv, read_json, glob, httpfs, etc.)
         self._con.execute("SET enable_external_access = false")
+        # materialize skips the indexes when fts cannot be installed, so a
+        # loadable extension does not mean the database has them.
+        self.fts_schemas = frozenset(
+            row[0] for row in self._con.execute(
+                "SELECT schema_name FROM duckdb_schemas() "
+                "WHERE database_name = current_database() AND schema_name LIKE 'fts_main_%'"
+            ).fetchall()
+        )
+
+    def cursor(self) -> "ReadOnlyDatabase":
+        """A second connection to the same database, safe to use from another thread."""
+        other = object.__new__(ReadOnlyDatabase)
+        other._db_path = self._db_path
+        other.in_memory = self.in_memory
+        other.has_fts = self.has_fts
+        other.fts_schemas = self.fts_schemas
+        other._con = self._con.cursor()
+        return other
+
+    def has_fts_index(self, schema: str) -> bool:
+        """Whether BM25 search can use the index in ``schema`` (extension loaded and index built)."""
+        return self.has_fts and schema in self.fts_schemas
 
     def execute_query(self, sql: str, limit: int = 100) -> list[dict]:
         """Execute a read-only SQL query and return results as a list of dicts.
@@ -42,7 +83,7 @@ class ReadOnlyDatabase:
             List of dicts, one per row, with column names as keys.
 
         Raises:
-            ValueError: If the query is not a read-only statement.
+            ValueError: If the query is not a single read-only statement.
         """
         if not _ALLOWED_PREFIXES.match(sql):
             raise ValueError(
@@ -53,13 +94,39 @@ class ReadOnlyDatabase:
 
         # Wrap in a LIMIT if not already present to avoid runaway queries
         wrapped = f"SELECT * FROM ({sql}) AS _q LIMIT {limit}"
+        # The prefix alone can be closed off with ")" and followed by more
+        # statements, and the --in-memory copy is writable; run exactly the
+        # one SELECT the parser found.
+        statements = duckdb.extract_statements(wrapped)
+        if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+            raise ValueError("Only a single read-only query is allowed.")
 
         logger.debug("Executing query (limit=%d): %s", limit, sql[:200])
-        result = self._con.execute(wrapped)
+        result = self._con.execute(statements[0])
         columns = [desc[0] for desc in result.description]
         rows = result.fetchall()
         return [dict(zip(columns, row)) for row in rows]
 
+    def execute_trusted(self, sql: str, params: list | None = None) -> list[dict]:
+        """Execute a parameterised query built by the server itself.
+
+        Skips the read-only prefix check, so never pass user-supplied SQL here;
+        user input must only arrive through ``params``.
+        """
+        result = self._con.execute(sql, params or [])
+        columns = [desc[0] for desc in result.description]
+        return [dict(zip(columns, row)) for row in result.fetchall()]
+
+    def memory_usage_bytes(self) -> int:
+        """Bytes currently held by DuckDB's buffer manager (cached blocks and intermediates)."""
+        row = self._con.execute("SELECT sum(memory_usage_bytes) FROM duckdb_memory()").fetchone()
+        return int(row[0] or 0)
+
+    def thread_count(self) -> int:
+        """Size of DuckDB's worker thread pool."""
+        row = self._con.execute("SELECT current_setting('threads')").fetchone()
+        return int(row[0])
+
     def get_table_names(self) -> list[str]:
         """Return list of table names in the database."""
         result = self._con.execute("SHOW TABLES")
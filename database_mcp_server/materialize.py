@@ -2,18 +2,29 @@
 
 Reads icc-data-views.sql to create views over the JSONL output files,
 then materializes each view as a permanent table in output/icc-eval.duckdb.
+A _catalog table with per-column statistics and full-text search indexes
+over publication and project titles/abstracts are written alongside them.
+
+With --apply-changes, an existing database is brought up to date from the
+ETL's per-record changesets (output/changes/) instead of being rebuilt.
 
 Usage:
     uv run python -m database_mcp_server.materialize
     uv run python -m database_mcp_server.materialize --output output/icc-eval.duckdb
+    uv run python -m database_mcp_server.materialize --apply-changes
 """
 
 import argparse
+import json
 import logging
+import tempfile
 from pathlib import Path
 
 import duckdb
 
+from database_mcp_server.catalog import build_catalog
+from database_mcp_server.search import build_fts_indexes
+
 logger = logging.getLogger(__name__)
 
 VIEWS_SQL = Path(__file__).resolve().parent.parent / "icc-data-views.sql"
@@ -32,8 +43,51 @@ VIEW_NAMES = [
     "github_repos",
 ]
 
+CHANGES_DIR = Path("output/changes")
+# Snapshot id (from changes/manifest.json) the tables were built from.
+SNAPSHOT_TABLE = "_snapshot"
+# JSONL file behind each view, and the view columns its RECORD_KEYS
+# (icc_eval_etl/pipeline/writers.py) end up in, in the same order.
+VIEW_KEYS = {
+    "projects": ("projects.jsonl", ("appl_id",)),
+    "publication_links": ("publication_links.jsonl", ("core_project_num", "pmid", "appl_id")),
+    "publications": ("publications.jsonl", ("pmid",)),
+    "icite": ("icite.jsonl", ("pmid",)),
+    "citation_links": ("citation_links.jsonl", ("cited_pmid", "citing_pmid")),
+    "citing_icite": ("citing_icite.jsonl", ("pmid",)),
+    "openalex": ("openalex.jsonl", ("openalex_id",)),
+    "citing_openalex": ("citing_openalex.jsonl", ("openalex_id",)),
+    "github_repos": ("github_core.jsonl", ("repo_id",)),
+}
+# Scratch schema the view definitions are re-created in over the changed records.
+_CHANGES_SCHEMA = "_changes"
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _columns(columns: list[tuple[str, str]]) -> str:
+    """read_json ``columns`` struct literal."""
+    return "{" + ", ".join(f"{_quote(name)}: {_quote(type_)}" for name, type_ in columns) + "}"
+
+
+def _source(filename: str) -> str:
+    """How icc-data-views.sql reads an output file."""
+    return f"read_json_auto('output/{filename}')"
 
-def materialize(output_path: Path, views_sql: Path = VIEWS_SQL) -> None:
+
+def _read_manifest(changes_dir: Path) -> dict:
+    path = changes_dir / "manifest.json"
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def _write_snapshot(con: duckdb.DuckDBPyConnection, snapshot_id: str | None) -> None:
+    con.execute(f"CREATE OR REPLACE TABLE {SNAPSHOT_TABLE} (snapshot_id VARCHAR, updated_at TIMESTAMPTZ)")
+    con.execute(f"INSERT INTO {SNAPSHOT_TABLE} VALUES (?, now())", [snapshot_id])
+
+
+def materialize(output_path: Path, views_sql: Path = VIEWS_SQL, changes_dir: Path = CHANGES_DIR) -> None:
     """Create a DuckDB file with materialized tables from JSONL views."""
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -58,11 +112,118 @@ def materialize(output_path: Path, views_sql: Path = VIEWS_SQL) -> None:
             con.execute(f"DROP VIEW {view}")
             con.execute(f"ALTER TABLE {view}_tbl RENAME TO {view}")
 
+        _write_snapshot(con, _read_manifest(changes_dir).get("snapshot"))
+        build_catalog(con, VIEW_NAMES)
+        build_fts_indexes(con)
         logger.info("Materialized %d tables into %s", len(VIEW_NAMES), output_path)
     finally:
         con.close()
 
 
+def apply_changes(
+    output_path: Path, changes_dir: Path = CHANGES_DIR, views_sql: Path = VIEWS_SQL,
+) -> dict[str, dict[str, int]]:
+    """Upsert the ETL's changesets into an existing database; returns rows deleted/inserted per table.
+
+    Every key in a table's changeset is deleted, then the new rows are
+    inserted through the same view definitions a full materialize uses
+    (typed from the full JSONL, so they match a rebuild), all in one
+    transaction. The catalog and FTS indexes are rebuilt afterwards.
+    Raises ValueError unless the database is at the changesets' base
+    snapshot (or one a repair has since amended).
+    """
+    manifest = _read_manifest(changes_dir)
+    if not manifest:
+        raise ValueError(f"no changesets in {changes_dir}")
+    con = duckdb.connect(str(output_path))
+    try:
+        tables = {row[0] for row in con.execute("SHOW TABLES").fetchall()}
+        current = None
+        if SNAPSHOT_TABLE in tables:
+            current = con.execute(f"SELECT snapshot_id FROM {SNAPSHOT_TABLE}").fetchone()[0]
+        if current == manifest["snapshot"]:
+            logger.info("%s is already at snapshot %s", output_path, current)
+            return {}
+        if current is None or current not in (manifest["base"], *manifest["amends"]):
+            raise ValueError(
+                f"{output_path} is at snapshot {current}, the changesets in {changes_dir} start from "
+                f"{manifest['base']}; rebuild it with materialize"
+            )
+
+        sql = views_sql.read_text()
+        counts: dict[str, dict[str, int]] = {}
+        upserted = []
+        with tempfile.TemporaryDirectory() as tmp:
+            con.execute("BEGIN")
+            try:
+                for view, (filename, key_columns) in VIEW_KEYS.items():
+                    path = changes_dir / filename
+                    if not path.exists():
+                        continue
+                    keys_path, records_path = Path(tmp) / f"{view}_keys.jsonl", Path(tmp) / filename
+                    has_keys = has_records = False
+                    with open(path) as f, open(keys_path, "w") as keys_out, open(records_path, "w") as records_out:
+                        for line in f:
+                            change = json.loads(line)
+                            has_keys = True
+                            keys_out.write(json.dumps({f"k{i}": v for i, v in enumerate(change["key"])}) + "\n")
+                            if "record" in change:
+                                has_records = True
+                                records_out.write(json.dumps(change["record"]) + "\n")
+                    if not has_keys:
+                        continue
+
+                    types = dict(con.execute(
+                        "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = ?", [view],
+                    ).fetchall())
+                    key_types = _columns([(f"k{i}", types[c]) for i, c in enumerate(key_columns)])
+                    # IS NOT DISTINCT FROM: rows with incomplete keys are tracked as a group too.
+                    match = " AND ".join(f"{view}.{c} IS NOT DISTINCT FROM k.k{i}" for i, c in enumerate(key_columns))
+                    deleted = con.execute(
+                        f"DELETE FROM {view} USING read_json({_quote(str(keys_path))}, "
+                        f"format='newline_delimited', columns={key_types}) k WHERE {match}"
+                    ).fetchone()[0]
+                    counts[view] = {"deleted": deleted, "inserted": 0}
+                    if has_records:
+                        schema = con.execute(f"DESCRIBE SELECT * FROM {_source(filename)}").fetchall()
+                        sql = sql.replace(
+                            _source(filename),
+                            f"read_json({_quote(str(records_path))}, format='newline_delimited', "
+                            f"columns={_columns([(row[0], row[1]) for row in schema])})",
+                        )
+                        upserted.append(view)
+
+                if upserted:
+                    con.execute(f"CREATE SCHEMA {_CHANGES_SCHEMA}")
+                    con.execute(f"SET schema = '{_CHANGES_SCHEMA}'")
+                    try:
+                        con.execute(sql)
+                    finally:
+                        con.execute("SET schema = 'main'")
+                    for view in upserted:
+                        counts[view]["inserted"] = con.execute(
+                            f"INSERT INTO main.{view} SELECT * FROM {_CHANGES_SCHEMA}.{view}"
+                        ).fetchone()[0]
+                    con.execute(f"DROP SCHEMA {_CHANGES_SCHEMA} CASCADE")
+                _write_snapshot(con, manifest["snapshot"])
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+
+        for view, c in counts.items():
+            logger.info("  %s: %d rows deleted, %d inserted", view, c["deleted"], c["inserted"])
+        build_catalog(con, VIEW_NAMES)
+        build_fts_indexes(con)
+        logger.info(
+            "Applied changesets for %d table(s) to %s (snapshot %s -> %s)",
+            len(counts), output_path, current, manifest["snapshot"],
+        )
+        return counts
+    finally:
+        con.close()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Materialize JSONL views into DuckDB")
     parser.add_argument(
@@ -77,6 +238,17 @@ def main() -> None:
         default=VIEWS_SQL,
         help="Path to icc-data-views.sql",
     )
+    parser.add_argument(
+        "--changes-dir",
+        type=Path,
+        default=CHANGES_DIR,
+        help="ETL changesets directory (default: output/changes)",
+    )
+    parser.add_argument(
+        "--apply-changes",
+        action="store_true",
+        help="Update an existing database from the changesets instead of rebuilding it",
+    )
     parser.add_argument("-v", "--verbose", action="store_true", help="Debug logging")
     args = parser.parse_args()
 
@@ -84,7 +256,15 @@ def main() -> None:
         level=logging.DEBUG if args.verbose else logging.INFO,
         format="%(asctime)s %(levelname)s %(name)s: %(message)s",
     )
-    materialize(args.output, args.views_sql)
+    if args.apply_changes and args.output.exists():
+        try:
+            apply_changes(args.output, args.changes_dir, args.views_sql)
+        except ValueError as exc:
+            parser.error(str(exc))
+    else:
+        if args.apply_changes:
+            logger.info("%s does not exist yet; materializing in full", args.output)
+        materialize(args.output, args.views_sql, args.changes_dir)
 
 
 if __name__ == "__main__":
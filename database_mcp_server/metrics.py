@@ -0,0 +1,207 @@
+"""In-process metrics for the MCP server, rendered in Prometheus text format.
+
+Kept dependency-free on purpose: a handful of counters, gauges and
+histograms is all the server needs, and the registry is scraped from the
+``/metrics`` route next to the streamable-HTTP transport.
+"""
+
+import functools
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from sub-millisecond catalog lookups up to
+# long analytical queries.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+DEFAULT_SLOW_QUERY_SECONDS = 1.0
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        return self._values.get(key, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value:g}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose value is read from a callback at scrape time."""
+
+    def __init__(self, name: str, help: str, callback: Callable[[], float | None]):
+        self.name = name
+        self.help = help
+        self._callback = callback
+
+    def render(self) -> list[str]:
+        try:
+            value = self._callback()
+        except Exception:
+            logger.debug("Gauge %s callback failed", self.name, exc_info=True)
+            value = None
+        if value is None:
+            return []
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {value:g}"]
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...], labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., sum, count]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = f'le="{bound:g}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {count:g}")
+                inf = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, inf)} {series[-1]:g}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {series[-2]:g}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {series[-1]:g}")
+        return lines
+
+
+class ServerMetrics:
+    """All metrics exported by the MCP server."""
+
+    def __init__(self):
+        self.slow_query_seconds = DEFAULT_SLOW_QUERY_SECONDS
+        self.tool_latency = Histogram(
+            "icc_mcp_tool_latency_seconds", "End-to-end MCP tool call latency.",
+            LATENCY_BUCKETS, labels=("tool",),
+        )
+        self.tool_calls = Counter(
+            "icc_mcp_tool_calls_total", "MCP tool calls.", labels=("tool",),
+        )
+        self.tool_errors = Counter(
+            "icc_mcp_tool_errors_total", "MCP tool calls that returned an error.", labels=("tool", "kind"),
+        )
+        self.query_execute = Histogram(
+            "icc_mcp_query_execute_seconds", "DuckDB execution and fetch time per query.",
+            LATENCY_BUCKETS,
+        )
+        self.query_serialize = Histogram(
+            "icc_mcp_query_serialize_seconds", "Time spent converting query results to JSON.",
+            LATENCY_BUCKETS,
+        )
+        self.query_rows = Histogram(
+            "icc_mcp_query_rows", "Rows returned per query.", ROW_BUCKETS,
+        )
+        self.query_bytes = Histogram(
+            "icc_mcp_query_response_bytes", "Serialized response size per query.", BYTE_BUCKETS,
+        )
+        self.slow_queries = Counter(
+            "icc_mcp_slow_queries_total", "Queries slower than the slow-query threshold.",
+        )
+        # Latency of the first tool call after start, the one a cold server makes wait.
+        self.first_call_seconds: float | None = None
+        self._gauges: list[Gauge] = []
+
+    def add_gauge(self, name: str, help: str, callback: Callable[[], float | None]) -> None:
+        self._gauges.append(Gauge(name, help, callback))
+
+    def instrument_tool(self, tool: str) -> Callable:
+        """Decorator recording call count and latency for an MCP tool."""
+
+        def decorator(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                self.tool_calls.inc(tool=tool)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                except Exception:
+                    self.tool_errors.inc(tool=tool, kind="exception")
+                    raise
+                finally:
+                    elapsed = time.perf_counter() - start
+                    self.tool_latency.observe(elapsed, tool=tool)
+                    if self.first_call_seconds is None:
+                        self.first_call_seconds = elapsed
+                        logger.info("First tool call (%s) took %.3fs", tool, elapsed)
+
+            return wrapper
+
+        return decorator
+
+    def record_query(self, sql: str, execute_seconds: float, serialize_seconds: float, rows: int, nbytes: int) -> None:
+        self.query_execute.observe(execute_seconds)
+        self.query_serialize.observe(serialize_seconds)
+        self.query_rows.observe(rows)
+        self.query_bytes.observe(nbytes)
+        total = execute_seconds + serialize_seconds
+        if total >= self.slow_query_seconds:
+            self.slow_queries.inc()
+            logger.warning(
+                "Slow query (%.3fs: execute=%.3fs serialize=%.3fs rows=%d bytes=%d): %s",
+                total, execute_seconds, serialize_seconds, rows, nbytes, " ".join(sql.split())[:500],
+            )
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in (
+            self.tool_calls,
+            self.tool_errors,
+            self.tool_latency,
+            self.query_execute,
+            self.query_serialize,
+            self.query_rows,
+            self.query_bytes,
+            self.slow_queries,
+            *self._gauges,
+        ):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = ServerMetrics()
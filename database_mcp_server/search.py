@@ -0,0 +1,93 @@
+"""Full-text search over publication and project titles/abstracts.
+
+materialize.py builds DuckDB FTS (BM25) indexes for each entry in
+``FTS_INDEXES``; the server's search tools rank hits with ``match_bm25``.
+When the fts extension cannot be loaded at serve time, or the database was
+materialized without an index, searches fall back to an ILIKE scan ranked
+by the number of matching terms.
+"""
+
+import logging
+
+import duckdb
+
+from database_mcp_server.db import ReadOnlyDatabase
+
+logger = logging.getLogger(__name__)
+
+MAX_HITS = 100
+
+
+class FTSIndex:
+    def __init__(self, table: str, key: str, text_columns: list[str], result_columns: list[str]):
+        self.table = table
+        self.key = key
+        self.text_columns = text_columns
+        self.result_columns = result_columns
+
+    @property
+    def schema(self) -> str:
+        return f"fts_main_{self.table}"
+
+
+FTS_INDEXES = {
+    "publications": FTSIndex(
+        table="publications",
+        key="pmid",
+        text_columns=["title", "abstract_text"],
+        result_columns=["pmid", "title", "pub_year", "journal_title", "doi"],
+    ),
+    "projects": FTSIndex(
+        table="projects",
+        key="appl_id",
+        text_columns=["project_title", "abstract_text"],
+        result_columns=["appl_id", "core_project_num", "project_title", "fiscal_year", "contact_pi_name"],
+    ),
+}
+
+
+def build_fts_indexes(con: duckdb.DuckDBPyConnection) -> None:
+    """Create (or replace) the BM25 indexes for every entry in FTS_INDEXES."""
+    try:
+        con.execute("INSTALL fts")
+        con.execute("LOAD fts")
+    except duckdb.Error as exc:
+        logger.warning("fts extension unavailable (%s); skipping full-text indexes", exc)
+        return
+    for index in FTS_INDEXES.values():
+        columns = ", ".join(f"'{c}'" for c in index.text_columns)
+        con.execute(
+            f"PRAGMA create_fts_index('{index.table}', '{index.key}', {columns}, overwrite=1)"
+        )
+        logger.info("FTS index built: %s(%s)", index.table, ", ".join(index.text_columns))
+
+
+def search(db: ReadOnlyDatabase, index: FTSIndex, query: str, k: int = 10) -> list[dict]:
+    """Return the top-k hits for a free-text query, best first."""
+    k = max(1, min(k, MAX_HITS))
+    columns = ", ".join(index.result_columns)
+    if db.has_fts_index(index.schema):
+        sql = f"""
+            SELECT {columns}, score FROM (
+                SELECT *, {index.schema}.match_bm25({index.key}, ?) AS score
+                FROM {index.table}
+            ) WHERE score IS NOT NULL
+            ORDER BY score DESC LIMIT ?
+        """
+        return db.execute_trusted(sql, [query, k])
+
+    terms = query.split()
+    if not terms:
+        return []
+    matches = " + ".join(
+        f"coalesce(({' OR '.join(f'{c} ILIKE ?' for c in index.text_columns)})::INT, 0)"
+        for _ in terms
+    )
+    params = [f"%{t}%" for t in terms for _ in index.text_columns]
+    sql = f"""
+        SELECT {columns}, score FROM (
+            SELECT *, {matches} AS score FROM {index.table}
+        ) WHERE score > 0
+        ORDER BY score DESC LIMIT ?
+    """
+    return db.execute_trusted(sql, [*params, k])
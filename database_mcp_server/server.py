@@ -3,79 +3,62 @@
 Usage:
     uv run python -m database_mcp_server.server
     uv run python -m database_mcp_server.server --db output/icc-eval.duckdb --port 8000
+    uv run python -m database_mcp_server.server --in-memory
+
+Prometheus metrics are served at /metrics and a readiness probe at /ready
+alongside the /mcp endpoint. /ready answers 503 until the warm-up queries
+have run.
 """
 
+import time
+
+# Taken before the imports below so cold-start timings include them.
+_STARTED = time.perf_counter()
+
 import argparse
 import json
 import logging
+import textwrap
 from pathlib import Path
 
-from mcp.server.fastmcp import FastMCP
-from mcp.server.transport_security import TransportSecuritySettings
-
+from database_mcp_server.catalog import Catalog
 from database_mcp_server.db import ReadOnlyDatabase
+from database_mcp_server.metrics import METRICS
+from database_mcp_server.search import FTS_INDEXES, search
+from database_mcp_server.warmup import Startup, load_queries, start_warm_up
 
 logger = logging.getLogger(__name__)
 
-TOOL_DESCRIPTION = """\
+TOOL_PREAMBLE = """\
 Execute a read-only SQL query against the ICC grant evaluation database.
 
 This database contains NIH grant records, associated publications, citation
 metrics, OpenAlex work records, and GitHub repositories for a collection of
 NIH-funded projects.
+"""
 
-## Tables
-
-### projects
-NIH Reporter grant records, one row per project-year.
-Columns: appl_id, project_num, core_project_num, project_title, fiscal_year,
-award_amount, direct_cost_amt, indirect_cost_amt, activity_code, funding_mechanism,
-agency_code, is_active, is_new, contact_pi_name, org_name, org_city, org_state,
-org_country, project_start_date, project_end_date, budget_start, budget_end,
-award_notice_date, pref_terms, abstract_text
-
-### publication_links
-Join table: core_project_num <-> pmid (which publications are linked to which grants).
-Columns: core_project_num, pmid, appl_id
-
-### publications
-Europe PMC publication metadata, one row per PMID.
-Columns: pmid, doi, pmcid, title, author_string, pub_year, journal_title,
-journal_abbrev, cited_by_count, is_open_access, language, pub_model, source,
-abstract_text, first_publication_date
-
-### icite
-iCite citation metrics for grant-associated publications.
-Columns: pmid, title, doi, year, journal, citation_count, citations_per_year,
-rcr (relative citation ratio), expected_citations_per_year, field_citation_rate,
-nih_percentile, is_research_article, is_clinical, provisional, cited_by,
-references, cited_by_count, reference_count
-
-### citation_links
-Edge list: cited_pmid <-> citing_pmid (which papers cite the grant publications).
-Columns: cited_pmid, citing_pmid
-
-### citing_icite
-iCite metrics for citing publications (same schema as icite).
-
-### openalex
-OpenAlex work records for grant-associated publications.
-Columns: openalex_id, doi, title, display_name, publication_year, publication_date,
-pmid_url, pmid, type, language, primary_source, is_oa, oa_status, cited_by_count,
-fwci, volume, issue, first_page, last_page, is_retracted, referenced_works_count,
-primary_topic, primary_subfield, author_count, topic_count, mesh_count
-
-### citing_openalex
-OpenAlex work records for citing publications (same schema as openalex).
-
-### github_repos
-GitHub repositories tagged with project ID topics.
-Columns: repo_id, name, full_name, html_url, description, topics, core_project_ids,
-language, stars, forks, open_issues, owner_login, owner_type, license_name,
-created_at, updated_at, pushed_at, is_private, is_fork, is_archived
-
-## Example queries
+# Prose for each table; column lists and row counts come from the catalog.
+TABLE_DESCRIPTIONS = {
+    "projects": "NIH Reporter grant records, one row per project-year.",
+    "publication_links": (
+        "Join table: core_project_num <-> pmid (which publications are linked to which grants)."
+    ),
+    "publications": "Europe PMC publication metadata, one row per PMID.",
+    "icite": (
+        "iCite citation metrics for grant-associated publications "
+        "(rcr = relative citation ratio)."
+    ),
+    "citation_links": (
+        "Edge list: cited_pmid <-> citing_pmid (which papers cite the grant publications). "
+        "hop = 1 for citations of grant publications, N for citations of hop N-1 papers."
+    ),
+    "citing_icite": "iCite metrics for citing publications (same schema as icite, plus hop).",
+    "openalex": "OpenAlex work records for grant-associated publications.",
+    "citing_openalex": "OpenAlex work records for citing publications (same schema as openalex).",
+    "github_repos": "GitHub repositories tagged with project ID topics.",
+}
 
+EXAMPLE_QUERIES = """\
 -- List all grants with total award amounts
 SELECT core_project_num, project_title, SUM(award_amount) as total_funding
 FROM projects GROUP BY core_project_num, project_title
@@ -103,17 +86,36 @@ FROM citation_links cl JOIN citing_icite ci ON cl.citing_pmid = ci.pmid
 GROUP BY ci.journal ORDER BY citation_count DESC LIMIT 10
 """
 
-mcp = FastMCP(
-    "ICC Grant Evaluation Data",
-    instructions=(
-        "This server provides read-only SQL access to NIH grant evaluation data "
-        "including grants, publications, citation metrics, OpenAlex records, and "
-        "GitHub repositories. Use the query_sql tool to run SQL queries."
-    ),
+
+def build_tool_description(catalog: Catalog) -> str:
+    """Render the query_sql description from the schema catalog."""
+    sections = [TOOL_PREAMBLE, "## Tables\n"]
+    # Documented tables first, in TABLE_DESCRIPTIONS order, then any others.
+    order = {t: i for i, t in enumerate(TABLE_DESCRIPTIONS)}
+    for table in sorted(catalog.table_names(), key=lambda t: (order.get(t, len(order)), t)):
+        rows = catalog.row_count(table)
+        heading = f"### {table}" + (f" ({rows:,} rows)" if rows is not None else "")
+        columns = textwrap.fill(
+            "Columns: " + ", ".join(catalog.column_names(table)), width=80,
+        )
+        prose = TABLE_DESCRIPTIONS.get(table)
+        sections.append("\n".join(filter(None, [heading, prose, columns])) + "\n")
+    sections.append("## Example queries\n")
+    sections.append(EXAMPLE_QUERIES)
+    return "\n".join(sections)
+
+
+INSTRUCTIONS = (
+    "This server provides read-only SQL access to NIH grant evaluation data "
+    "including grants, publications, citation metrics, OpenAlex records, and "
+    "GitHub repositories. Use the query_sql tool to run SQL queries. For "
+    "keyword lookups over titles and abstracts, prefer search_publications "
+    "and search_projects over ILIKE scans."
 )
 
 # Will be initialized on startup
 _db: ReadOnlyDatabase | None = None
+_catalog: Catalog | None = None
 
 
 def _get_db() -> ReadOnlyDatabase:
@@ -122,46 +124,132 @@ def _get_db() -> ReadOnlyDatabase:
     return _db
 
 
-@mcp.tool(description=TOOL_DESCRIPTION)
+def _get_catalog() -> Catalog:
+    if _catalog is None:
+        raise RuntimeError("Catalog not initialized")
+    return _catalog
+
+
+def _run_query(db: ReadOnlyDatabase, sql: str, limit: int) -> str:
+    """Execute a query and serialize it, recording execution vs serialization time."""
+    start = time.perf_counter()
+    results = db.execute_query(sql, limit=limit)
+    executed = time.perf_counter()
+    payload = json.dumps(results, default=str)
+    serialized = time.perf_counter()
+    METRICS.record_query(
+        sql,
+        execute_seconds=executed - start,
+        serialize_seconds=serialized - executed,
+        rows=len(results),
+        nbytes=len(payload),
+    )
+    return payload
+
+
+# Tools are registered in build_server(); query_sql's description is
+# generated from the live schema once the catalog is loaded.
+@METRICS.instrument_tool("query_sql")
 def query_sql(sql: str, limit: int = 100) -> str:
     """Execute a read-only SQL query against the ICC evaluation database."""
     db = _get_db()
     try:
-        results = db.execute_query(sql, limit=limit)
-        return json.dumps(results, default=str)
+        return _run_query(db, sql, limit)
     except ValueError as e:
+        METRICS.tool_errors.inc(tool="query_sql", kind="validation")
         return json.dumps({"error": str(e)})
     except Exception as e:
+        METRICS.tool_errors.inc(tool="query_sql", kind="query")
         logger.exception("Query failed: %s", sql[:200])
         return json.dumps({"error": f"Query failed: {e}"})
 
 
-@mcp.tool()
+@METRICS.instrument_tool("list_tables")
 def list_tables() -> str:
     """List all available tables in the ICC evaluation database."""
-    db = _get_db()
-    tables = db.get_table_names()
-    return json.dumps(tables)
+    return json.dumps(_get_catalog().table_names())
 
 
-@mcp.tool()
+@METRICS.instrument_tool("describe_table")
 def describe_table(table_name: str) -> str:
-    """Describe the columns and types of a table.
+    """Describe the columns of a table.
 
-    Example: describe_table("projects") returns column names, types, and nullability.
+    Example: describe_table("projects") returns column names, types, row count,
+    null fraction, min/max values, and approximate distinct counts.
     """
-    db = _get_db()
-    if table_name not in db.get_table_names():
+    catalog = _get_catalog()
+    if not catalog.has_table(table_name):
+        METRICS.tool_errors.inc(tool="describe_table", kind="validation")
         return json.dumps({"error": f"Unknown table: {table_name}. Use list_tables() to see available tables."})
+    return json.dumps(catalog.columns(table_name), default=str)
+
+
+def _search(tool: str, index: str, query: str, k: int) -> str:
     try:
-        results = db.execute_query(f"DESCRIBE {table_name}", limit=1000)
-        return json.dumps(results, default=str)
+        return json.dumps(search(_get_db(), FTS_INDEXES[index], query, k), default=str)
     except Exception as e:
-        return json.dumps({"error": f"Failed to describe table: {e}"})
+        METRICS.tool_errors.inc(tool=tool, kind="query")
+        logger.exception("Search failed: %s", query[:200])
+        return json.dumps({"error": f"Search failed: {e}"})
+
+
+@METRICS.instrument_tool("search_publications")
+def search_publications(query: str, k: int = 10) -> str:
+    """Full-text search (BM25) over grant publication titles and abstracts.
+
+    Returns up to k (max 100) hits ranked by relevance, each with pmid, title,
+    pub_year, journal_title, doi and score. Join on pmid for more detail.
+    Example: search_publications("single cell atlas", k=5)
+    """
+    return _search("search_publications", "publications", query, k)
+
+
+@METRICS.instrument_tool("search_projects")
+def search_projects(query: str, k: int = 10) -> str:
+    """Full-text search (BM25) over grant project titles and abstracts.
+
+    Returns up to k (max 100) hits ranked by relevance, each with appl_id,
+    core_project_num, project_title, fiscal_year, contact_pi_name and score.
+    Example: search_projects("data coordination", k=5)
+    """
+    return _search("search_projects", "projects", query, k)
+
+
+def build_server(catalog: Catalog, startup: Startup):
+    """Create the FastMCP app with its tools and the /metrics and /ready routes.
+
+    The mcp stack accounts for most of the server's import time, so it is
+    imported here, while the warm-up thread is already querying DuckDB.
+    """
+    from mcp.server.fastmcp import FastMCP
+    from mcp.server.transport_security import TransportSecuritySettings
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, PlainTextResponse
+
+    mcp = FastMCP("ICC Grant Evaluation Data", instructions=INSTRUCTIONS)
+    mcp.settings.transport_security = TransportSecuritySettings(
+        enable_dns_rebinding_protection=False,
+    )
+    for tool in (list_tables, describe_table, search_publications, search_projects):
+        mcp.add_tool(tool)
+    mcp.add_tool(query_sql, description=build_tool_description(catalog))
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics_endpoint(request: Request) -> PlainTextResponse:
+        """Prometheus scrape endpoint."""
+        return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+    @mcp.custom_route("/ready", methods=["GET"])
+    async def ready_endpoint(request: Request) -> JSONResponse:
+        """Readiness probe: 503 until warm-up has finished."""
+        ready = startup.probe()
+        return JSONResponse(startup.status(), status_code=200 if ready else 503)
+
+    return mcp
 
 
 def main() -> None:
-    global _db
+    global _db, _catalog
 
     parser = argparse.ArgumentParser(description="ICC Evaluation MCP Server")
     parser.add_argument(
@@ -172,6 +260,23 @@ def main() -> None:
     )
     parser.add_argument("--host", default="0.0.0.0", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument(
+        "--slow-query-ms",
+        type=float,
+        default=1000.0,
+        help="Log queries slower than this many milliseconds (default: 1000)",
+    )
+    parser.add_argument(
+        "--in-memory",
+        action="store_true",
+        help="Copy the whole database into memory at startup instead of reading the file on demand",
+    )
+    parser.add_argument(
+        "--warmup-sql",
+        type=Path,
+        help="Warm-up queries, separated by blank lines (default: the query_sql example queries)",
+    )
+    parser.add_argument("--no-warmup", action="store_true", help="Report ready without running warm-up queries")
     parser.add_argument("-v", "--verbose", action="store_true", help="Debug logging")
     args = parser.parse_args()
 
@@ -180,16 +285,47 @@ def main() -> None:
         format="%(asctime)s %(levelname)s %(name)s: %(message)s",
     )
 
-    _db = ReadOnlyDatabase(args.db)
-    logger.info("Loaded database: %s", args.db)
-    logger.info("Tables: %s", _db.get_table_names())
-
-    mcp.settings.host = args.host
-    mcp.settings.port = args.port
-    mcp.settings.transport_security = TransportSecuritySettings(
-        enable_dns_rebinding_protection=False,
+    startup = Startup(_STARTED)
+    start = time.perf_counter()
+    _db = ReadOnlyDatabase(args.db, in_memory=args.in_memory)
+    _catalog = Catalog.load(_db)
+    startup.database_seconds = time.perf_counter() - start
+    logger.info(
+        "Loaded database %s%s in %.2fs", args.db, " into memory" if args.in_memory else "", startup.database_seconds,
+    )
+    logger.info("Tables: %s", _catalog.table_names())
+    if args.no_warmup:
+        startup.mark_ready()
+    else:
+        start_warm_up(_db, load_queries(args.warmup_sql, EXAMPLE_QUERIES), startup)
+
+    server = build_server(_catalog, startup)
+
+    METRICS.slow_query_seconds = args.slow_query_ms / 1000.0
+    METRICS.add_gauge(
+        "icc_mcp_duckdb_memory_bytes",
+        "Memory held by the DuckDB buffer manager (block cache and intermediates).",
+        _db.memory_usage_bytes,
+    )
+    METRICS.add_gauge(
+        "icc_mcp_duckdb_threads",
+        "DuckDB worker thread pool size.",
+        _db.thread_count,
     )
-    mcp.run(transport="streamable-http")
+    METRICS.add_gauge("icc_mcp_ready", "1 once warm-up has finished.", lambda: float(startup.ready.is_set()))
+    METRICS.add_gauge(
+        "icc_mcp_startup_seconds", "Process start to warm-up finished, including imports.",
+        lambda: startup.ready_seconds,
+    )
+    METRICS.add_gauge("icc_mcp_warmup_seconds", "Time spent running warm-up queries.", lambda: startup.warmup_seconds)
+    METRICS.add_gauge(
+        "icc_mcp_first_tool_call_seconds", "Latency of the first tool call after start.",
+        lambda: METRICS.first_call_seconds,
+    )
+
+    server.settings.host = args.host
+    server.settings.port = args.port
+    server.run(transport="streamable-http")
 
 
 if __name__ == "__main__":
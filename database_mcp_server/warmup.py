@@ -0,0 +1,125 @@
+"""Startup warm-up and readiness for the MCP server.
+
+Before the server reports ready on ``/ready`` it runs a warm-up query set
+(by default the example queries from the ``query_sql`` tool description)
+and one search per full-text index, so DuckDB has the hot columns cached
+and the first real client does not pay for a cold buffer pool. Warm-up
+runs on its own cursor in a background thread while the MCP stack is
+imported and the HTTP server starts.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+
+from database_mcp_server.db import ReadOnlyDatabase
+from database_mcp_server.search import FTS_INDEXES, search
+
+logger = logging.getLogger(__name__)
+
+# Any common word works; the point is to load the fts macros and index tables.
+WARMUP_SEARCH_TERM = "cancer"
+
+
+def split_queries(text: str) -> list[str]:
+    """Split blank-line separated SQL blocks into statements, dropping ``--`` comment lines."""
+    queries = []
+    for block in text.strip().split("\n\n"):
+        sql = "\n".join(line for line in block.splitlines() if not line.startswith("--")).strip()
+        if sql:
+            queries.append(sql)
+    return queries
+
+
+def load_queries(path: Path | None, default: str) -> list[str]:
+    return split_queries(path.read_text() if path is not None else default)
+
+
+class Startup:
+    """Cold-start timings and the readiness flag behind ``/ready``."""
+
+    def __init__(self, started: float):
+        # perf_counter() value taken as early in the process as possible.
+        self.started = started
+        self.ready = threading.Event()
+        self.database_seconds: float | None = None
+        self.warmup_seconds: float | None = None
+        self.ready_seconds: float | None = None
+        self.first_probe_seconds: float | None = None
+        self.warmup_errors = 0
+
+    def mark_ready(self) -> None:
+        self.ready_seconds = time.perf_counter() - self.started
+        self.ready.set()
+        logger.info(
+            "Warm %.2fs after start (database %.2fs, warm-up %.2fs, %d warm-up error(s))",
+            self.ready_seconds, self.database_seconds or 0.0, self.warmup_seconds or 0.0, self.warmup_errors,
+        )
+
+    def probe(self) -> bool:
+        """Answer a readiness probe; the first passing one marks the end of the cold start."""
+        if not self.ready.is_set():
+            return False
+        if self.first_probe_seconds is None:
+            self.first_probe_seconds = time.perf_counter() - self.started
+            logger.info("Cold start: first passing readiness probe %.2fs after start", self.first_probe_seconds)
+        return True
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready.is_set(),
+            "uptime_seconds": round(time.perf_counter() - self.started, 3),
+            "database_seconds": self.database_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "ready_seconds": self.ready_seconds,
+            "first_probe_seconds": self.first_probe_seconds,
+            "warmup_errors": self.warmup_errors,
+        }
+
+
+def warm_up(db: ReadOnlyDatabase, queries: list[str], startup: Startup) -> None:
+    """Run the warm-up set on a separate cursor, then mark the server ready.
+
+    A failing query is logged and counted but does not hold back
+    readiness: the database itself opened fine, and the same query would
+    fail for a client too. If the warm-up cannot run at all (say the
+    cursor fails to open), that is logged and the server reports ready
+    cold rather than never.
+    """
+    start = time.perf_counter()
+    try:
+        cursor = db.cursor()
+        try:
+            for sql in queries:
+                t = time.perf_counter()
+                try:
+                    cursor.execute_query(sql)
+                except Exception as exc:
+                    startup.warmup_errors += 1
+                    logger.warning("Warm-up query failed (%s): %s", exc, " ".join(sql.split())[:200])
+                else:
+                    logger.debug("Warm-up query took %.3fs: %s", time.perf_counter() - t, " ".join(sql.split())[:200])
+            for index in FTS_INDEXES.values():
+                try:
+                    search(cursor, index, WARMUP_SEARCH_TERM, 10)
+                except Exception as exc:
+                    startup.warmup_errors += 1
+                    logger.warning("Warm-up search on %s failed: %s", index.table, exc)
+        finally:
+            cursor.close()
+        logger.info(
+            "Warm-up: %d queries and %d searches in %.2fs", len(queries), len(FTS_INDEXES), time.perf_counter() - start,
+        )
+    except Exception:
+        startup.warmup_errors += 1
+        logger.exception("Warm-up aborted; reporting ready without it")
+    finally:
+        startup.warmup_seconds = time.perf_counter() - start
+        startup.mark_ready()
+
+
+def start_warm_up(db: ReadOnlyDatabase, queries: list[str], startup: Startup) -> threading.Thread:
+    thread = threading.Thread(target=warm_up, args=(db, queries, startup), name="warm-up", daemon=True)
+    thread.start()
+    return thread
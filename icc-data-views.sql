@@ -135,23 +135,28 @@ from read_json_auto('output/icite.jsonl');
 -- citation_links
 -- Edge list mapping grant-associated publications (cited_pmid) to the
 -- publications that cite them (citing_pmid). Derived from iCite's cited_by
--- field. Use this to join icite and citing_icite.
+-- field. Use this to join icite and citing_icite. hop is 1 for edges into
+-- the grant publications, N for edges into hop N-1 citing publications
+-- (only present with --citation-depth > 1).
 -- ============================================================================
 create or replace view citation_links as
 select
     cited_pmid,
-    citing_pmid
+    citing_pmid,
+    hop
 from read_json_auto('output/citation_links.jsonl');
 
 -- ============================================================================
 -- citing_icite
 -- iCite citation metrics for publications that cite the grant-associated
--- papers. Same schema as icite, but covers the broader citation neighborhood
--- rather than the directly funded publications.
+-- papers. Same schema as icite plus hop (citation distance from the grant
+-- publications), covering the broader citation neighborhood rather than the
+-- directly funded publications.
 -- ============================================================================
 create or replace view citing_icite as
 select
     pmid,
+    hop,
     title,
     doi,
     year,
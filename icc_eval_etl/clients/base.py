@@ -1,70 +1,206 @@
 import asyncio
 import logging
+import time
 
 import httpx
 
+from icc_eval_etl.clients.coalesce import Coalescer
+from icc_eval_etl.clients.concurrency import AdaptiveLimiter
+from icc_eval_etl.clients.rate_coordinator import RateCoordinator
+from icc_eval_etl.clients.resilience import CircuitOpenError, Resilience, backoff, is_host_failure
+from icc_eval_etl.entity_store import EntityStore
+from icc_eval_etl.pipeline.failure_ledger import FailureLedger
+from icc_eval_etl.pipeline.telemetry import RunTelemetry
+
 logger = logging.getLogger(__name__)
 
 
 class BaseClient:
     """Async HTTP client with rate limiting and retry logic."""
 
+    # Entity store source name; clients that set it consult the store per PMID.
+    STORE_SOURCE: str | None = None
+    # Default (floor, ceiling) of the adaptive in-flight limit; None leaves requests unlimited.
+    CONCURRENCY: tuple[int, int] | None = None
+
     def __init__(
         self,
         base_url: str,
         rate_limit: float = 1.0,
         max_retries: int = 3,
         client: httpx.AsyncClient | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        telemetry: RunTelemetry | None = None,
+        store: EntityStore | None = None,
+        rate_coordinator: RateCoordinator | None = None,
+        ledger: FailureLedger | None = None,
+        resilience: Resilience | None = None,
+        concurrency: dict[str, tuple[int, int]] | None = None,
     ):
         self.base_url = base_url
+        self.name = type(self).__name__
+        self._telemetry = telemetry
+        self._store = store if self.STORE_SOURCE else None
+        self._rate_coordinator = rate_coordinator
+        self._ledger = ledger
+        self._resilience = resilience
+        host = httpx.URL(base_url).host
+        self._breaker = resilience.breaker(host) if resilience is not None else None
+        # ``concurrency`` maps hosts to (floor, ceiling) overrides.
+        bounds = (concurrency or {}).get(host, self.CONCURRENCY)
+        self._limiter = AdaptiveLimiter(host, *bounds, telemetry=telemetry) if bounds else None
+        # Per-PMID clients set this so each PMID is fetched at most once per run.
+        self._coalescer: Coalescer | None = None
         self._min_interval = 1.0 / rate_limit
         self._max_retries = max_retries
         self._lock = asyncio.Lock()
         self._last_request_time = 0.0
         self._owns_client = client is None
-        self._client = client or httpx.AsyncClient(base_url=base_url, timeout=60.0)
+        self._client = client or httpx.AsyncClient(
+            base_url=base_url, timeout=60.0, transport=transport,
+        )
 
     async def _throttle(self) -> None:
         async with self._lock:
+            if self._rate_coordinator is not None:
+                # Shared with other shard processes hitting the same host.
+                delay = self._rate_coordinator.reserve(self.name, self._min_interval)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                return
             now = asyncio.get_event_loop().time()
             elapsed = now - self._last_request_time
             if elapsed < self._min_interval:
                 await asyncio.sleep(self._min_interval - elapsed)
             self._last_request_time = asyncio.get_event_loop().time()
 
+    async def _store_lookup(self, pmids: list[int]) -> tuple[dict[int, dict | list[dict] | None], list[int]]:
+        """Split pmids into fresh entity store entries and those still to fetch."""
+        if self._store is None:
+            return {}, pmids
+        # SQLite reads of a large batch would otherwise stall the event loop.
+        cached = await asyncio.to_thread(self._store.get_many, self.STORE_SOURCE, pmids)
+        missing = [p for p in pmids if p not in cached]
+        if self._telemetry is not None:
+            self._telemetry.record_store(self.name, hits=len(cached), misses=len(missing))
+        if cached:
+            logger.info("%s: %d/%d PMIDs served from entity store", self.name, len(cached), len(pmids))
+        return cached, missing
+
+    async def _store_save(self, entries: dict[int, dict | list[dict] | None]) -> None:
+        if self._store is not None and entries:
+            await asyncio.to_thread(self._store.put_many, self.STORE_SOURCE, entries)
+
+    def _record_failure(self, keys: list, exc: BaseException) -> None:
+        """File keys the client gave up on in the failure ledger, for ``main.py repair``."""
+        if self._ledger is not None:
+            self._ledger.record(self.name, keys, exc)
+
+    async def _coalesced(self, pmids: list[int]) -> dict:
+        """Per-PMID values through the client's Coalescer, recording memo hits and in-flight joins."""
+        values, shared = await self._coalescer.get_many(pmids)
+        if shared:
+            logger.info("%s: %d/%d PMIDs already fetched or in flight this run", self.name, shared, len(pmids))
+            if self._telemetry is not None:
+                self._telemetry.record_coalesced(self.name, shared)
+        return values
+
+    async def _send(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Issue one HTTP request, reporting it to telemetry and the adaptive limiter."""
+        await self._throttle()
+        epoch = self._limiter.epoch if self._limiter is not None else 0
+        start = time.perf_counter()
+        try:
+            response = await self._client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            if self._limiter is not None:
+                self._limiter.record(epoch, None, time.perf_counter() - start)
+            if self._telemetry is not None:
+                self._telemetry.record_request(
+                    self.name, method, path, None, 0, time.perf_counter() - start,
+                )
+            raise
+        if self._limiter is not None:
+            self._limiter.record(epoch, response, time.perf_counter() - start)
+        if self._telemetry is not None:
+            self._telemetry.record_request(
+                self.name, method, path, response.status_code, len(response.content),
+                time.perf_counter() - start,
+            )
+        return response
+
+    def _record_retry(self) -> None:
+        if self._telemetry is not None:
+            self._telemetry.record_retry(self.name)
+
+    def _may_retry(self, attempt: int, response: httpx.Response | None = None) -> bool:
+        if attempt >= self._max_retries:
+            return False
+        # 429s are paced by backoff alone; the budget is for a failing host.
+        if self._resilience is None or not is_host_failure(response):
+            return True
+        return self._resilience.budget.try_spend(self.name)
+
+    def _record_outcome(self, response: httpx.Response | None) -> None:
+        if self._resilience is not None:
+            self._resilience.budget.record_request()
+            self._breaker.record(response)
+
     async def _request(
         self,
         method: str,
         path: str,
         **kwargs,
     ) -> httpx.Response:
+        if self._limiter is None:
+            return await self._request_with_retries(method, path, **kwargs)
+        # Held across retries so a host that pushes back gets fewer requests, not just later ones.
+        await self._limiter.acquire()
+        try:
+            return await self._request_with_retries(method, path, **kwargs)
+        finally:
+            self._limiter.release()
+
+    async def _request_with_retries(self, method: str, path: str, **kwargs) -> httpx.Response:
         for attempt in range(self._max_retries + 1):
-            await self._throttle()
+            if self._breaker is not None:
+                try:
+                    await self._breaker.acquire()
+                except CircuitOpenError as exc:
+                    # Read by the failure ledger.
+                    exc.attempts = attempt
+                    raise
             try:
-                response = await self._client.request(method, path, **kwargs)
-                if response.status_code == 429 or response.status_code >= 500:
-                    if attempt < self._max_retries:
-                        wait = 2**attempt
-                        logger.warning(
-                            "Request %s %s returned %d, retrying in %ds (attempt %d/%d)",
-                            method, path, response.status_code, wait, attempt + 1, self._max_retries,
-                        )
-                        await asyncio.sleep(wait)
-                        continue
-                response.raise_for_status()
-                return response
-            except httpx.HTTPStatusError:
-                raise
+                response = await self._send(method, path, **kwargs)
             except httpx.HTTPError as exc:
-                if attempt < self._max_retries:
-                    wait = 2**attempt
+                self._record_outcome(None)
+                if self._may_retry(attempt):
+                    wait = backoff(attempt)
                     logger.warning(
-                        "Request %s %s failed (%s), retrying in %ds (attempt %d/%d)",
+                        "Request %s %s failed (%s), retrying in %.1fs (attempt %d/%d)",
                         method, path, exc, wait, attempt + 1, self._max_retries,
                     )
+                    self._record_retry()
                     await asyncio.sleep(wait)
                     continue
+                exc.attempts = attempt + 1
+                raise
+            self._record_outcome(response)
+            if (response.status_code == 429 or response.status_code >= 500) and self._may_retry(attempt, response):
+                wait = backoff(attempt)
+                logger.warning(
+                    "Request %s %s returned %d, retrying in %.1fs (attempt %d/%d)",
+                    method, path, response.status_code, wait, attempt + 1, self._max_retries,
+                )
+                self._record_retry()
+                await asyncio.sleep(wait)
+                continue
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as exc:
+                exc.attempts = attempt + 1
                 raise
+            return response
         raise RuntimeError("Unreachable")
 
     async def close(self) -> None:
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+class Coalescer(Generic[V]):
+    """Single-flight, memoized PMID lookups for one source within a run.
+
+    ``fetch(pmids)`` returns a value for every PMID it resolved (a None or
+    empty value when the source has nothing); PMIDs missing from its result
+    count as failed and are not memoized. Completed values are kept for the
+    run. PMIDs already in flight share the pending future. New PMIDs
+    requested by callers in the same event-loop iteration are merged into
+    one fetch.
+    """
+
+    def __init__(self, name: str, fetch: Callable[[list[int]], Awaitable[dict[int, V]]]):
+        self.name = name
+        self._fetch = fetch
+        self._memo: dict[int, V] = {}
+        self._inflight: dict[int, asyncio.Future] = {}
+        self._pending: list[int] = []
+        self._flush_task: asyncio.Task | None = None
+
+    async def get_many(self, pmids: list[int]) -> tuple[dict[int, V], int]:
+        """Values for pmids (failed ones omitted), and how many were memo hits or in-flight joins."""
+        loop = asyncio.get_running_loop()
+        found: dict[int, V] = {}
+        waiting: dict[int, asyncio.Future] = {}
+        shared = 0
+        for pmid in dict.fromkeys(pmids):
+            if pmid in self._memo:
+                found[pmid] = self._memo[pmid]
+                shared += 1
+            elif pmid in self._inflight:
+                waiting[pmid] = self._inflight[pmid]
+                shared += 1
+            else:
+                waiting[pmid] = self._inflight[pmid] = loop.create_future()
+                self._pending.append(pmid)
+        if self._pending and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+        if waiting:
+            # Shielded: one caller being cancelled must not cancel a fetch others share.
+            results = await asyncio.gather(*(asyncio.shield(f) for f in waiting.values()))
+            for pmid, (ok, value) in zip(waiting, results):
+                if ok:
+                    found[pmid] = value
+        return found, shared
+
+    async def _flush(self) -> None:
+        # Let callers scheduled in the same iteration add their PMIDs first.
+        await asyncio.sleep(0)
+        batch, self._pending, self._flush_task = self._pending, [], None
+        try:
+            values = await self._fetch(batch)
+        except Exception as exc:
+            for pmid in batch:
+                future = self._inflight.pop(pmid)
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        except BaseException:
+            for pmid in batch:
+                self._inflight.pop(pmid).cancel()
+            raise
+        for pmid in batch:
+            future = self._inflight.pop(pmid)
+            if pmid in values:
+                self._memo[pmid] = values[pmid]
+            if not future.done():
+                future.set_result((pmid in values, values.get(pmid)))
+        logger.debug("%s: fetched %d/%d coalesced PMIDs", self.name, len(values), len(batch))
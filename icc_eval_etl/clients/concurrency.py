@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from collections import deque
+
+import httpx
+
+from icc_eval_etl.pipeline.telemetry import RunTelemetry
+
+logger = logging.getLogger(__name__)
+
+INITIAL_LIMIT = 5
+MULTIPLICATIVE_DECREASE = 0.5
+# A success slower than this multiple of the latency baseline counts as congestion.
+LATENCY_SPIKE_FACTOR = 3.0
+LATENCY_SPIKE_MIN = 0.5  # seconds; slower-than-usual responses under this are jitter
+LATENCY_ALPHA = 0.05  # EWMA weight of each new latency sample
+MIN_LATENCY_SAMPLES = 10
+
+
+def parse_bounds(specs: list[str]) -> dict[str, tuple[int, int]]:
+    """``HOST=FLOOR:CEILING`` strings -> {host: (floor, ceiling)}."""
+    bounds = {}
+    for spec in specs:
+        host, sep, limits = spec.partition("=")
+        floor, colon, ceiling = limits.partition(":")
+        if not sep or not colon or not floor.isdigit() or not ceiling.isdigit():
+            raise ValueError(f"expected HOST=FLOOR:CEILING, got {spec!r}")
+        if not 1 <= int(floor) <= int(ceiling):
+            raise ValueError(f"need 1 <= floor <= ceiling, got {spec!r}")
+        bounds[host] = (int(floor), int(ceiling))
+    return bounds
+
+
+class AdaptiveLimiter:
+    """AIMD limit on in-flight requests to one host.
+
+    A slot is held for a request's whole retry loop, so backing off also
+    holds back new work. The limit grows by one after a full window
+    (``limit`` healthy responses) in which it was actually reached, and is
+    cut by MULTIPLICATIVE_DECREASE on a 429, 5xx, transport error or a
+    latency spike, never leaving [floor, ceiling]. Only attempts sent since
+    the last cut can trigger another, so one burst of errors cuts once.
+    """
+
+    def __init__(self, host: str, floor: int, ceiling: int, telemetry: RunTelemetry | None = None):
+        self.host = host
+        self.floor = floor
+        self.ceiling = ceiling
+        self.limit = max(floor, min(ceiling, INITIAL_LIMIT))
+        # Bumped on every cut; attempts pass the value they were sent under to record().
+        self.epoch = 0
+        self._telemetry = telemetry
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._healthy = 0
+        self._saturated = False
+        self._baseline: float | None = None
+        self._samples = 0
+
+    async def acquire(self) -> None:
+        """Wait for a slot; pair with release()."""
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot just as we were cancelled; pass it on.
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    def record(self, epoch: int, response: httpx.Response | None, latency: float) -> None:
+        """Adjust the limit from one attempt's outcome (response None for a transport error)."""
+        if response is None:
+            reason = "transport error"
+        elif response.status_code == 429 or response.status_code >= 500:
+            reason = f"HTTP {response.status_code}"
+        elif (
+            self._samples >= MIN_LATENCY_SAMPLES
+            and latency > max(LATENCY_SPIKE_MIN, LATENCY_SPIKE_FACTOR * self._baseline)
+        ):
+            reason = f"latency {latency:.2f}s vs {self._baseline:.2f}s baseline"
+        else:
+            reason = None
+        if response is not None and response.status_code < 500:
+            self._samples += 1
+            self._baseline = latency if self._baseline is None else (
+                (1 - LATENCY_ALPHA) * self._baseline + LATENCY_ALPHA * latency
+            )
+        if reason is not None:
+            if epoch == self.epoch:
+                self.epoch += 1
+                self._set_limit(max(self.floor, int(self.limit * MULTIPLICATIVE_DECREASE)), reason)
+        else:
+            self._healthy += 1
+            # Only a limit that is actually holding work back is worth raising.
+            self._saturated = self._saturated or bool(self._waiters) or self._in_flight >= self.limit
+            if self._healthy >= self.limit and self._saturated and self.limit < self.ceiling:
+                self._set_limit(self.limit + 1, "healthy window")
+                self._wake()
+
+    def _set_limit(self, limit: int, reason: str) -> None:
+        previous, self.limit = self.limit, limit
+        self._healthy = 0
+        self._saturated = False
+        if limit == previous:
+            return
+        log = logger.info if limit > previous else logger.warning
+        log("Concurrency for %s: %d -> %d (%s)", self.host, previous, limit, reason)
+        if self._telemetry is not None:
+            self._telemetry.record_event(
+                "concurrency", host=self.host, limit=limit, previous=previous, reason=reason,
+            )
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
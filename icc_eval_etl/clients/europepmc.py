@@ -2,44 +2,62 @@ import asyncio
 import logging
 
 from icc_eval_etl.clients.base import BaseClient
+from icc_eval_etl.clients.coalesce import Coalescer
 from icc_eval_etl.models.europepmc import EuropePMCArticleResponse, EuropePMCResult
 
 logger = logging.getLogger(__name__)
 
 EUROPEPMC_BASE = "https://www.ebi.ac.uk"
+RATE_LIMIT = 10.0  # requests/sec
 
 
 class EuropePMCClient(BaseClient):
-    def __init__(self, concurrency: int = 5, **kwargs):
-        super().__init__(base_url=EUROPEPMC_BASE, rate_limit=10.0, **kwargs)
-        self._semaphore = asyncio.Semaphore(concurrency)
+    STORE_SOURCE = "europepmc"
+    # One request per PMID, so in-flight requests are bounded adaptively.
+    CONCURRENCY = (1, 20)
 
-    async def _fetch_one(self, pmid: int) -> EuropePMCResult | None:
-        async with self._semaphore:
-            response = await self._request(
-                "GET",
-                f"/europepmc/webservices/rest/article/MED/{pmid}",
-                params={"format": "json", "resultType": "core"},
-            )
-            parsed = EuropePMCArticleResponse.model_validate(response.json())
-            if parsed.result:
-                return parsed.result
-            logger.warning("No Europe PMC result for PMID %d", pmid)
-            return None
+    def __init__(self, **kwargs):
+        kwargs.setdefault("rate_limit", RATE_LIMIT)
+        super().__init__(base_url=EUROPEPMC_BASE, **kwargs)
+        self._coalescer = Coalescer(self.name, self._fetch_uncached)
 
-    async def fetch_publications(
-        self, pmids: list[int]
-    ) -> list[EuropePMCResult]:
-        logger.info("Fetching %d publications from Europe PMC", len(pmids))
-        tasks = [self._fetch_one(pmid) for pmid in pmids]
+    async def _fetch_one(self, pmid: int) -> EuropePMCResult | None:
+        response = await self._request(
+            "GET",
+            f"/europepmc/webservices/rest/article/MED/{pmid}",
+            params={"format": "json", "resultType": "core"},
+        )
+        parsed = EuropePMCArticleResponse.model_validate(response.json())
+        if parsed.result:
+            return parsed.result
+        logger.warning("No Europe PMC result for PMID %d", pmid)
+        return None
+
+    async def _fetch_uncached(self, pmids: list[int]) -> dict[int, EuropePMCResult | None]:
+        """Results per PMID from the store or API; PMIDs whose request failed are left out."""
+        cached, to_fetch = await self._store_lookup(pmids)
+        tasks = [self._fetch_one(pmid) for pmid in to_fetch]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        publications: list[EuropePMCResult] = []
-        for pmid, result in zip(pmids, results):
+        values: dict[int, EuropePMCResult | None] = {
+            pmid: EuropePMCResult.model_validate(p) if p is not None else None for pmid, p in cached.items()
+        }
+        entries: dict[int, dict | None] = {}
+        for pmid, result in zip(to_fetch, results):
             if isinstance(result, Exception):
                 logger.error("Failed to fetch PMID %d from Europe PMC: %s", pmid, result)
-            elif result is not None:
-                publications.append(result)
+                self._record_failure([pmid], result)
+                continue
+            entries[pmid] = result.model_dump(mode="json") if result is not None else None
+            values[pmid] = result
+        await self._store_save(entries)
+        return values
 
+    async def fetch_publications(
+        self, pmids: list[int]
+    ) -> list[EuropePMCResult]:
+        logger.info("Fetching %d publications from Europe PMC", len(pmids))
+        values = await self._coalesced(pmids)
+        publications = [p for p in values.values() if p is not None]
         logger.info("Successfully fetched %d/%d publications", len(publications), len(pmids))
         return publications
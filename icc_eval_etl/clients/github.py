@@ -1,42 +1,99 @@
 import asyncio
 import logging
 import os
+import time
 
 import httpx
 from tenacity import (
     retry,
+    retry_all,
     retry_if_result,
     stop_after_attempt,
     wait_exponential,
+    wait_random,
 )
 
+from icc_eval_etl.clients.rate_coordinator import RateCoordinator
+from icc_eval_etl.clients.resilience import CircuitOpenError, Resilience, is_host_failure
 from icc_eval_etl.models.github import GitHubRepo
+from icc_eval_etl.pipeline.failure_ledger import FailureLedger
+from icc_eval_etl.pipeline.telemetry import RunTelemetry
 
 logger = logging.getLogger(__name__)
 
 GITHUB_API_BASE = "https://api.github.com"
 RESULTS_PER_PAGE = 100
+# Search API: 30 req/min authenticated, 10 req/min without a token
+RATE_LIMIT = 30 / 60  # requests/sec
+UNAUTHENTICATED_RATE_LIMIT = 10 / 60
+MAX_ATTEMPTS = 5
 
 
 def _should_retry(response: httpx.Response) -> bool:
     return response.status_code in (403, 429) or response.status_code >= 500
 
 
+def _within_budget(retry_state) -> bool:
+    client = retry_state.args[0]
+    # 403/429 rate limiting is paced by backoff alone; the budget is for a failing host.
+    if client._resilience is None or not is_host_failure(retry_state.outcome.result()):
+        return True
+    # tenacity asks before checking stop: the last attempt ends in _raise_last_response without a retry to pay for.
+    if retry_state.attempt_number >= MAX_ATTEMPTS:
+        return True
+    if client._resilience.budget.try_spend(client.name):
+        return True
+    # Out of retry budget: fail with the status error, as on retry exhaustion.
+    _raise_last_response(retry_state)
+
+
+def _before_sleep(retry_state) -> None:
+    logger.warning(
+        "GitHub API returned %d, retrying in %.1fs (attempt %d)",
+        retry_state.outcome.result().status_code,
+        retry_state.next_action.sleep,
+        retry_state.attempt_number,
+    )
+    client = retry_state.args[0]
+    if client._telemetry is not None:
+        client._telemetry.record_retry(client.name)
+
+
 def _raise_last_response(retry_state) -> None:
     """On retry exhaustion, raise the HTTP status error from the last response."""
     response = retry_state.outcome.result()
-    response.raise_for_status()
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        # Read by the failure ledger.
+        exc.attempts = retry_state.attempt_number
+        raise
 
 
 class GitHubClient:
     """Async GitHub client for searching repositories by topic."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        telemetry: RunTelemetry | None = None,
+        rate_coordinator: RateCoordinator | None = None,
+        rate_limit: float | None = None,
+        ledger: FailureLedger | None = None,
+        resilience: Resilience | None = None,
+    ):
+        self.name = type(self).__name__
+        self._telemetry = telemetry
+        self._ledger = ledger
+        self._resilience = resilience
+        self._breaker = resilience.breaker(httpx.URL(GITHUB_API_BASE).host) if resilience is not None else None
+        self._rate_coordinator = rate_coordinator
         headers = {
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28",
         }
         token = os.environ.get("GITHUB_TOKEN")
+        self._min_interval = 1.0 / (rate_limit or (RATE_LIMIT if token else UNAUTHENTICATED_RATE_LIMIT))
         if token:
             headers["Authorization"] = f"Bearer {token}"
             logger.info("GitHub client: using authenticated requests")
@@ -49,22 +106,40 @@ class GitHubClient:
             base_url=GITHUB_API_BASE,
             headers=headers,
             timeout=60.0,
+            transport=transport,
         )
 
     @retry(
-        retry=retry_if_result(_should_retry),
-        stop=stop_after_attempt(5),
-        wait=wait_exponential(multiplier=2, min=2, max=120),
+        retry=retry_all(retry_if_result(_should_retry), _within_budget),
+        stop=stop_after_attempt(MAX_ATTEMPTS),
+        wait=wait_exponential(multiplier=2, min=2, max=120) + wait_random(0, 2),
         retry_error_callback=_raise_last_response,
-        before_sleep=lambda retry_state: logger.warning(
-            "GitHub API returned %d, retrying in %.1fs (attempt %d)",
-            retry_state.outcome.result().status_code,
-            retry_state.next_action.sleep,
-            retry_state.attempt_number,
-        ),
+        before_sleep=_before_sleep,
     )
     async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
-        response = await self._client.request(method, path, **kwargs)
+        if self._breaker is not None:
+            await self._breaker.acquire()
+        if self._rate_coordinator is not None:
+            # Only sharded runs pace GitHub up front; single runs rely on retries.
+            delay = self._rate_coordinator.reserve(self.name, self._min_interval)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        start = time.perf_counter()
+        try:
+            response = await self._client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            if self._telemetry is not None:
+                self._telemetry.record_request(
+                    self.name, method, path, None, 0, time.perf_counter() - start,
+                )
+            self._record_outcome(None)
+            raise
+        if self._telemetry is not None:
+            self._telemetry.record_request(
+                self.name, method, path, response.status_code, len(response.content),
+                time.perf_counter() - start,
+            )
+        self._record_outcome(response)
         if _should_retry(response):
             # Check for Retry-After header on rate limit responses
             retry_after = response.headers.get("Retry-After")
@@ -76,6 +151,11 @@ class GitHubClient:
         response.raise_for_status()
         return response
 
+    def _record_outcome(self, response: httpx.Response | None) -> None:
+        if self._resilience is not None:
+            self._resilience.budget.record_request()
+            self._breaker.record(response)
+
     async def search_repos_by_topic(self, topic: str) -> list[GitHubRepo]:
         """Search GitHub for repositories tagged with the given topic."""
         repos: list[GitHubRepo] = []
@@ -120,11 +200,11 @@ class GitHubClient:
             logger.info("GitHub: searching repos with topic '%s'", topic)
             try:
                 results = await self.search_repos_by_topic(topic)
-            except httpx.HTTPStatusError as exc:
-                logger.error(
-                    "GitHub: failed to search topic '%s' (HTTP %d), skipping",
-                    topic, exc.response.status_code,
-                )
+            except (httpx.HTTPStatusError, CircuitOpenError) as exc:
+                reason = f"HTTP {exc.response.status_code}" if isinstance(exc, httpx.HTTPStatusError) else str(exc)
+                logger.error("GitHub: failed to search topic '%s' (%s), skipping", topic, reason)
+                if self._ledger is not None:
+                    self._ledger.record(self.name, [project_id], exc)
                 continue
             logger.info(
                 "GitHub: found %d repos for topic '%s'", len(results), topic,
@@ -1,34 +1,73 @@
+import asyncio
 import logging
 
+import httpx
+
 from icc_eval_etl.clients.base import BaseClient
+from icc_eval_etl.clients.coalesce import Coalescer
+from icc_eval_etl.entity_store import store_entries
 from icc_eval_etl.models.icite import ICiteRecord, ICiteResponse
+from icc_eval_etl.snapshots.icite import ICiteSnapshot
 
 logger = logging.getLogger(__name__)
 
 ICITE_BASE = "https://icite.od.nih.gov"
+RATE_LIMIT = 5.0  # requests/sec
 BATCH_SIZE = 200
 
 
 class ICiteClient(BaseClient):
-    def __init__(self, **kwargs):
-        super().__init__(base_url=ICITE_BASE, rate_limit=5.0, **kwargs)
+    STORE_SOURCE = "icite"
 
-    async def fetch_metrics(self, pmids: list[int]) -> list[ICiteRecord]:
-        all_results: list[ICiteRecord] = []
+    def __init__(self, snapshot: ICiteSnapshot | None = None, **kwargs):
+        kwargs.setdefault("rate_limit", RATE_LIMIT)
+        super().__init__(base_url=ICITE_BASE, **kwargs)
+        self._snapshot = snapshot
+        self._coalescer = Coalescer(self.name, self._fetch_uncached)
+
+    async def _snapshot_lookup(self, pmids: list[int]) -> tuple[list[ICiteRecord], list[int]]:
+        """Records the local snapshot has, and the PMIDs left for the API."""
+        if self._snapshot is None or not pmids:
+            return [], pmids
+        rows = await asyncio.to_thread(self._snapshot.lookup, pmids)
+        missing = [p for p in pmids if p not in rows]
+        logger.info("iCite: %d/%d PMIDs served from snapshot, %d left for the API", len(rows), len(pmids), len(missing))
+        if self._telemetry is not None:
+            self._telemetry.record_event("icite_snapshot", requested=len(pmids), found=len(rows))
+        return [ICiteRecord.model_validate(r) for r in rows.values()], missing
+
+    async def _fetch_uncached(self, pmids: list[int]) -> dict[int, ICiteRecord | None]:
+        from_snapshot, pmids = await self._snapshot_lookup(pmids)
+        cached, pmids = await self._store_lookup(pmids)
+        values: dict[int, ICiteRecord | None] = {r.pmid: r for r in from_snapshot}
+        values.update((p, ICiteRecord.model_validate(c) if c is not None else None) for p, c in cached.items())
+        fetched = 0
 
         for i in range(0, len(pmids), BATCH_SIZE):
             batch = pmids[i : i + BATCH_SIZE]
             pmid_str = ",".join(str(p) for p in batch)
-            response = await self._request(
-                "GET",
-                "/api/pubs",
-                params={"pmids": pmid_str, "format": "json"},
-            )
+            try:
+                response = await self._request(
+                    "GET",
+                    "/api/pubs",
+                    params={"pmids": pmid_str, "format": "json"},
+                )
+            except httpx.HTTPError as exc:
+                logger.error("iCite: batch %d-%d failed (%s), skipping", i, i + len(batch), exc)
+                self._record_failure(batch, exc)
+                continue
             parsed = ICiteResponse.model_validate(response.json())
-            all_results.extend(parsed.data)
+            fetched += len(parsed.data)
+            values.update(dict.fromkeys(batch))
+            values.update((r.pmid, r) for r in parsed.data if r.pmid is not None)
+            await self._store_save(store_entries(batch, parsed.data, lambda r: r.pmid))
             logger.info(
                 "iCite: fetched %d/%d (batch %d-%d)",
-                len(all_results), len(pmids), i, min(i + BATCH_SIZE, len(pmids)),
+                fetched, len(pmids), i, min(i + BATCH_SIZE, len(pmids)),
             )
 
-        return all_results
+        return values
+
+    async def fetch_metrics(self, pmids: list[int]) -> list[ICiteRecord]:
+        values = await self._coalesced(pmids)
+        return [r for r in values.values() if r is not None]
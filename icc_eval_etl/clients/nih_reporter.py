@@ -15,18 +15,24 @@ from icc_eval_etl.models.nih_reporter import (
 logger = logging.getLogger(__name__)
 
 NIH_REPORTER_BASE = "https://api.reporter.nih.gov"
+RATE_LIMIT = 1.0  # requests/sec
+PAGE_SIZE = 500
+# The search endpoints stop paging past these offsets.
+PROJECTS_MAX_OFFSET = 14999
+PUBLICATIONS_MAX_OFFSET = 9999
 
 
 class NIHReporterClient(BaseClient):
     def __init__(self, **kwargs):
-        super().__init__(base_url=NIH_REPORTER_BASE, rate_limit=1.0, **kwargs)
+        kwargs.setdefault("rate_limit", RATE_LIMIT)
+        super().__init__(base_url=NIH_REPORTER_BASE, **kwargs)
 
     async def search_projects(
         self, core_project_nums: list[str]
     ) -> list[ProjectRecord]:
         all_results: list[ProjectRecord] = []
         offset = 0
-        limit = 500
+        limit = PAGE_SIZE
 
         while True:
             request = ProjectSearchRequest(
@@ -45,7 +51,7 @@ class NIHReporterClient(BaseClient):
                 "Projects: fetched %d/%d (offset=%d)",
                 len(all_results), parsed.meta.total, offset,
             )
-            if offset + limit >= parsed.meta.total or offset + limit > 14999:
+            if offset + limit >= parsed.meta.total or offset + limit > PROJECTS_MAX_OFFSET:
                 break
             offset += limit
 
@@ -56,7 +62,7 @@ class NIHReporterClient(BaseClient):
     ) -> list[PublicationLinkRecord]:
         all_results: list[PublicationLinkRecord] = []
         offset = 0
-        limit = 500
+        limit = PAGE_SIZE
 
         while True:
             request = PublicationSearchRequest(
@@ -75,7 +81,7 @@ class NIHReporterClient(BaseClient):
                 "Publication links: fetched %d/%d (offset=%d)",
                 len(all_results), parsed.meta.total, offset,
             )
-            if offset + limit >= parsed.meta.total or offset + limit > 9999:
+            if offset + limit >= parsed.meta.total or offset + limit > PUBLICATIONS_MAX_OFFSET:
                 break
             offset += limit
 
@@ -1,18 +1,34 @@
+import asyncio
 import logging
 import os
 
+import httpx
+
 from icc_eval_etl.clients.base import BaseClient
+from icc_eval_etl.clients.coalesce import Coalescer
+from icc_eval_etl.entity_store import store_entries
 from icc_eval_etl.models.openalex import OpenAlexWork, OpenAlexResponse
+from icc_eval_etl.snapshots.openalex import OpenAlexSnapshot, pmid_from_ids
 
 logger = logging.getLogger(__name__)
 
 OPENALEX_BASE = "https://api.openalex.org"
+RATE_LIMIT = 10.0  # requests/sec
 BATCH_SIZE = 50  # max 100 pipe-separated values per filter, stay conservative
 
 
+def work_pmid(work: OpenAlexWork) -> int | None:
+    return pmid_from_ids(work.ids)
+
+
 class OpenAlexClient(BaseClient):
-    def __init__(self, **kwargs):
-        super().__init__(base_url=OPENALEX_BASE, rate_limit=10.0, **kwargs)
+    STORE_SOURCE = "openalex"
+
+    def __init__(self, snapshot: OpenAlexSnapshot | None = None, **kwargs):
+        kwargs.setdefault("rate_limit", RATE_LIMIT)
+        super().__init__(base_url=OPENALEX_BASE, **kwargs)
+        self._snapshot = snapshot
+        self._coalescer = Coalescer(self.name, self._fetch_uncached)
         self._api_key = os.environ.get("OPENALEX_API_KEY")
         if not self._api_key:
             logger.warning(
@@ -25,9 +41,30 @@ class OpenAlexClient(BaseClient):
             params["api_key"] = self._api_key
         return params
 
-    async def fetch_works(self, pmids: list[int]) -> list[OpenAlexWork]:
-        """Fetch OpenAlex work records for a list of PMIDs."""
-        all_results: list[OpenAlexWork] = []
+    async def _snapshot_lookup(self, pmids: list[int]) -> tuple[list[OpenAlexWork], list[int]]:
+        """Works the local snapshot has, and the PMIDs left for the API."""
+        if self._snapshot is None or not pmids:
+            return [], pmids
+        works = await asyncio.to_thread(self._snapshot.lookup, pmids)
+        missing = [p for p in pmids if p not in works]
+        logger.info(
+            "OpenAlex: %d/%d PMIDs served from snapshot, %d left for the API", len(works), len(pmids), len(missing),
+        )
+        if self._telemetry is not None:
+            self._telemetry.record_event("openalex_snapshot", requested=len(pmids), found=len(works))
+        return [OpenAlexWork.model_validate(w) for w in works.values()], missing
+
+    async def _fetch_uncached(self, pmids: list[int]) -> dict[int, list[OpenAlexWork]]:
+        """Works per PMID (an empty list when OpenAlex has none) from the snapshot, store or API."""
+        from_snapshot, pmids = await self._snapshot_lookup(pmids)
+        cached, pmids = await self._store_lookup(pmids)
+        # Entries stored before payloads became lists hold a single work and may have lost others.
+        legacy = [p for p, c in cached.items() if isinstance(c, dict)]
+        for pmid in legacy:
+            del cached[pmid]
+        pmids = [*pmids, *legacy]
+        values: dict[int, list[OpenAlexWork]] = {work_pmid(w): [w] for w in from_snapshot}
+        values.update((p, [OpenAlexWork.model_validate(w) for w in c or []]) for p, c in cached.items())
 
         for i in range(0, len(pmids), BATCH_SIZE):
             batch = pmids[i : i + BATCH_SIZE]
@@ -39,17 +76,28 @@ class OpenAlexClient(BaseClient):
             params["cursor"] = "*"
             batch_results: list[OpenAlexWork] = []
 
-            while True:
-                response = await self._request("GET", "/works", params=params)
-                parsed = OpenAlexResponse.model_validate(response.json())
-                batch_results.extend(parsed.results)
+            try:
+                while True:
+                    response = await self._request("GET", "/works", params=params)
+                    parsed = OpenAlexResponse.model_validate(response.json())
+                    batch_results.extend(parsed.results)
 
-                next_cursor = parsed.meta.get("next_cursor")
-                if not next_cursor or not parsed.results:
-                    break
-                params["cursor"] = next_cursor
+                    next_cursor = parsed.meta.get("next_cursor")
+                    if not next_cursor or not parsed.results:
+                        break
+                    params["cursor"] = next_cursor
+            except httpx.HTTPError as exc:
+                logger.error("OpenAlex: batch %d-%d failed (%s), skipping", i, i + len(batch), exc)
+                self._record_failure(batch, exc)
+                continue
 
-            all_results.extend(batch_results)
+            for pmid in batch:
+                values[pmid] = []
+            for work in batch_results:
+                pmid = work_pmid(work)
+                if pmid is not None:
+                    values.setdefault(pmid, []).append(work)
+            await self._store_save(store_entries(batch, batch_results, work_pmid, many=True))
             logger.info(
                 "OpenAlex: fetched %d/%d PMIDs (batch %d-%d, got %d works)",
                 min(i + BATCH_SIZE, len(pmids)),
@@ -59,4 +107,9 @@ class OpenAlexClient(BaseClient):
                 len(batch_results),
             )
 
-        return all_results
+        return values
+
+    async def fetch_works(self, pmids: list[int]) -> list[OpenAlexWork]:
+        """Fetch OpenAlex work records for a list of PMIDs."""
+        values = await self._coalesced(pmids)
+        return [w for works in values.values() for w in works]
@@ -0,0 +1,30 @@
+import threading
+import time
+from multiprocessing.managers import BaseManager
+
+
+class RateCoordinator:
+    """Hands out request slots per key so several processes share one rate limit.
+
+    Lives in a manager process (see RateCoordinatorManager); clients call
+    reserve() through the proxy and sleep for the returned delay.
+    """
+
+    def __init__(self):
+        self._next_slot: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, interval: float) -> float:
+        """Claim the next slot for key; returns seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(key, 0.0))
+            self._next_slot[key] = slot + interval
+            return slot - now
+
+
+class RateCoordinatorManager(BaseManager):
+    pass
+
+
+RateCoordinatorManager.register("RateCoordinator", RateCoordinator)
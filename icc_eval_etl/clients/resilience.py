@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+
+from icc_eval_etl.pipeline.telemetry import RunTelemetry
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+# Consecutive 5xx/transport failures that open a host's breaker.
+FAILURE_THRESHOLD = 5
+COOLDOWN = 10.0  # seconds before a probe; doubles each time a probe fails
+MAX_COOLDOWN = 300.0
+# Failed probes in a row after which queued work stops waiting and fails fast.
+MAX_FAILED_PROBES = 3
+# Retries of host failures per run: RETRY_RATIO of requests made, but never fewer than MIN_RETRIES.
+RETRY_RATIO = 0.2
+MIN_RETRIES = 20
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending when a host's breaker is open and no longer worth waiting on."""
+
+
+def backoff(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with equal jitter: half fixed, half random."""
+    delay = min(cap, base * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def is_host_failure(response: httpx.Response | None) -> bool:
+    """5xx and transport errors (response None) count against a host; 4xx and 429 do not."""
+    return response is None or response.status_code >= 500
+
+
+class RetryBudget:
+    """Retries shared by every client in a run, bounded relative to requests made."""
+
+    def __init__(
+        self, ratio: float = RETRY_RATIO, min_retries: int = MIN_RETRIES, telemetry: RunTelemetry | None = None,
+    ):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.requests = 0
+        self.retries = 0
+        self._telemetry = telemetry
+        self._exhausted_logged = False
+
+    @property
+    def exhausted(self) -> bool:
+        return self.retries >= max(self.min_retries, self.ratio * self.requests)
+
+    def record_request(self) -> None:
+        self.requests += 1
+
+    def try_spend(self, client: str) -> bool:
+        if self.exhausted:
+            if not self._exhausted_logged:
+                self._exhausted_logged = True
+                logger.error(
+                    "Retry budget exhausted (%d retries for %d requests); %s and later failures are not retried",
+                    self.retries, self.requests, client,
+                )
+                if self._telemetry is not None:
+                    self._telemetry.record_event(
+                        "retry_budget_exhausted", client=client, retries=self.retries, requests=self.requests,
+                    )
+            return False
+        self.retries += 1
+        return True
+
+
+class CircuitBreaker:
+    """Closed -> open after FAILURE_THRESHOLD consecutive host failures -> half-open probe -> closed.
+
+    While open, callers of acquire() wait out the cooldown; the first one
+    after it becomes the half-open probe and the rest wait for its outcome.
+    A failed probe reopens the breaker with double the cooldown. After
+    MAX_FAILED_PROBES failed probes in a row, or once the run's retry
+    budget is spent, callers arriving during the cooldown fail at once with
+    CircuitOpenError; a probe still goes out after each cooldown.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        budget: RetryBudget | None = None,
+        telemetry: RunTelemetry | None = None,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        cooldown: float = COOLDOWN,
+    ):
+        self.host = host
+        self.state = CLOSED
+        self._budget = budget
+        self._telemetry = telemetry
+        self._failure_threshold = failure_threshold
+        self._base_cooldown = cooldown
+        self._cooldown = cooldown
+        self._failures = 0
+        self._failed_probes = 0
+        self._opened_at = 0.0
+        self._probe_done = asyncio.Event()
+
+    def _transition(self, state: str) -> None:
+        previous, self.state = self.state, state
+        log = logger.warning if state == OPEN else logger.info
+        log(
+            "Circuit breaker for %s: %s -> %s (%d consecutive failures%s)",
+            self.host, previous, state, self._failures,
+            f", next probe in {self._cooldown:.0f}s" if state == OPEN else "",
+        )
+        if self._telemetry is not None:
+            self._telemetry.record_event(
+                "circuit_breaker", host=self.host, state=state, previous=previous,
+                failures=self._failures, cooldown=self._cooldown,
+            )
+
+    async def acquire(self) -> None:
+        """Wait until a request to the host may be sent."""
+        while self.state != CLOSED:
+            if self.state == OPEN:
+                wait = self._opened_at + self._cooldown - time.monotonic()
+                if wait > 0:
+                    if self._failed_probes >= MAX_FAILED_PROBES:
+                        raise CircuitOpenError(f"circuit open for {self.host} after {self._failed_probes} failed probes")
+                    if self._budget is not None and self._budget.exhausted:
+                        raise CircuitOpenError(f"circuit open for {self.host} and retry budget exhausted")
+                    await asyncio.sleep(wait)
+                    continue
+                self._probe_done = asyncio.Event()
+                self._transition(HALF_OPEN)
+                return
+            # Half-open: wait for the probe, or take over if it never reports back.
+            try:
+                await asyncio.wait_for(self._probe_done.wait(), self._cooldown)
+            except asyncio.TimeoutError:
+                if self.state == HALF_OPEN:
+                    return
+
+    def record(self, response: httpx.Response | None) -> None:
+        if is_host_failure(response):
+            self._failures += 1
+            if self.state == HALF_OPEN:
+                self._failed_probes += 1
+                self._cooldown = min(MAX_COOLDOWN, self._cooldown * 2)
+                self._open()
+            elif self.state == CLOSED and self._failures >= self._failure_threshold:
+                self._open()
+        else:
+            self._failures = 0
+            if self.state != CLOSED:
+                self._failed_probes = 0
+                self._cooldown = self._base_cooldown
+                self._transition(CLOSED)
+                self._probe_done.set()
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._transition(OPEN)
+        self._probe_done.set()
+
+
+class Resilience:
+    """Per-run retry budget and per-host circuit breakers shared by all clients."""
+
+    def __init__(self, telemetry: RunTelemetry | None = None, budget: RetryBudget | None = None):
+        self.telemetry = telemetry
+        self.budget = budget or RetryBudget(telemetry=telemetry)
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(host, self.budget, self.telemetry)
+        return self._breakers[host]
@@ -0,0 +1,146 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400.0
+# Citation counts move weekly; bibliographic metadata rarely changes.
+MAX_AGE = {
+    "icite": 7 * DAY,
+    "openalex": 30 * DAY,
+    "europepmc": 90 * DAY,
+}
+NEGATIVE_MAX_AGE = 1 * DAY
+_LOOKUP_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    source     TEXT    NOT NULL,
+    pmid       INTEGER NOT NULL,
+    payload    TEXT,
+    fetched_at REAL    NOT NULL,
+    PRIMARY KEY (source, pmid)
+) WITHOUT ROWID
+"""
+
+
+def store_entries(
+    pmids: Iterable[int],
+    records: Iterable[BaseModel],
+    pmid_of: Callable[[BaseModel], int | None],
+    many: bool = False,
+) -> dict[int, dict | list[dict] | None]:
+    """Entries for a fetched batch: a payload per returned record, None for PMIDs the source lacked.
+
+    With ``many`` (sources that can return several records for one PMID)
+    each payload is the list of that PMID's records.
+    """
+    entries: dict[int, dict | list[dict] | None] = dict.fromkeys(pmids)
+    for record in records:
+        pmid = pmid_of(record)
+        if pmid is None:
+            continue
+        payload = record.model_dump(mode="json")
+        if many:
+            entries[pmid] = [*(entries.get(pmid) or []), payload]
+        else:
+            entries[pmid] = payload
+    return entries
+
+
+class EntityStore:
+    """SQLite store of per-(source, PMID) payloads shared across collections and runs.
+
+    A NULL payload is a negative entry: the source had nothing for that
+    PMID. Entries older than the source's max age (or NEGATIVE_MAX_AGE for
+    negatives) are treated as missing and refetched. Clients call it from
+    worker threads (asyncio.to_thread), one call at a time.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_age: dict[str, float] | None = None,
+        negative_max_age: float = NEGATIVE_MAX_AGE,
+    ):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_age = {**MAX_AGE, **(max_age or {})}
+        self.negative_max_age = negative_max_age
+        # WAL lets concurrent runs read while one of them writes.
+        self._con = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.execute(_SCHEMA)
+
+    def get_many(self, source: str, pmids: list[int]) -> dict[int, dict | list[dict] | None]:
+        """Fresh entries for pmids; a None value is a fresh negative entry."""
+        now = time.time()
+        positive_cutoff = now - self.max_age.get(source, float("inf"))
+        negative_cutoff = now - self.negative_max_age
+        found: dict[int, dict | list[dict] | None] = {}
+        for i in range(0, len(pmids), _LOOKUP_CHUNK):
+            chunk = pmids[i : i + _LOOKUP_CHUNK]
+            with self._lock:
+                rows = self._con.execute(
+                    f"SELECT pmid, payload, fetched_at FROM entities "
+                    f"WHERE source = ? AND pmid IN ({','.join('?' * len(chunk))})",
+                    (source, *chunk),
+                ).fetchall()
+            for pmid, payload, fetched_at in rows:
+                if payload is None:
+                    if fetched_at >= negative_cutoff:
+                        found[pmid] = None
+                elif fetched_at >= positive_cutoff:
+                    found[pmid] = json.loads(payload)
+        return found
+
+    def put_many(self, source: str, entries: dict[int, dict | list[dict] | None]) -> None:
+        now = time.time()
+        with self._lock, self._con:
+            self._con.executemany(
+                "INSERT OR REPLACE INTO entities (source, pmid, payload, fetched_at) VALUES (?, ?, ?, ?)",
+                (
+                    (source, pmid, None if payload is None else json.dumps(payload), now)
+                    for pmid, payload in entries.items()
+                ),
+            )
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            rows = self._con.execute(
+                "SELECT source, count(*), count(*) FILTER (WHERE payload IS NULL) FROM entities "
+                "GROUP BY source ORDER BY source"
+            ).fetchall()
+        return {source: {"entries": n, "negative": neg} for source, n, neg in rows}
+
+    def compact(self) -> int:
+        """Delete expired entries and VACUUM; returns the number of rows deleted."""
+        now = time.time()
+        deleted = 0
+        with self._lock:
+            with self._con:
+                deleted += self._con.execute(
+                    "DELETE FROM entities WHERE payload IS NULL AND fetched_at < ?",
+                    (now - self.negative_max_age,),
+                ).rowcount
+                for source, max_age in self.max_age.items():
+                    deleted += self._con.execute(
+                        "DELETE FROM entities WHERE source = ? AND fetched_at < ?",
+                        (source, now - max_age),
+                    ).rowcount
+            self._con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._con.execute("VACUUM")
+        logger.info("Compacted entity store %s: deleted %d expired entries", self.path, deleted)
+        return deleted
+
+    def close(self) -> None:
+        self._con.close()
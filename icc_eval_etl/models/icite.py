@@ -22,8 +22,3 @@ class ICiteRecord(BaseModel):
 class ICiteResponse(BaseModel):
     model_config = ConfigDict(extra="allow")
     data: list[ICiteRecord] = []
-
-
-class CitationLink(BaseModel):
-    cited_pmid: int
-    citing_pmid: int
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import logging
+import shutil
+from array import array
+from collections.abc import Iterator
+from pathlib import Path
+
+from icc_eval_etl.clients.icite import BATCH_SIZE, ICiteClient
+from icc_eval_etl.models.icite import ICiteRecord
+from icc_eval_etl.pipeline.citation_graph import CitationGraph, sorted_difference, sorted_union
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "state.json"
+
+
+class CrawlLevel:
+    """One hop of the crawl: edges into this hop's PMIDs, and their iCite records."""
+
+    def __init__(self, hop: int, graph: CitationGraph, pmids: array, records: list[ICiteRecord]):
+        self.hop = hop
+        self.graph = graph
+        self.pmids = pmids
+        self.records = records
+
+
+class CitationCrawl:
+    def __init__(self, levels: list[CrawlLevel]):
+        self.levels = levels
+
+    def records(self) -> list[ICiteRecord]:
+        return [rec for level in self.levels for rec in level.records]
+
+    def pmids(self) -> array:
+        """Sorted unique PMIDs reached at any hop."""
+        out = array("q")
+        for level in self.levels:
+            out = sorted_union(out, level.pmids)
+        return out
+
+    def edge_lines(self) -> Iterator[str]:
+        for level in self.levels:
+            yield from level.graph.jsonl_lines(hop=level.hop)
+
+    @property
+    def num_edges(self) -> int:
+        return sum(level.graph.num_edges for level in self.levels)
+
+
+def _apply_budget(
+    frontier: array, hop: int, crawled: int, max_pmids: int | None, max_requests_per_level: int | None,
+) -> array:
+    cap = len(frontier)
+    if max_requests_per_level is not None:
+        cap = min(cap, max_requests_per_level * BATCH_SIZE)
+    if max_pmids is not None:
+        cap = min(cap, max(0, max_pmids - crawled))
+    if cap < len(frontier):
+        logger.warning(
+            "Citation crawl hop %d: frontier of %d PMIDs truncated to %d by request budget",
+            hop, len(frontier), cap,
+        )
+        return frontier[:cap]
+    return frontier
+
+
+class _Checkpoint:
+    """Per-level crawl checkpoints so an interrupted deep expansion can resume.
+
+    Removed once the crawl completes, so a later run in the same output
+    directory crawls afresh instead of reusing last run's levels.
+    """
+
+    def __init__(self, directory: Path, fingerprint: str):
+        self.directory = directory
+        self.fingerprint = fingerprint
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.completed = 0
+        state_path = directory / STATE_FILE
+        if state_path.exists():
+            state = json.loads(state_path.read_text())
+            if state.get("fingerprint") == fingerprint:
+                self.completed = state.get("completed_levels", 0)
+            else:
+                logger.info("Citation crawl checkpoint does not match this run, starting fresh")
+
+    def load(self, hop: int) -> CrawlLevel:
+        graph = CitationGraph.load(self.directory / f"level_{hop}.graph.bin")
+        pmids = array("q")
+        with open(self.directory / f"level_{hop}.pmids.bin", "rb") as f:
+            pmids.frombytes(f.read())
+        records = []
+        with open(self.directory / f"level_{hop}.jsonl") as f:
+            for line in f:
+                records.append(ICiteRecord.model_validate_json(line))
+        return CrawlLevel(hop, graph, pmids, records)
+
+    def save(self, level: CrawlLevel) -> None:
+        level.graph.save(self.directory / f"level_{level.hop}.graph.bin")
+        with open(self.directory / f"level_{level.hop}.pmids.bin", "wb") as f:
+            level.pmids.tofile(f)
+        with open(self.directory / f"level_{level.hop}.jsonl", "w") as f:
+            for rec in level.records:
+                f.write(rec.model_dump_json() + "\n")
+        self.completed = level.hop
+        (self.directory / STATE_FILE).write_text(
+            json.dumps({"fingerprint": self.fingerprint, "completed_levels": level.hop})
+        )
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _fingerprint(
+    seed_graph: CitationGraph, seed_pmids: array, max_pmids: int | None, max_requests_per_level: int | None,
+) -> str:
+    """Identity of a crawl's inputs: seeds, the step-5 citation graph and the budgets."""
+    h = hashlib.sha256(seed_pmids.tobytes())
+    for part in (seed_graph.cited, seed_graph.offsets, seed_graph.citing):
+        h.update(len(part).to_bytes(8, "little"))
+        h.update(part.tobytes())
+    h.update(json.dumps([max_pmids, max_requests_per_level]).encode())
+    return h.hexdigest()
+
+
+async def crawl_citations(
+    icite: ICiteClient,
+    seed_graph: CitationGraph,
+    seed_pmids: array,
+    depth: int = 1,
+    max_pmids: int | None = None,
+    max_requests_per_level: int | None = None,
+    checkpoint_dir: Path | None = None,
+) -> CitationCrawl:
+    """Expand the citation neighbourhood of the grant PMIDs ``depth`` hops out.
+
+    Hop 1 is the papers citing the grant publications (``seed_graph``); hop
+    N+1 is the papers citing hop N. A global visited set (sorted int64 array)
+    guarantees no PMID is fetched twice, and each level's frontier is capped
+    by ``max_requests_per_level`` (in iCite batches) and the overall
+    ``max_pmids`` budget. Every completed level is checkpointed under
+    ``checkpoint_dir``; checkpoints are only reused when the seeds, seed
+    graph and budgets match, and are removed when the crawl finishes.
+    """
+    checkpoint = (
+        _Checkpoint(checkpoint_dir, _fingerprint(seed_graph, seed_pmids, max_pmids, max_requests_per_level))
+        if checkpoint_dir is not None
+        else None
+    )
+    visited = seed_pmids
+    graph = seed_graph
+    levels: list[CrawlLevel] = []
+    crawled = 0
+
+    for hop in range(1, depth + 1):
+        if checkpoint is not None and hop <= checkpoint.completed:
+            level = checkpoint.load(hop)
+            logger.info(
+                "Citation crawl hop %d: resumed %d PMIDs from checkpoint", hop, len(level.pmids),
+            )
+        else:
+            frontier = sorted_difference(graph.citing_pmids(), visited)
+            frontier = _apply_budget(frontier, hop, crawled, max_pmids, max_requests_per_level)
+            if not frontier:
+                logger.info("Citation crawl hop %d: frontier empty, stopping", hop)
+                if graph.num_edges:
+                    levels.append(CrawlLevel(hop, graph, frontier, []))
+                break
+            logger.info("Citation crawl hop %d: fetching iCite records for %d PMIDs", hop, len(frontier))
+            records = await icite.fetch_metrics(frontier.tolist())
+            level = CrawlLevel(hop, graph, frontier, records)
+            if checkpoint is not None:
+                checkpoint.save(level)
+
+        for rec in level.records:
+            rec.hop = hop
+        levels.append(level)
+        visited = sorted_union(visited, level.pmids)
+        crawled += len(level.pmids)
+        graph = CitationGraph.from_icite(level.records)
+
+    if checkpoint is not None:
+        checkpoint.clear()
+    return CitationCrawl(levels)
@@ -0,0 +1,90 @@
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
+from icc_eval_etl.pipeline.telemetry import StepStats
+
+logger = logging.getLogger(__name__)
+
+FAILED_ITEMS_FILENAME = "failed_items.jsonl"
+# Output file each step's per-key fetches end up in.
+STEP_FILES = {
+    "publications": "publications.jsonl",
+    "icite": "icite.jsonl",
+    "citation_crawl": "citing_icite.jsonl",
+    "openalex": "openalex.jsonl",
+    "citing_openalex": "citing_openalex.jsonl",
+    "github": "github_core.jsonl",
+}
+
+
+def attempts_of(exc: BaseException) -> int:
+    """Attempts made before exc was raised, as tagged by the clients' retry loops."""
+    return getattr(exc, "attempts", 1)
+
+
+class FailureLedger:
+    """Keys a client gave up on, with error class and attempt count, per output file.
+
+    Registered as a RunTelemetry listener so each failure is filed under the
+    step (and so the output file) that was running. Written to
+    failed_items.jsonl for ``main.py repair`` to re-drive.
+    """
+
+    def __init__(self):
+        self.entries: dict[tuple[str, int | str], dict] = {}
+        self._step: str | None = None
+
+    def step_started(self, stats: StepStats) -> None:
+        self._step = stats.name
+
+    def step_finished(self, stats: StepStats) -> None:
+        self._step = None
+
+    def record(self, client: str, keys: list, exc: BaseException, file: str | None = None) -> None:
+        file = file or STEP_FILES.get(self._step)
+        if file is None:
+            logger.warning("%s: %d failed key(s) outside a repairable step, not recorded", client, len(keys))
+            return
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        for key in keys:
+            previous = self.entries.get((file, key))
+            self.entries[(file, key)] = {
+                "file": file,
+                "key": key,
+                "client": client,
+                "step": self._step,
+                "error": type(exc).__name__,
+                "message": str(exc)[:500],
+                "attempts": attempts_of(exc) + (previous["attempts"] if previous else 0),
+                "time": now,
+            }
+
+    def resolve(self, file: str, keys: list) -> None:
+        for key in keys:
+            self.entries.pop((file, key), None)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def load(cls, path: Path) -> "FailureLedger":
+        ledger = cls()
+        if path.exists():
+            with open(path) as f:
+                for line in f:
+                    entry = json.loads(line)
+                    ledger.entries[(entry["file"], entry["key"])] = entry
+        return ledger
+
+    def write(self, output_dir: Path) -> Path:
+        """Write failed_items.jsonl (empty when nothing failed, so stale ledgers are cleared)."""
+        path = output_dir / FAILED_ITEMS_FILENAME
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+        if self.entries:
+            logger.warning("%d failed item(s) recorded in %s; run `main.py repair` to re-drive them", len(self), path)
+        return path
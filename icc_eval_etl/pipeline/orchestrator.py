@@ -1,116 +1,230 @@
 import logging
+from array import array
 from pathlib import Path
 
+import httpx
+
 from icc_eval_etl.clients.europepmc import EuropePMCClient
 from icc_eval_etl.clients.github import GitHubClient
 from icc_eval_etl.clients.icite import ICiteClient
 from icc_eval_etl.clients.nih_reporter import NIHReporterClient
 from icc_eval_etl.clients.openalex import OpenAlexClient
+from icc_eval_etl.clients.rate_coordinator import RateCoordinator
+from icc_eval_etl.clients.resilience import Resilience
+from icc_eval_etl.entity_store import EntityStore
 from icc_eval_etl.models.config import CollectionConfig
-from icc_eval_etl.models.icite import CitationLink
-from icc_eval_etl.pipeline.writers import JSONLWriter
+from icc_eval_etl.pipeline.citation_crawl import crawl_citations
+from icc_eval_etl.pipeline.citation_graph import CitationGraph, sorted_difference
+from icc_eval_etl.pipeline.failure_ledger import FailureLedger
+from icc_eval_etl.pipeline.profiling import PROFILE_DIRNAME, StepProfiler
+from icc_eval_etl.pipeline.telemetry import RunTelemetry
+from icc_eval_etl.pipeline.writers import ChangeLog, JSONLWriter
+from icc_eval_etl.snapshots.icite import ICiteSnapshot
+from icc_eval_etl.snapshots.openalex import OpenAlexSnapshot
 
 logger = logging.getLogger(__name__)
 
 
-async def run_pipeline(config: CollectionConfig, output_dir: Path) -> None:
+async def run_pipeline(
+    config: CollectionConfig,
+    output_dir: Path,
+    citation_depth: int = 1,
+    max_citing_pmids: int | None = None,
+    max_requests_per_level: int | None = None,
+    transport: httpx.AsyncBaseTransport | None = None,
+    rate_limit: float | None = None,
+    trace_spans: bool = False,
+    profile: bool = False,
+    slow_callback_seconds: float = 0.1,
+    store_path: Path | None = None,
+    rate_coordinator: RateCoordinator | None = None,
+    icite_snapshot: Path | None = None,
+    openalex_snapshot: Path | None = None,
+    openalex_index: Path | None = None,
+    openalex_workers: int | None = None,
+    concurrency: dict[str, tuple[int, int]] | None = None,
+    track_changes: bool = True,
+) -> RunTelemetry:
+    """Run the 10-step ETL for a collection, writing JSONL into output_dir.
+
+    ``transport`` and ``rate_limit`` override the HTTP transport and the
+    per-client request rates (used by the offline benchmarks). A
+    run_report.json with per-step and per-client telemetry is written
+    alongside the output whether or not the run succeeds. With ``profile``,
+    per-step cProfile files, tracemalloc peaks and event-loop stalls longer
+    than ``slow_callback_seconds`` go to output_dir/profile/. ``store_path``
+    enables the shared entity store for the iCite, OpenAlex and Europe PMC
+    clients. ``rate_coordinator`` shares per-client request rates with
+    other shard processes. ``icite_snapshot`` is an index built by
+    ensure_icite_index; iCite lookups are served from it before the API.
+    ``openalex_snapshot`` (with its PMID index at ``openalex_index``) does
+    the same for OpenAlex in steps 8 and 9, reading partitions in
+    ``openalex_workers`` processes (default: one per CPU). ``concurrency`` overrides the
+    clients' adaptive in-flight bounds per host. Keys the clients gave up
+    on are written to failed_items.jsonl for ``main.py repair``. With
+    ``track_changes``, per-record changesets against the previous run go to
+    output_dir/changes/ (off for shards; run_sharded tracks the merge).
+    """
     core_nums = [k.upper() for k in config.core_project_identifiers]
     logger.info("Starting ETL for %d core project(s): %s", len(core_nums), core_nums)
 
-    writer = JSONLWriter(output_dir)
-    nih = NIHReporterClient()
-    epmc = EuropePMCClient()
-    icite = ICiteClient()
-    github = GitHubClient()
-    openalex = OpenAlexClient()
-
+    telemetry = RunTelemetry(record_spans=trace_spans)
+    ledger = FailureLedger()
+    telemetry.add_listener(ledger)
+    profiler = None
+    if profile:
+        profiler = StepProfiler(output_dir / PROFILE_DIRNAME, slow_callback_seconds)
+        telemetry.add_listener(profiler)
+        profiler.start()
+    changes = ChangeLog.start(output_dir, telemetry) if track_changes else None
+    writer = JSONLWriter(output_dir, telemetry=telemetry, changes=changes)
+    store = EntityStore(store_path) if store_path is not None else None
+    # One retry budget for the run; one circuit breaker per host.
+    resilience = Resilience(telemetry)
+    client_kwargs: dict = {
+        "transport": transport, "telemetry": telemetry, "store": store, "rate_coordinator": rate_coordinator,
+        "ledger": ledger, "resilience": resilience, "concurrency": concurrency,
+    }
+    if rate_limit is not None:
+        client_kwargs["rate_limit"] = rate_limit
+    nih = NIHReporterClient(**client_kwargs)
+    epmc = EuropePMCClient(**client_kwargs)
+    snapshot = ICiteSnapshot(icite_snapshot) if icite_snapshot is not None else None
+    icite = ICiteClient(snapshot=snapshot, **client_kwargs)
+    github = GitHubClient(
+        transport=transport, telemetry=telemetry, rate_coordinator=rate_coordinator, rate_limit=rate_limit,
+        ledger=ledger, resilience=resilience,
+    )
+    openalex_snap = (
+        OpenAlexSnapshot(openalex_snapshot, openalex_index, workers=openalex_workers)
+        if openalex_snapshot is not None else None
+    )
+    openalex = OpenAlexClient(snapshot=openalex_snap, **client_kwargs)
+
+    status, error = "ok", None
     try:
         # Step 1: Fetch project records
-        logger.info("Step 1/10: Fetching project records from NIH Reporter")
-        projects = await nih.search_projects(core_nums)
-        path = writer.write("projects.jsonl", projects)
-        logger.info("Wrote %d project records to %s", len(projects), path)
+        with telemetry.step(1, "projects"):
+            logger.info("Step 1/10: Fetching project records from NIH Reporter")
+            projects = await nih.search_projects(core_nums)
+            path = writer.write("projects.jsonl", projects)
+            logger.info("Wrote %d project records to %s", len(projects), path)
 
         # Step 2: Fetch publication links
-        logger.info("Step 2/10: Fetching publication links from NIH Reporter")
-        pub_links = await nih.search_publications(core_nums)
-        path = writer.write("publication_links.jsonl", pub_links)
-        logger.info("Wrote %d publication link records to %s", len(pub_links), path)
+        with telemetry.step(2, "publication_links"):
+            logger.info("Step 2/10: Fetching publication links from NIH Reporter")
+            pub_links = await nih.search_publications(core_nums)
+            path = writer.write("publication_links.jsonl", pub_links)
+            logger.info("Wrote %d publication link records to %s", len(pub_links), path)
 
         # Step 3: Extract unique PMIDs
-        pmids = sorted({r.pmid for r in pub_links if r.pmid is not None})
-        logger.info("Step 3/10: Extracted %d unique PMIDs", len(pmids))
+        with telemetry.step(3, "extract_pmids"):
+            pmids = sorted({r.pmid for r in pub_links if r.pmid is not None})
+            logger.info("Step 3/10: Extracted %d unique PMIDs", len(pmids))
 
         if pmids:
             # Step 4: Fetch publication metadata from Europe PMC
-            logger.info("Step 4/10: Fetching publication metadata from Europe PMC")
-            publications = await epmc.fetch_publications(pmids)
-            path = writer.write("publications.jsonl", publications)
-            logger.info("Wrote %d publication records to %s", len(publications), path)
+            with telemetry.step(4, "publications"):
+                logger.info("Step 4/10: Fetching publication metadata from Europe PMC")
+                publications = await epmc.fetch_publications(pmids)
+                path = writer.write("publications.jsonl", publications)
+                logger.info("Wrote %d publication records to %s", len(publications), path)
 
             # Step 5: Fetch citation metrics from iCite
-            logger.info("Step 5/10: Fetching citation metrics from iCite")
-            icite_records = await icite.fetch_metrics(pmids)
-            path = writer.write("icite.jsonl", icite_records)
-            logger.info("Wrote %d iCite records to %s", len(icite_records), path)
-
-            # Step 6: Build citation links and extract citing PMIDs
-            pmid_set = set(pmids)
-            citation_links: list[CitationLink] = []
-            citing_pmids: set[int] = set()
-            for rec in icite_records:
-                if rec.pmid is None:
-                    continue
-                for citing_pmid in (rec.cited_by or []):
-                    citation_links.append(
-                        CitationLink(cited_pmid=rec.pmid, citing_pmid=citing_pmid)
-                    )
-                    citing_pmids.add(citing_pmid)
-            # Exclude PMIDs we already have iCite data for
-            new_citing_pmids = sorted(citing_pmids - pmid_set)
-            path = writer.write("citation_links.jsonl", citation_links)
-            logger.info(
-                "Step 6/10: %d citation links, %d unique citing PMIDs (%d new)",
-                len(citation_links), len(citing_pmids), len(new_citing_pmids),
-            )
-
-            # Step 7: Fetch iCite records for citing publications
-            if new_citing_pmids:
-                logger.info("Step 7/10: Fetching iCite records for %d citing publications", len(new_citing_pmids))
-                citing_icite_records = await icite.fetch_metrics(new_citing_pmids)
-                path = writer.write("citing_icite.jsonl", citing_icite_records)
-                logger.info("Wrote %d citing iCite records to %s", len(citing_icite_records), path)
-            else:
-                logger.info("Step 7/10: No new citing PMIDs to fetch")
+            with telemetry.step(5, "icite"):
+                logger.info("Step 5/10: Fetching citation metrics from iCite")
+                icite_records = await icite.fetch_metrics(pmids)
+                path = writer.write("icite.jsonl", icite_records)
+                logger.info("Wrote %d iCite records to %s", len(icite_records), path)
+
+            # Step 6: Build citation graph and extract citing PMIDs
+            with telemetry.step(6, "citation_graph"):
+                graph = CitationGraph.from_icite(icite_records)
+                citing_pmids = graph.citing_pmids()
+                # Exclude PMIDs we already have iCite data for
+                new_citing_count = len(sorted_difference(citing_pmids, array("q", pmids)))
+                graph.save(output_dir / "citation_graph.bin")
+                logger.info(
+                    "Step 6/10: %d citation links, %d unique citing PMIDs (%d new)",
+                    graph.num_edges, len(citing_pmids), new_citing_count,
+                )
+
+            # Step 7: Fetch iCite records for citing publications, expanding
+            # citation_depth hops out from the grant publications
+            with telemetry.step(7, "citation_crawl"):
+                logger.info(
+                    "Step 7/10: Crawling citing publications (depth=%d, %d new at hop 1)",
+                    citation_depth, new_citing_count,
+                )
+                crawl = await crawl_citations(
+                    icite,
+                    graph,
+                    array("q", pmids),
+                    depth=citation_depth,
+                    max_pmids=max_citing_pmids,
+                    max_requests_per_level=max_requests_per_level,
+                    checkpoint_dir=output_dir / "crawl_checkpoints",
+                )
+                path = writer.write_lines("citation_links.jsonl", crawl.edge_lines())
+                logger.info("Wrote %d citation links across %d hop(s) to %s", crawl.num_edges, len(crawl.levels), path)
+                # Read back by `main.py repair` to crawl from recovered grant publications as deep.
+                telemetry.record_event("citation_crawl", depth=citation_depth, links=crawl.num_edges)
+                new_citing_pmids = crawl.pmids().tolist()
+                if new_citing_pmids:
+                    citing_icite_records = crawl.records()
+                    path = writer.write("citing_icite.jsonl", citing_icite_records)
+                    logger.info("Wrote %d citing iCite records to %s", len(citing_icite_records), path)
+                else:
+                    logger.info("Step 7/10: No new citing PMIDs to fetch")
 
             # Step 8: Fetch OpenAlex works for grant-associated publications
-            logger.info("Step 8/10: Fetching OpenAlex works for %d grant-associated PMIDs", len(pmids))
-            openalex_works = await openalex.fetch_works(pmids)
-            path = writer.write("openalex.jsonl", openalex_works)
-            logger.info("Wrote %d OpenAlex work records to %s", len(openalex_works), path)
+            with telemetry.step(8, "openalex"):
+                logger.info("Step 8/10: Fetching OpenAlex works for %d grant-associated PMIDs", len(pmids))
+                openalex_works = await openalex.fetch_works(pmids)
+                path = writer.write("openalex.jsonl", openalex_works)
+                logger.info("Wrote %d OpenAlex work records to %s", len(openalex_works), path)
 
             # Step 9: Fetch OpenAlex works for citing publications
-            if new_citing_pmids:
-                logger.info("Step 9/10: Fetching OpenAlex works for %d citing PMIDs", len(new_citing_pmids))
-                citing_openalex_works = await openalex.fetch_works(new_citing_pmids)
-                path = writer.write("citing_openalex.jsonl", citing_openalex_works)
-                logger.info("Wrote %d citing OpenAlex work records to %s", len(citing_openalex_works), path)
-            else:
-                logger.info("Step 9/10: No new citing PMIDs to fetch from OpenAlex")
+            with telemetry.step(9, "citing_openalex"):
+                if new_citing_pmids:
+                    logger.info("Step 9/10: Fetching OpenAlex works for %d citing PMIDs", len(new_citing_pmids))
+                    citing_openalex_works = await openalex.fetch_works(new_citing_pmids)
+                    path = writer.write("citing_openalex.jsonl", citing_openalex_works)
+                    logger.info("Wrote %d citing OpenAlex work records to %s", len(citing_openalex_works), path)
+                else:
+                    logger.info("Step 9/10: No new citing PMIDs to fetch from OpenAlex")
         else:
             logger.warning("No PMIDs found, skipping publication and citation fetches (steps 4-9)")
 
         # Step 10: Fetch GitHub repos by topic
-        logger.info("Step 10/10: Searching GitHub repos by project ID topics")
-        github_repos = await github.fetch_repos(core_nums)
-        path = writer.write("github_core.jsonl", github_repos)
-        logger.info("Wrote %d GitHub repo records to %s", len(github_repos), path)
+        with telemetry.step(10, "github"):
+            logger.info("Step 10/10: Searching GitHub repos by project ID topics")
+            github_repos = await github.fetch_repos(core_nums)
+            path = writer.write("github_core.jsonl", github_repos)
+            logger.info("Wrote %d GitHub repo records to %s", len(github_repos), path)
 
         logger.info("ETL complete. Output directory: %s", output_dir)
 
+    except BaseException as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+        raise
     finally:
         await nih.close()
         await epmc.close()
         await icite.close()
         await github.close()
         await openalex.close()
+        if store is not None:
+            store.close()
+        if snapshot is not None:
+            snapshot.close()
+        if openalex_snap is not None:
+            openalex_snap.close()
+        ledger.write(output_dir)
+        if ledger:
+            telemetry.record_event("failed_items", count=len(ledger))
+        telemetry.write_report(output_dir, status, error)
+        if profiler is not None:
+            profiler.stop()
+
+    return telemetry
@@ -0,0 +1,344 @@
+import json
+import logging
+import math
+import os
+from pathlib import Path
+
+import httpx
+
+from icc_eval_etl.clients import europepmc, github, icite, nih_reporter, openalex
+from icc_eval_etl.clients.concurrency import INITIAL_LIMIT
+from icc_eval_etl.clients.europepmc import EuropePMCClient
+from icc_eval_etl.clients.icite import ICiteClient
+from icc_eval_etl.clients.nih_reporter import NIHReporterClient
+from icc_eval_etl.clients.openalex import OpenAlexClient
+from icc_eval_etl.entity_store import EntityStore
+from icc_eval_etl.models.config import CollectionConfig
+
+logger = logging.getLogger(__name__)
+
+# New citing PMIDs per crawled PMID at each hop, when no previous run shows the real fan-out.
+CITING_RATIO = 15.0
+# Cursor paging only stops on an empty page, so each OpenAlex batch of works costs two requests.
+OPENALEX_REQUESTS_PER_BATCH = 2
+LATENCY = 0.5  # assumed seconds per response; bounds clients that send one request at a time
+# Requests per day.
+OPENALEX_DAILY_QUOTA = 100_000
+OPENALEX_UNAUTHENTICATED_DAILY_QUOTA = 100
+
+
+class StepPlan:
+    def __init__(self, index: int, name: str, source: str, items: int, requests: int, seconds: float):
+        self.index = index
+        self.name = name
+        self.source = source
+        self.items = items
+        self.requests = requests
+        self.seconds = seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "name": self.name,
+            "source": self.source,
+            "items": self.items,
+            "requests": self.requests,
+            "seconds": round(self.seconds, 1),
+        }
+
+
+class RunPlan:
+    """Projected requests and wall time per step for one run."""
+
+    def __init__(self, core_projects: int, sized_from: str):
+        self.core_projects = core_projects
+        self.sized_from = sized_from
+        self.projects = 0
+        self.publication_links = 0
+        self.pmids = 0
+        # (PMIDs crawled, "observed" or "estimated") per hop.
+        self.hops: list[tuple[int, str]] = []
+        self.steps: list[StepPlan] = []
+        self.notes: list[str] = []
+        self.warnings: list[str] = []
+
+    @property
+    def seconds(self) -> float:
+        return sum(s.seconds for s in self.steps)
+
+    def requests_by_source(self) -> dict[str, int]:
+        totals: dict[str, int] = {}
+        for step in self.steps:
+            totals[step.source] = totals.get(step.source, 0) + step.requests
+        return totals
+
+    def to_dict(self) -> dict:
+        return {
+            "core_projects": self.core_projects,
+            "sized_from": self.sized_from,
+            "projects": self.projects,
+            "publication_links": self.publication_links,
+            "pmids": self.pmids,
+            "hops": [{"hop": i, "pmids": n, "basis": basis} for i, (n, basis) in enumerate(self.hops, 1)],
+            "steps": [s.to_dict() for s in self.steps],
+            "requests": self.requests_by_source(),
+            "seconds": round(self.seconds, 1),
+            "notes": self.notes,
+            "warnings": self.warnings,
+        }
+
+    def format(self) -> str:
+        lines = [
+            f"Plan for {self.core_projects} core project(s), sized from {self.sized_from}",
+            f"  {self.projects} projects, {self.publication_links} publication links, {self.pmids} PMIDs",
+        ]
+        for hop, (n, basis) in enumerate(self.hops, 1):
+            lines.append(f"  hop {hop}: {n:,} citing PMIDs ({basis})")
+        lines.append(f"  {'step':<22} {'source':<13} {'items':>9} {'requests':>9} {'time':>9}")
+        for s in self.steps:
+            lines.append(
+                f"  {f'{s.index} {s.name}':<22} {s.source:<13} {s.items:>9,} {s.requests:>9,} {_duration(s.seconds):>9}"
+            )
+        total = sum(s.requests for s in self.steps)
+        lines.append(f"  {'total':<22} {'':<13} {'':>9} {total:>9,} {_duration(self.seconds):>9}")
+        lines.append("  requests: " + ", ".join(f"{k} {v:,}" for k, v in self.requests_by_source().items()))
+        lines.extend(f"  note: {n}" for n in self.notes)
+        lines.extend(f"  WARNING: {w}" for w in self.warnings)
+        return "\n".join(lines)
+
+
+def _duration(seconds: float) -> str:
+    seconds = round(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _pages(n: int, size: int, max_offset: int) -> int:
+    """Offset-paged requests for n results; one even when there are none."""
+    return max(1, math.ceil(min(n, max_offset + 1) / size))
+
+
+def _read_jsonl(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def _previous_sizes(output_dir: Path, core_nums: list[str]) -> tuple[int, list[dict], set[int], list[set[int]]] | None:
+    """Sizes from a previous run covering every core project.
+
+    Returns the project count and publication links for core_nums, plus
+    the previous run's grant PMIDs and the frontier of each hop it crawled.
+    """
+    projects = _read_jsonl(output_dir / "projects.jsonl")
+    wanted = set(core_nums)
+    if not wanted <= {(p.get("core_project_num") or "").upper() for p in projects}:
+        return None
+    all_links = _read_jsonl(output_dir / "publication_links.jsonl")
+    links = [r for r in all_links if (r.get("coreproject") or "").upper() in wanted]
+    seeds = {r["pmid"] for r in all_links if r.get("pmid") is not None}
+    by_hop: dict[int, set[int]] = {}
+    for link in _read_jsonl(output_dir / "citation_links.jsonl"):
+        by_hop.setdefault(link.get("hop") or 1, set()).add(link["citing_pmid"])
+    # Frontiers as the crawl saw them: citing PMIDs not already seeded or crawled.
+    visited = set(seeds)
+    frontiers = []
+    for hop in sorted(by_hop):
+        frontier = by_hop[hop] - visited
+        frontiers.append(frontier)
+        visited |= frontier
+    num_projects = sum(1 for p in projects if (p.get("core_project_num") or "").upper() in wanted)
+    return num_projects, links, seeds, frontiers
+
+
+async def _live_sizes(
+    core_nums: list[str], transport: httpx.AsyncBaseTransport | None, rate_limit: float | None,
+) -> tuple[int, list[dict]]:
+    """Steps 1-2 only: project and publication link counts from NIH Reporter."""
+    kwargs: dict = {"transport": transport}
+    if rate_limit is not None:
+        kwargs["rate_limit"] = rate_limit
+    nih = NIHReporterClient(**kwargs)
+    try:
+        projects = await nih.search_projects(core_nums)
+        links = await nih.search_publications(core_nums)
+    finally:
+        await nih.close()
+    return len(projects), [link.model_dump() for link in links]
+
+
+def _github_seconds(requests: int, rate: float, paced: bool) -> float:
+    """Wall time of GitHub searches.
+
+    Sharded runs pace them at ``rate``. A single run sends them back to
+    back until the search API's per-minute window is used up, then waits
+    on 403/429 until the window resets.
+    """
+    if paced:
+        return requests * max(1.0 / rate, LATENCY)
+    window = max(1, round(60 * rate))
+    windows = math.ceil(requests / window)
+    if not windows:
+        return 0.0
+    return max(requests * LATENCY, 60.0 * (windows - 1) + (requests - window * (windows - 1)) * LATENCY)
+
+
+def _uncached(store: EntityStore | None, source: str, pmids: list[int] | None, n: int) -> int:
+    """PMIDs left for the API once fresh entity store entries are served (n when pmids are only estimated)."""
+    if store is None or pmids is None:
+        return n
+    return n - len(store.get_many(source, pmids))
+
+
+async def plan_run(
+    config: CollectionConfig,
+    output_dir: Path | None = None,
+    citation_depth: int = 1,
+    max_citing_pmids: int | None = None,
+    max_requests_per_level: int | None = None,
+    transport: httpx.AsyncBaseTransport | None = None,
+    rate_limit: float | None = None,
+    store_path: Path | None = None,
+    icite_snapshot: Path | None = None,
+    openalex_snapshot: Path | None = None,
+    sharded: bool = False,
+) -> RunPlan:
+    """Size a run without fetching anything past NIH Reporter and project its requests and wall time.
+
+    The PMID set comes from a previous run's outputs in ``output_dir`` when
+    it covers every core project, otherwise from NIH Reporter (steps 1-2).
+    Crawl hops a previous run reached with the same grant PMIDs are
+    counted exactly; further hops apply the last observed fan-out, or
+    CITING_RATIO, and the crawl budgets. Requests follow each client's
+    batch and page sizes, minus fresh entity store entries for PMIDs known
+    up front. Steps run one after another; each takes its requests at the
+    client's rate, or LATENCY per request (divided by the adaptive
+    limiter's starting concurrency for Europe PMC) if that is slower.
+    GitHub is only paced up front in ``sharded`` runs; a single run sends
+    its searches as fast as they return until GitHub's per-minute window
+    runs out.
+    """
+    core_nums = [k.upper() for k in config.core_project_identifiers]
+    previous = _previous_sizes(output_dir, core_nums) if output_dir is not None else None
+    if previous is not None:
+        plan = RunPlan(len(core_nums), f"previous outputs in {output_dir}")
+        plan.projects, links, seeds, frontiers = previous
+    else:
+        plan = RunPlan(len(core_nums), "NIH Reporter (steps 1-2)")
+        plan.projects, links = await _live_sizes(core_nums, transport, rate_limit)
+        seeds, frontiers = set(), []
+    plan.publication_links = len(links)
+    pmids = sorted({r["pmid"] for r in links if r.get("pmid") is not None})
+    plan.pmids = len(pmids)
+
+    # Previous frontiers hold as-is only for the same grant PMIDs; otherwise only their fan-out carries over.
+    exact = seeds == set(pmids)
+    sizes = [len(seeds)] + [len(f) for f in frontiers]
+    ratio = sizes[-1] / sizes[-2] if len(sizes) > 1 and sizes[-2] else CITING_RATIO
+    crawled = 0
+    level_pmids: list[list[int] | None] = []
+    level_sizes: list[int] = []
+    parent = len(pmids)
+    for hop in range(1, citation_depth + 1):
+        if exact and hop <= len(frontiers):
+            frontier: list[int] | None = sorted(frontiers[hop - 1])
+            size, basis = len(frontier), "observed"
+        else:
+            frontier, size, basis = None, round(parent * ratio), "estimated"
+        cap = size
+        if max_requests_per_level is not None:
+            cap = min(cap, max_requests_per_level * icite.BATCH_SIZE)
+        if max_citing_pmids is not None:
+            cap = min(cap, max(0, max_citing_pmids - crawled))
+        if cap < size:
+            basis += f", capped from {size:,} by crawl budget"
+            frontier = frontier[:cap] if frontier is not None else None
+            # Later hops grow from a smaller level than the previous run crawled.
+            exact = False
+        if not cap:
+            break
+        plan.hops.append((cap, basis))
+        level_pmids.append(frontier)
+        level_sizes.append(cap)
+        crawled += cap
+        parent = cap
+
+    github_rate = github.RATE_LIMIT if os.environ.get("GITHUB_TOKEN") else github.UNAUTHENTICATED_RATE_LIMIT
+    rates = {
+        "nih_reporter": nih_reporter.RATE_LIMIT,
+        "europepmc": europepmc.RATE_LIMIT,
+        "icite": icite.RATE_LIMIT,
+        "openalex": openalex.RATE_LIMIT,
+        "github": github_rate,
+    }
+    if rate_limit is not None:
+        rates = dict.fromkeys(rates, rate_limit)
+
+    def add(index: int, name: str, source: str, items: int, requests: int, concurrency: int = 1) -> None:
+        seconds = requests * max(1.0 / rates[source], LATENCY / concurrency)
+        plan.steps.append(StepPlan(index, name, source, items, requests, seconds))
+
+    store = EntityStore(store_path) if store_path is not None else None
+    try:
+        add(1, "projects", "nih_reporter", plan.projects,
+            _pages(plan.projects, nih_reporter.PAGE_SIZE, nih_reporter.PROJECTS_MAX_OFFSET))
+        add(2, "publication_links", "nih_reporter", plan.publication_links,
+            _pages(plan.publication_links, nih_reporter.PAGE_SIZE, nih_reporter.PUBLICATIONS_MAX_OFFSET))
+        if pmids:
+            concurrency = INITIAL_LIMIT if EuropePMCClient.CONCURRENCY else 1
+            add(4, "publications", "europepmc", len(pmids),
+                _uncached(store, EuropePMCClient.STORE_SOURCE, pmids, len(pmids)), concurrency)
+            add(5, "icite", "icite", len(pmids),
+                math.ceil(_uncached(store, ICiteClient.STORE_SOURCE, pmids, len(pmids)) / icite.BATCH_SIZE))
+            add(7, "citation_crawl", "icite", crawled, sum(
+                math.ceil(_uncached(store, ICiteClient.STORE_SOURCE, p, n) / icite.BATCH_SIZE)
+                for p, n in zip(level_pmids, level_sizes)
+            ))
+            add(8, "openalex", "openalex", len(pmids), OPENALEX_REQUESTS_PER_BATCH * math.ceil(
+                _uncached(store, OpenAlexClient.STORE_SOURCE, pmids, len(pmids)) / openalex.BATCH_SIZE
+            ))
+            all_citing = None if None in level_pmids else sorted(p for level in level_pmids for p in level)
+            add(9, "citing_openalex", "openalex", crawled, OPENALEX_REQUESTS_PER_BATCH * math.ceil(
+                _uncached(store, OpenAlexClient.STORE_SOURCE, all_citing, crawled) / openalex.BATCH_SIZE
+            ))
+        # At least one search page per core project topic.
+        plan.steps.append(StepPlan(
+            10, "github", "github", len(core_nums), len(core_nums),
+            _github_seconds(len(core_nums), rates["github"] if sharded else github_rate, paced=sharded),
+        ))
+    finally:
+        if store is not None:
+            store.close()
+
+    if store is not None:
+        plan.notes.append("fresh entity store entries are only subtracted for PMIDs known before the run")
+    if icite_snapshot is not None:
+        plan.notes.append("iCite requests are an upper bound: PMIDs in the snapshot are served locally")
+    if openalex_snapshot is not None:
+        plan.notes.append("OpenAlex requests are an upper bound: PMIDs in the snapshot are served locally")
+    plan.notes.append("GitHub needs one more request per 100 repos beyond the first page of a topic")
+
+    # The client stops paging at the cap, so reaching it means results may be cut off.
+    for name, n, max_offset in (
+        ("projects", plan.projects, nih_reporter.PROJECTS_MAX_OFFSET),
+        ("publication links", plan.publication_links, nih_reporter.PUBLICATIONS_MAX_OFFSET),
+    ):
+        if n > max_offset:
+            plan.warnings.append(
+                f"{n:,} {name} reach NIH Reporter's paging limit of {max_offset + 1:,}; any beyond it are not fetched"
+            )
+    openalex_requests = plan.requests_by_source().get("openalex", 0)
+    quota = OPENALEX_DAILY_QUOTA if os.environ.get("OPENALEX_API_KEY") else OPENALEX_UNAUTHENTICATED_DAILY_QUOTA
+    if openalex_requests > quota:
+        plan.warnings.append(
+            f"{openalex_requests:,} OpenAlex requests exceed its daily quota of {quota:,}"
+            + ("" if os.environ.get("OPENALEX_API_KEY") else " without OPENALEX_API_KEY")
+        )
+    github_step = plan.steps[-1]
+    if not os.environ.get("GITHUB_TOKEN") and github_step.seconds > 60:
+        plan.warnings.append(
+            f"GITHUB_TOKEN not set: {github_step.requests} GitHub searches at the unauthenticated "
+            f"{60 * github.UNAUTHENTICATED_RATE_LIMIT:.0f}/min take {_duration(github_step.seconds)}"
+        )
+    return plan
+
@@ -0,0 +1,216 @@
+import asyncio
+import cProfile
+import io
+import json
+import logging
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from icc_eval_etl.pipeline.telemetry import StepStats
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIRNAME = "profile"
+TOP_FUNCTIONS = 10
+
+_PACKAGE_DIR = str(Path(__file__).resolve().parent.parent)
+_HANDLE_CORO = re.compile(r"coro=<([\w.<>]+)\(\)(?: \w+)?(?: \w+ at (\S+))?")
+
+
+def _attribute(frame) -> tuple[str, str]:
+    """Name the client or writer on a stack, innermost first.
+
+    Falls back to "other" with the innermost package frame as location.
+    """
+    innermost = None
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if path.startswith(_PACKAGE_DIR):
+            location = f"{Path(path).name}:{frame.f_lineno} in {frame.f_code.co_name}"
+            innermost = innermost or location
+            if "/clients/" in path or path.endswith("writers.py"):
+                owner = frame.f_locals.get("self")
+                return (type(owner).__name__ if owner is not None else Path(path).stem), location
+        frame = frame.f_back
+    return "other", innermost or "?"
+
+
+def _attribute_handle(handle: str) -> tuple[str, str]:
+    """Best-effort attribution from asyncio's description of the slow handle."""
+    match = _HANDLE_CORO.search(handle)
+    if match is None:
+        return "other", handle[:200]
+    qualname, where = match.group(1), match.group(2)
+    component = qualname.split(".")[0] if "." in qualname else "other"
+    location = f"{Path(where).name} in {qualname}" if where else qualname
+    return component, location
+
+
+class _StepProfile:
+    def __init__(self, stats: StepStats):
+        self.stats = stats
+        self.profile = cProfile.Profile()
+        self.peak_bytes = 0
+        self.stalls: list[dict] = []
+
+    @property
+    def label(self) -> str:
+        return f"step_{self.stats.index:02d}_{self.stats.name}"
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Receives asyncio's debug-mode "Executing ... took N seconds" warnings."""
+
+    def __init__(self, profiler: "StepProfiler"):
+        super().__init__(level=logging.WARNING)
+        self.profiler = profiler
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.msg.startswith("Executing ") and len(record.args) == 2:
+            handle, seconds = record.args
+            self.profiler._record_stall(str(handle), float(seconds))
+
+
+class StepProfiler:
+    """cProfile, tracemalloc peak and event-loop stalls per pipeline step.
+
+    Registered as a RunTelemetry listener. Stalls come from asyncio debug
+    mode's slow-callback warnings; a watchdog thread samples the loop
+    thread's stack while a stall is in progress so it can be pinned on the
+    client or writer that was running.
+    """
+
+    def __init__(self, output_dir: Path, slow_callback_seconds: float = 0.1):
+        self.output_dir = output_dir
+        self.threshold = slow_callback_seconds
+        self.steps: list[_StepProfile] = []
+        self._current: _StepProfile | None = None
+        self._interval = slow_callback_seconds / 4
+        self._handler = _SlowCallbackHandler(self)
+        self._stopped = threading.Event()
+        self._pending: tuple[float, str, str] | None = None
+        self._last_beat = time.monotonic()
+
+    def start(self) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._loop = asyncio.get_running_loop()
+        self._loop.set_debug(True)
+        self._loop.slow_callback_duration = self.threshold
+        logging.getLogger("asyncio").addHandler(self._handler)
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+        self._loop_thread = threading.get_ident()
+        self._beat()
+        self._watchdog = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> Path:
+        self._stopped.set()
+        self._watchdog.join()
+        self._beat_handle.cancel()
+        self._loop.set_debug(False)
+        logging.getLogger("asyncio").removeHandler(self._handler)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        return self.write_summary()
+
+    def step_started(self, stats: StepStats) -> None:
+        self._current = _StepProfile(stats)
+        self.steps.append(self._current)
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._current.profile.enable()
+
+    def step_finished(self, stats: StepStats) -> None:
+        current = self._current
+        if current is None:
+            return
+        current.profile.disable()
+        if tracemalloc.is_tracing():
+            current.peak_bytes = tracemalloc.get_traced_memory()[1]
+        current.profile.dump_stats(self.output_dir / f"{current.label}.prof")
+        self._current = None
+
+    def _beat(self) -> None:
+        self._last_beat = time.monotonic()
+        self._beat_handle = self._loop.call_later(self._interval, self._beat)
+
+    def _watch(self) -> None:
+        sampled = None
+        while not self._stopped.wait(self._interval):
+            beat = self._last_beat
+            # A beat is due every interval; two missed means the loop is busy.
+            if beat == sampled or time.monotonic() - beat <= 2 * self._interval:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                self._pending = (time.monotonic(), *_attribute(frame))
+            sampled = beat
+
+    def _record_stall(self, handle: str, seconds: float) -> None:
+        pending, self._pending = self._pending, None
+        if pending is not None and time.monotonic() - pending[0] <= seconds + self._interval:
+            component, location = pending[1], pending[2]
+        else:
+            # Not sampled in time; fall back to the task named in the handle.
+            component, location = _attribute_handle(handle)
+        stall = {"seconds": round(seconds, 4), "component": component, "location": location}
+        if self._current is not None:
+            self._current.stalls.append(stall)
+        logger.debug("Event loop stalled %.3fs in %s (%s)", seconds, component, location)
+
+    def _top_functions(self, step: _StepProfile) -> str:
+        out = io.StringIO()
+        pstats.Stats(step.profile, stream=out).sort_stats("tottime").print_stats(TOP_FUNCTIONS)
+        return out.getvalue()
+
+    def summary_rows(self) -> list[dict]:
+        rows = []
+        for step in self.steps:
+            by_component: dict[str, float] = {}
+            for stall in step.stalls:
+                by_component[stall["component"]] = by_component.get(stall["component"], 0.0) + stall["seconds"]
+            rows.append({
+                "step": step.label,
+                "seconds": round(step.stats.seconds or 0.0, 4),
+                "peak_memory_mb": round(step.peak_bytes / 1e6, 2),
+                "stalls": len(step.stalls),
+                "stalled_seconds": round(sum(s["seconds"] for s in step.stalls), 4),
+                "stalled_seconds_by_component": {k: round(v, 4) for k, v in sorted(by_component.items())},
+                "stall_details": step.stalls,
+                "profile": f"{step.label}.prof",
+            })
+        return rows
+
+    def write_summary(self) -> Path:
+        rows = self.summary_rows()
+        (self.output_dir / "summary.json").write_text(json.dumps({
+            "slow_callback_seconds": self.threshold,
+            "steps": rows,
+        }, indent=2))
+
+        lines = [
+            f"Slow-callback threshold: {self.threshold * 1000:.0f} ms",
+            "",
+            f"{'step':<28} {'seconds':>9} {'peak MB':>9} {'stalls':>7} {'stalled s':>10}  worst component",
+        ]
+        for row in rows:
+            worst = max(row["stalled_seconds_by_component"].items(), key=lambda kv: kv[1], default=("-", 0))
+            lines.append(
+                f"{row['step']:<28} {row['seconds']:>9.3f} {row['peak_memory_mb']:>9.2f} "
+                f"{row['stalls']:>7} {row['stalled_seconds']:>10.3f}  {worst[0]}"
+            )
+        table = "\n".join(lines)
+        sections = [table]
+        for step in self.steps:
+            sections.append(f"== {step.label}: top {TOP_FUNCTIONS} functions by own time\n{self._top_functions(step)}")
+        path = self.output_dir / "summary.txt"
+        path.write_text("\n\n".join(sections))
+        logger.info("Profile summary (%s):\n%s", self.output_dir, table)
+        return path
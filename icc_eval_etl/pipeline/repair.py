@@ -0,0 +1,226 @@
+import json
+import logging
+import os
+from array import array
+from pathlib import Path
+
+import httpx
+
+from icc_eval_etl.clients import europepmc, github, icite, openalex
+from icc_eval_etl.clients.europepmc import EuropePMCClient
+from icc_eval_etl.clients.github import GitHubClient
+from icc_eval_etl.clients.icite import ICiteClient
+from icc_eval_etl.clients.openalex import OpenAlexClient
+from icc_eval_etl.clients.rate_coordinator import RateCoordinator
+from icc_eval_etl.clients.resilience import Resilience
+from icc_eval_etl.entity_store import EntityStore
+from icc_eval_etl.models.icite import ICiteRecord
+from icc_eval_etl.pipeline.citation_crawl import crawl_citations
+from icc_eval_etl.pipeline.citation_graph import CitationGraph, sorted_union
+from icc_eval_etl.pipeline.failure_ledger import FAILED_ITEMS_FILENAME, STEP_FILES, FailureLedger
+from icc_eval_etl.pipeline.sharding import SHARDS_DIRNAME, merge_outputs
+from icc_eval_etl.pipeline.telemetry import REPORT_FILENAME, RunTelemetry
+from icc_eval_etl.pipeline.writers import ChangeLog, JSONLWriter
+
+logger = logging.getLogger(__name__)
+
+REPAIR_DIRNAME = "repair"
+# Step numbers match run_pipeline so the report reads the same.
+REPAIR_STEPS = [
+    (4, "publications"),
+    (5, "icite"),
+    (7, "citation_crawl"),
+    (8, "openalex"),
+    (9, "citing_openalex"),
+    (10, "github"),
+]
+# Failed keys tend to be the ones a host struggled with: go slower and retry longer.
+RATE_FACTOR = 0.25
+MAX_RETRIES = 6
+
+
+def _citing_hops(output_dir: Path) -> dict[int, int]:
+    """Smallest crawl hop per citing PMID, from citation_links.jsonl."""
+    hops: dict[int, int] = {}
+    path = output_dir / "citation_links.jsonl"
+    if path.exists():
+        with open(path) as f:
+            for line in f:
+                link = json.loads(line)
+                pmid, hop = link["citing_pmid"], link.get("hop") or 1
+                if hop < hops.get(pmid, hop + 1):
+                    hops[pmid] = hop
+    return hops
+
+
+def _citation_depth(output_dir: Path) -> int:
+    """Crawl depth of the run that wrote output_dir, from its run report(s), or its deepest citation link."""
+    depths = []
+    for path in [output_dir / REPORT_FILENAME, *sorted((output_dir / SHARDS_DIRNAME).glob(f"*/{REPORT_FILENAME}"))]:
+        if path.exists():
+            events = json.loads(path.read_text()).get("events", [])
+            depths += [e["depth"] for e in events if e.get("name") == "citation_crawl"]
+    return max(depths, default=None) or max(_citing_hops(output_dir).values(), default=1)
+
+
+def _pmids(path: Path) -> array:
+    """Sorted unique PMIDs of the records in a JSONL output file."""
+    pmids = set()
+    if path.exists():
+        with open(path) as f:
+            for line in f:
+                pmid = json.loads(line).get("pmid")
+                if pmid is not None:
+                    pmids.add(int(pmid))
+    return array("q", sorted(pmids))
+
+
+async def _rebuild_citations(
+    grant_records: list[ICiteRecord],
+    output_dir: Path,
+    repair_dir: Path,
+    depth: int,
+    icite_client: ICiteClient,
+    openalex_client: OpenAlexClient,
+    writer: JSONLWriter,
+    telemetry: RunTelemetry,
+    changes: ChangeLog,
+) -> None:
+    """Re-run steps 6, 7 and 9 for recovered grant iCite records and merge the results.
+
+    The crawl starts from the recovered records' cited_by, so every edge
+    into them is added, but PMIDs that already are grant or citing
+    publications in the outputs are not fetched again.
+    """
+    with telemetry.step(6, "citation_graph"):
+        with open(output_dir / "icite.jsonl") as f:
+            graph = CitationGraph.from_icite(ICiteRecord.model_validate_json(line) for line in f)
+        graph.save(output_dir / "citation_graph.bin")
+    with telemetry.step(7, "citation_crawl"):
+        known = sorted_union(_pmids(output_dir / "icite.jsonl"), _pmids(output_dir / "citing_icite.jsonl"))
+        crawl = await crawl_citations(icite_client, CitationGraph.from_icite(grant_records), known, depth=depth)
+        writer.write_lines("citation_links.jsonl", crawl.edge_lines())
+        citing = crawl.records()
+        writer.write("citing_icite.jsonl", citing)
+        merge_outputs(
+            [output_dir, repair_dir], output_dir, filenames=["citation_links.jsonl", "citing_icite.jsonl"],
+            changes=changes,
+        )
+    with telemetry.step(9, "citing_openalex"):
+        works = await openalex_client.fetch_works(crawl.pmids().tolist()) if citing else []
+        writer.write("citing_openalex.jsonl", works)
+        merge_outputs([output_dir, repair_dir], output_dir, filenames=["citing_openalex.jsonl"], changes=changes)
+    logger.info(
+        "Repair rebuilt citations of %d grant publication(s): %d link(s), %d citing iCite, %d citing OpenAlex",
+        len(grant_records), crawl.num_edges, len(citing), len(works),
+    )
+
+
+async def run_repair(
+    output_dir: Path,
+    rate_factor: float = RATE_FACTOR,
+    store_path: Path | None = None,
+    transport: httpx.AsyncBaseTransport | None = None,
+    citation_depth: int | None = None,
+) -> FailureLedger:
+    """Re-drive the keys in output_dir/failed_items.jsonl and merge what comes back.
+
+    Clients run at ``rate_factor`` of their normal rates, with Europe PMC
+    one request at a time, GitHub paced up front, and MAX_RETRIES retries.
+    Recovered records are written to output_dir/repair/ and merged into the
+    existing outputs by RECORD_KEYS. Recovered grant iCite records also
+    get steps 6, 7 and 9 re-run from their cited_by, ``citation_depth``
+    hops deep (default: the depth in the last run's report, else the
+    deepest hop in citation_links.jsonl); their keys leave the ledger only
+    once that is merged too. Recovered citing iCite records get their hop
+    from citation_links.jsonl; the crawl is not expanded from them. Keys
+    that fail again stay in the ledger with their attempts added up. The
+    merged files amend the last run's changesets. Returns the remaining
+    ledger.
+    """
+    ledger = FailureLedger.load(output_dir / FAILED_ITEMS_FILENAME)
+    if not ledger:
+        logger.info("No failed items in %s, nothing to repair", output_dir)
+        return ledger
+    keys_by_file: dict[str, list] = {}
+    for file, key in ledger.entries:
+        keys_by_file.setdefault(file, []).append(key)
+    logger.info(
+        "Repairing %d failed item(s): %s",
+        len(ledger), ", ".join(f"{len(v)} in {k}" for k, v in keys_by_file.items()),
+    )
+
+    repair_dir = output_dir / REPAIR_DIRNAME
+    telemetry = RunTelemetry()
+    telemetry.add_listener(ledger)
+    writer = JSONLWriter(repair_dir, telemetry=telemetry)
+    changes = ChangeLog.resume(output_dir, telemetry)
+    store = EntityStore(store_path) if store_path is not None else None
+    resilience = Resilience(telemetry)
+    # An in-process coordinator so GitHub is paced up front too.
+    client_kwargs: dict = {
+        "transport": transport, "telemetry": telemetry, "store": store, "rate_coordinator": RateCoordinator(),
+        "ledger": ledger, "resilience": resilience, "max_retries": MAX_RETRIES,
+    }
+    epmc = EuropePMCClient(
+        concurrency={httpx.URL(europepmc.EUROPEPMC_BASE).host: (1, 1)},
+        rate_limit=europepmc.RATE_LIMIT * rate_factor, **client_kwargs,
+    )
+    icite_client = ICiteClient(rate_limit=icite.RATE_LIMIT * rate_factor, **client_kwargs)
+    openalex_client = OpenAlexClient(rate_limit=openalex.RATE_LIMIT * rate_factor, **client_kwargs)
+    github_rate = github.RATE_LIMIT if os.environ.get("GITHUB_TOKEN") else github.UNAUTHENTICATED_RATE_LIMIT
+    github_client = GitHubClient(
+        transport=transport, telemetry=telemetry, rate_coordinator=client_kwargs["rate_coordinator"],
+        rate_limit=github_rate * rate_factor, ledger=ledger, resilience=resilience,
+    )
+
+    status, error = "ok", None
+    try:
+        for index, step in REPAIR_STEPS:
+            file = STEP_FILES[step]
+            keys = keys_by_file.get(file)
+            if not keys:
+                continue
+            with telemetry.step(index, step):
+                before = {key: ledger.entries[(file, key)] for key in keys}
+                if step == "publications":
+                    records = await epmc.fetch_publications(keys)
+                elif step in ("icite", "citation_crawl"):
+                    records = await icite_client.fetch_metrics(keys)
+                    if step == "citation_crawl":
+                        hops = _citing_hops(output_dir)
+                        for rec in records:
+                            rec.hop = hops.get(rec.pmid)
+                elif step in ("openalex", "citing_openalex"):
+                    records = await openalex_client.fetch_works(keys)
+                else:
+                    records = await github_client.fetch_repos(keys)
+                writer.write(file, records)
+                # Merged before the ledger forgets the keys, so an interrupted repair loses nothing.
+                merge_outputs([output_dir, repair_dir], output_dir, filenames=[file], changes=changes)
+                # Keys not re-recorded during the step came back (possibly as "not found").
+                recovered = [key for key in keys if ledger.entries.get((file, key)) is before[key]]
+                logger.info(
+                    "Repair %s: %d/%d key(s) recovered, %d record(s)", file, len(recovered), len(keys), len(records),
+                )
+            if step == "icite" and records:
+                # Grant records feed the citation graph; their keys stay failed until it is rebuilt.
+                depth = citation_depth or _citation_depth(output_dir)
+                await _rebuild_citations(
+                    records, output_dir, repair_dir, depth, icite_client, openalex_client, writer, telemetry, changes,
+                )
+            ledger.resolve(file, recovered)
+    except BaseException as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        await epmc.close()
+        await icite_client.close()
+        await openalex_client.close()
+        await github_client.close()
+        if store is not None:
+            store.close()
+        ledger.write(output_dir)
+        telemetry.write_report(repair_dir, status, error)
+
+    return ledger
@@ -0,0 +1,218 @@
+import asyncio
+import json
+import logging
+import math
+import multiprocessing
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import httpx
+
+from icc_eval_etl.clients.rate_coordinator import RateCoordinator, RateCoordinatorManager
+from icc_eval_etl.models.config import CollectionConfig
+from icc_eval_etl.pipeline.failure_ledger import FAILED_ITEMS_FILENAME, FailureLedger
+from icc_eval_etl.pipeline.orchestrator import run_pipeline
+from icc_eval_etl.pipeline.telemetry import REPORT_FILENAME
+from icc_eval_etl.pipeline.writers import RECORD_KEYS, ChangeLog, JSONLWriter
+
+logger = logging.getLogger(__name__)
+
+SHARDS_DIRNAME = "shards"
+# A single run never lists a grant publication among the citing ones.
+_CITING_FILES = {"citing_icite.jsonl": "icite.jsonl", "citing_openalex.jsonl": "openalex.jsonl"}
+
+
+def plan_shards(configs: list[CollectionConfig], shards: int) -> list[CollectionConfig]:
+    """Union the collections' core projects (first occurrence wins) into ``shards`` contiguous groups.
+
+    With no core projects at all there is still one (empty) group, so the
+    run goes ahead as it would unsharded.
+    """
+    ids = list(dict.fromkeys(k.upper() for c in configs for k in c.core_project_identifiers))
+    if not ids:
+        return [CollectionConfig(core_project_identifiers={})]
+    size = math.ceil(len(ids) / max(1, min(shards, len(ids))))
+    return [
+        CollectionConfig(core_project_identifiers=dict.fromkeys(ids[i : i + size]))
+        for i in range(0, len(ids), size)
+    ]
+
+
+def _run_shard(
+    index: int,
+    config_data: dict,
+    shard_dir: Path,
+    options: dict,
+    coordinator: RateCoordinator,
+    transport_factory: Callable[[], httpx.AsyncBaseTransport] | None,
+    log_level: int,
+) -> dict:
+    logging.basicConfig(
+        level=log_level,
+        format=f"%(asctime)s %(levelname)s [shard {index:02d}] %(name)s: %(message)s",
+    )
+    config = CollectionConfig.model_validate(config_data)
+    transport = transport_factory() if transport_factory is not None else None
+    try:
+        asyncio.run(run_pipeline(
+            config, shard_dir, transport=transport, rate_coordinator=coordinator, track_changes=False, **options,
+        ))
+    except Exception as exc:
+        logger.exception("Shard %d failed", index)
+        report_path = shard_dir / REPORT_FILENAME
+        if not report_path.exists():
+            return {"status": "error", "error": f"{type(exc).__name__}: {exc}", "clients": {}}
+    return json.loads((shard_dir / REPORT_FILENAME).read_text())
+
+
+def _merge_duplicate(existing: dict, record: dict) -> dict:
+    if "core_project_ids" in existing:
+        for project_id in record.get("core_project_ids") or []:
+            if project_id not in existing["core_project_ids"]:
+                existing["core_project_ids"].append(project_id)
+    # Hop distance from the union of shard seeds is the minimum over shards.
+    if record.get("hop") is not None and existing.get("hop") is not None and record["hop"] < existing["hop"]:
+        return record
+    return existing
+
+
+def merge_outputs(
+    shard_dirs: list[Path], output_dir: Path, filenames: list[str] | None = None, changes: ChangeLog | None = None,
+) -> dict[str, int]:
+    """Merge shard JSONL into output_dir, deduplicated by RECORD_KEYS; returns records per file.
+
+    ``filenames`` limits the merge to those output files (default: all).
+    output_dir may itself be one of the inputs. Merged files are diffed
+    into ``changes`` when given.
+    """
+    merged: dict[str, dict[tuple, dict]] = {}
+    unkeyed: dict[str, list[dict]] = {}
+    for filename, keys in RECORD_KEYS.items():
+        if filenames is not None and filename not in filenames:
+            continue
+        paths = [d / filename for d in shard_dirs if (d / filename).exists()]
+        if not paths:
+            continue
+        records: dict[tuple, dict] = {}
+        unkeyed[filename] = []
+        for path in paths:
+            with open(path) as f:
+                for line in f:
+                    record = json.loads(line)
+                    key = tuple(record.get(k) for k in keys)
+                    if None in key:
+                        unkeyed[filename].append(record)
+                    elif key in records:
+                        records[key] = _merge_duplicate(records[key], record)
+                    else:
+                        records[key] = record
+        merged[filename] = records
+
+    for citing, grant in _CITING_FILES.items():
+        if citing in merged and grant in merged:
+            for key in merged[grant].keys() & merged[citing].keys():
+                del merged[citing][key]
+
+    writer = JSONLWriter(output_dir, changes=changes)
+    counts = {}
+    for filename, records in merged.items():
+        rows = [*records.values(), *unkeyed[filename]]
+        writer.write_lines(filename, (json.dumps(r) + "\n" for r in rows))
+        counts[filename] = len(rows)
+        logger.info("Merged %d %s records", len(rows), filename)
+    return counts
+
+
+def _sum_clients(reports: list[dict]) -> dict:
+    totals: dict[str, dict] = {}
+    for report in reports:
+        for name, stats in report.get("clients", {}).items():
+            total = totals.setdefault(name, {})
+            for field, value in stats.items():
+                if isinstance(value, dict):
+                    counts = total.setdefault(field, {})
+                    for k, v in value.items():
+                        counts[k] = counts.get(k, 0) + v
+                else:
+                    total[field] = round(total.get(field, 0) + value, 4)
+    return dict(sorted(totals.items()))
+
+
+def run_sharded(
+    configs: list[CollectionConfig],
+    output_dir: Path,
+    shards: int,
+    workers: int,
+    transport_factory: Callable[[], httpx.AsyncBaseTransport] | None = None,
+    log_level: int = logging.INFO,
+    **options,
+) -> dict:
+    """Run shards of the combined collections in a process pool and merge their outputs.
+
+    Each shard writes to output_dir/shards/shard_NN/. Per-client request
+    rates are shared by all shards through a RateCoordinator in a manager
+    process. ``options`` are passed to run_pipeline; an OpenAlex snapshot's
+    process pool gets the CPUs divided among the shards running at once.
+    ``transport_factory``
+    must be picklable (used by the offline benchmarks). Changesets are
+    taken of the merged output, not of the shards.
+    """
+    started = time.time()
+    shard_configs = plan_shards(configs, shards)
+    shard_dirs = [output_dir / SHARDS_DIRNAME / f"shard_{i:02d}" for i in range(len(shard_configs))]
+    logger.info(
+        "Running %d shard(s) of %d core project(s) on %d worker(s)",
+        len(shard_configs), sum(len(c.core_project_identifiers) for c in shard_configs), workers,
+    )
+
+    if options.get("openalex_snapshot") is not None and options.get("openalex_workers") is None:
+        concurrent = min(workers, len(shard_configs))
+        options["openalex_workers"] = max(1, (os.cpu_count() or 1) // concurrent)
+    ctx = multiprocessing.get_context("spawn")
+    reports: list[dict] = [{}] * len(shard_configs)
+    with RateCoordinatorManager(ctx=ctx) as manager:
+        coordinator = manager.RateCoordinator()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = {
+                pool.submit(
+                    _run_shard, i, config.model_dump(), shard_dirs[i], options,
+                    coordinator, transport_factory, log_level,
+                ): i
+                for i, config in enumerate(shard_configs)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                reports[i] = future.result()
+                logger.info("Shard %d/%d finished: %s", i + 1, len(shard_configs), reports[i]["status"])
+
+    counts = merge_outputs(shard_dirs, output_dir, changes=ChangeLog.start(output_dir))
+    ledger = FailureLedger()
+    for shard_dir in shard_dirs:
+        ledger.entries.update(FailureLedger.load(shard_dir / FAILED_ITEMS_FILENAME).entries)
+    ledger.write(output_dir)
+    failed = [i for i, r in enumerate(reports) if r.get("status") != "ok"]
+    report = {
+        "status": "error" if failed else "ok",
+        "error": f"shard(s) {failed} failed" if failed else None,
+        "wall_seconds": round(time.time() - started, 3),
+        "shards": [
+            {
+                "shard": i,
+                "core_project_identifiers": list(config.core_project_identifiers),
+                "output_dir": str(shard_dirs[i]),
+                "status": reports[i].get("status"),
+                "error": reports[i].get("error"),
+                "wall_seconds": reports[i].get("wall_seconds"),
+            }
+            for i, config in enumerate(shard_configs)
+        ],
+        "records_merged": counts,
+        "failed_items": len(ledger),
+        "clients": _sum_clients(reports),
+    }
+    (output_dir / REPORT_FILENAME).write_text(json.dumps(report, indent=2))
+    logger.info("Sharded ETL %s. Output directory: %s", report["status"], output_dir)
+    return report
@@ -0,0 +1,228 @@
+import json
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+REPORT_FILENAME = "run_report.json"
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class ClientStats:
+    """Request counters for one client within one step."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.bytes_downloaded = 0
+        self.request_seconds = 0.0
+        self.store_hits = 0
+        self.store_misses = 0
+        self.coalesced = 0
+        self.statuses: Counter[int] = Counter()
+
+    def merge(self, other: "ClientStats") -> None:
+        self.requests += other.requests
+        self.retries += other.retries
+        self.errors += other.errors
+        self.bytes_downloaded += other.bytes_downloaded
+        self.request_seconds += other.request_seconds
+        self.store_hits += other.store_hits
+        self.store_misses += other.store_misses
+        self.coalesced += other.coalesced
+        self.statuses.update(other.statuses)
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limited": self.statuses.get(429, 0),
+            "errors": self.errors,
+            "bytes_downloaded": self.bytes_downloaded,
+            "request_seconds": round(self.request_seconds, 4),
+            "store_hits": self.store_hits,
+            "store_misses": self.store_misses,
+            "coalesced": self.coalesced,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+        }
+
+
+class StepStats:
+    def __init__(self, index: int, name: str):
+        self.index = index
+        self.name = name
+        self.started = time.time()
+        self.seconds: float | None = None
+        self.clients: dict[str, ClientStats] = {}
+        self.writes: list[dict] = []
+
+    def to_dict(self) -> dict:
+        records = sum(w["records"] for w in self.writes)
+        return {
+            "index": self.index,
+            "name": self.name,
+            "seconds": round(self.seconds, 4) if self.seconds is not None else None,
+            "records_written": records,
+            "bytes_written": sum(w["bytes"] for w in self.writes),
+            "records_per_sec": round(records / self.seconds, 1) if self.seconds else None,
+            "clients": {name: stats.to_dict() for name, stats in sorted(self.clients.items())},
+            "writes": self.writes,
+        }
+
+
+class RunTelemetry:
+    """Per-step, per-client counters and timers for one pipeline run.
+
+    Clients and the writer report into whichever step is current; the
+    aggregate is written to run_report.json. With ``record_spans`` the
+    report also carries OpenTelemetry-style spans (run -> step -> request).
+    """
+
+    def __init__(self, record_spans: bool = False):
+        self.record_spans = record_spans
+        self.trace_id = _new_id(16)
+        self.started = time.time()
+        self.steps: list[StepStats] = []
+        self.events: list[dict] = []
+        self.spans: list[dict] = []
+        self._current: StepStats | None = None
+        self._listeners: list = []
+        self._unscoped = StepStats(0, "outside_steps")
+        self._root_span_id = _new_id(8)
+        self._step_span_id: str | None = None
+
+    @property
+    def current_step(self) -> StepStats:
+        return self._current or self._unscoped
+
+    def add_listener(self, listener) -> None:
+        """Register an object with step_started(stats) / step_finished(stats) hooks."""
+        self._listeners.append(listener)
+
+    @contextmanager
+    def step(self, index: int, name: str):
+        stats = StepStats(index, name)
+        self.steps.append(stats)
+        self._current = stats
+        self._step_span_id = _new_id(8)
+        for listener in self._listeners:
+            listener.step_started(stats)
+        start = time.perf_counter()
+        status = "OK"
+        try:
+            yield stats
+        except BaseException:
+            status = "ERROR"
+            raise
+        finally:
+            stats.seconds = time.perf_counter() - start
+            for listener in reversed(self._listeners):
+                listener.step_finished(stats)
+            self._span(
+                f"step {index}: {name}", stats.started, stats.started + stats.seconds,
+                span_id=self._step_span_id, parent=self._root_span_id,
+                attributes={"records_written": sum(w["records"] for w in stats.writes)}, status=status,
+            )
+            self._current = None
+            self._step_span_id = None
+
+    def record_request(
+        self, client: str, method: str, url: str, status: int | None, nbytes: int, seconds: float,
+    ) -> None:
+        stats = self.current_step.clients.setdefault(client, ClientStats())
+        stats.requests += 1
+        stats.request_seconds += seconds
+        stats.bytes_downloaded += nbytes
+        if status is None:
+            stats.errors += 1
+        else:
+            stats.statuses[status] += 1
+        now = time.time()
+        self._span(
+            f"{method} {url}", now - seconds, now,
+            parent=self._step_span_id or self._root_span_id,
+            attributes={"client": client, "http.status_code": status, "bytes": nbytes},
+            status="ERROR" if status is None or status >= 400 else "OK",
+        )
+
+    def record_retry(self, client: str) -> None:
+        self.current_step.clients.setdefault(client, ClientStats()).retries += 1
+
+    def record_store(self, client: str, hits: int, misses: int) -> None:
+        stats = self.current_step.clients.setdefault(client, ClientStats())
+        stats.store_hits += hits
+        stats.store_misses += misses
+
+    def record_coalesced(self, client: str, pmids: int) -> None:
+        self.current_step.clients.setdefault(client, ClientStats()).coalesced += pmids
+
+    def record_write(self, filename: str, records: int, nbytes: int, seconds: float) -> None:
+        self.current_step.writes.append({
+            "file": filename, "records": records, "bytes": nbytes, "seconds": round(seconds, 4),
+        })
+
+    def record_event(self, name: str, **attributes) -> None:
+        self.events.append({
+            "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "step": self.current_step.name,
+            "name": name,
+            **attributes,
+        })
+
+    def _span(
+        self, name: str, start: float, end: float, parent: str | None,
+        attributes: dict, status: str, span_id: str | None = None,
+    ) -> None:
+        if not self.record_spans:
+            return
+        self.spans.append({
+            "trace_id": self.trace_id,
+            "span_id": span_id or _new_id(8),
+            "parent_span_id": parent,
+            "name": name,
+            "start_time_unix_nano": int(start * 1e9),
+            "end_time_unix_nano": int(end * 1e9),
+            "attributes": attributes,
+            "status": status,
+        })
+
+    def report(self, status: str = "ok", error: str | None = None) -> dict:
+        finished = time.time()
+        totals: dict[str, ClientStats] = {}
+        steps = [*self.steps, self._unscoped] if self._unscoped.clients or self._unscoped.writes else self.steps
+        for step in steps:
+            for name, stats in step.clients.items():
+                totals.setdefault(name, ClientStats()).merge(stats)
+        self._span(
+            "run_pipeline", self.started, finished, parent=None,
+            attributes={"steps": len(self.steps)}, status="OK" if status == "ok" else "ERROR",
+            span_id=self._root_span_id,
+        )
+        report = {
+            "status": status,
+            "error": error,
+            "started_at": datetime.fromtimestamp(self.started, timezone.utc).isoformat(timespec="seconds"),
+            "finished_at": datetime.fromtimestamp(finished, timezone.utc).isoformat(timespec="seconds"),
+            "wall_seconds": round(finished - self.started, 3),
+            "steps": [s.to_dict() for s in steps],
+            "clients": {name: stats.to_dict() for name, stats in sorted(totals.items())},
+            "events": self.events,
+        }
+        if self.record_spans:
+            report["spans"] = self.spans
+        return report
+
+    def write_report(self, output_dir: Path, status: str = "ok", error: str | None = None) -> Path:
+        path = output_dir / REPORT_FILENAME
+        path.write_text(json.dumps(self.report(status, error), indent=2))
+        logger.info("Wrote run report to %s", path)
+        return path
@@ -1,21 +1,200 @@
+import hashlib
 import json
+import logging
+import os
+import shutil
+import time
+from collections.abc import Iterable
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
 from pydantic import BaseModel
 
+from icc_eval_etl.pipeline.telemetry import RunTelemetry
+
+logger = logging.getLogger(__name__)
+
+# Identity of a record in each output file, used to merge and deduplicate.
+RECORD_KEYS: dict[str, tuple[str, ...]] = {
+    "projects.jsonl": ("appl_id",),
+    "publication_links.jsonl": ("coreproject", "pmid", "applid"),
+    "publications.jsonl": ("pmid",),
+    "icite.jsonl": ("pmid",),
+    "citation_links.jsonl": ("cited_pmid", "citing_pmid"),
+    "citing_icite.jsonl": ("pmid",),
+    "openalex.jsonl": ("id",),
+    "citing_openalex.jsonl": ("id",),
+    "github_core.jsonl": ("id",),
+}
+
+CHANGES_DIRNAME = "changes"
+CHANGES_MANIFEST = "manifest.json"
+# Under changes/: hashes of the current snapshot, and of the one the changesets start from.
+INDEX_DIRNAME = "index"
+BASE_DIRNAME = "base"
+_HASH_MASK = (1 << 64) - 1
+
+
+def record_key(filename: str, record: dict) -> str:
+    """RECORD_KEYS value of a record as compact JSON (``[123]``, ``["P30CA1", 1, 2]``)."""
+    return json.dumps([record.get(k) for k in RECORD_KEYS[filename]])
+
+
+def _line_hash(line: str) -> int:
+    return int.from_bytes(hashlib.blake2b(line.encode(), digest_size=8).digest())
+
+
+def _snapshot_id() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + "-" + os.urandom(3).hex()
+
+
+def _index_name(filename: str) -> str:
+    return Path(filename).stem + ".json"
+
+
+def _read_json(path: Path) -> dict:
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+class ChangeLog:
+    """Per-record changesets between runs, in output_dir/changes/.
+
+    Every output file in RECORD_KEYS is hashed once it is complete. Records
+    are grouped by key (rows sharing a key, incomplete keys included, change
+    together), and a group's hash is the sum of its JSON lines' 64-bit
+    blake2b digests. The groups are diffed against changes/base/, the index
+    the previous run left, into changes/<file> as insert, update and delete
+    ops. changes/index/ then holds the current snapshot's hashes and becomes
+    the next run's base. manifest.json names the snapshot and its base, so
+    a consumer can tell whether the changesets apply to what it has.
+    """
+
+    def __init__(self, output_dir: Path, telemetry: RunTelemetry | None = None):
+        self.dir = output_dir / CHANGES_DIRNAME
+        self.telemetry = telemetry
+        self.manifest = _read_json(self.dir / CHANGES_MANIFEST)
+
+    @classmethod
+    def start(cls, output_dir: Path, telemetry: RunTelemetry | None = None) -> "ChangeLog":
+        """Begin a run's changesets: the current index becomes the base; old changesets are dropped."""
+        log = cls(output_dir, telemetry)
+        index, base = log.dir / INDEX_DIRNAME, log.dir / BASE_DIRNAME
+        shutil.rmtree(base, ignore_errors=True)
+        for path in log.dir.glob("*.jsonl"):
+            path.unlink()
+        if index.exists():
+            # Copied, not moved: files this run never rewrites keep their hashes.
+            shutil.copytree(index, base)
+        log.manifest = {
+            "snapshot": _snapshot_id(),
+            "base": log.manifest.get("snapshot") if index.exists() else None,
+            "amends": [],
+            "tables": {},
+        }
+        log._write_manifest()
+        return log
+
+    @classmethod
+    def resume(cls, output_dir: Path, telemetry: RunTelemetry | None = None) -> "ChangeLog":
+        """Amend the last run's changesets (``main.py repair``); they stay relative to its base."""
+        log = cls(output_dir, telemetry)
+        if not log.manifest:
+            return cls.start(output_dir, telemetry)
+        log.manifest["amends"].append(log.manifest["snapshot"])
+        log.manifest["snapshot"] = _snapshot_id()
+        log._write_manifest()
+        return log
+
+    def diff(self, path: Path) -> dict[str, int]:
+        """Write changes/<file> for a finished output file and update its index; returns op counts."""
+        start = time.perf_counter()
+        filename = path.name
+        base = _read_json(self.dir / BASE_DIRNAME / _index_name(filename))
+        sums: dict[str, int] = {}
+        keys: list[str] = []
+        with open(path) as f:
+            for line in f:
+                key = record_key(filename, json.loads(line))
+                keys.append(key)
+                sums[key] = (sums.get(key, 0) + _line_hash(line)) & _HASH_MASK
+        index = {key: f"{h:016x}" for key, h in sums.items()}
+        ops = {key: "update" if key in base else "insert" for key, h in index.items() if base.get(key) != h}
+        deleted = base.keys() - index.keys()
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with open(self.dir / filename, "w") as out:
+            for key in sorted(deleted):
+                out.write(f'{{"op": "delete", "key": {key}}}\n')
+            if ops:
+                # Changed groups go out whole, spliced from the snapshot lines as written.
+                with open(path) as f:
+                    for key, line in zip(keys, f):
+                        op = ops.get(key)
+                        if op is not None:
+                            out.write(f'{{"op": "{op}", "key": {key}, "record": {line.rstrip()}}}\n')
+        (self.dir / INDEX_DIRNAME).mkdir(exist_ok=True)
+        (self.dir / INDEX_DIRNAME / _index_name(filename)).write_text(json.dumps(index, separators=(",", ":")))
+
+        inserted = sum(op == "insert" for op in ops.values())
+        counts = {"inserted": inserted, "updated": len(ops) - inserted, "deleted": len(deleted)}
+        self.manifest["tables"][filename] = counts
+        self._write_manifest()
+        logger.info(
+            "Changes in %s: %d inserted, %d updated, %d deleted of %d key(s) (%.2fs)",
+            filename, counts["inserted"], counts["updated"], counts["deleted"], len(index),
+            time.perf_counter() - start,
+        )
+        if self.telemetry is not None:
+            self.telemetry.record_event("changes", file=filename, **counts)
+        return counts
+
+    def _write_manifest(self) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        (self.dir / CHANGES_MANIFEST).write_text(json.dumps(self.manifest, indent=2))
+
 
 class JSONLWriter:
-    def __init__(self, output_dir: Path, extra_fields: dict[str, Any] | None = None):
+    def __init__(
+        self,
+        output_dir: Path,
+        extra_fields: dict[str, Any] | None = None,
+        telemetry: RunTelemetry | None = None,
+        changes: ChangeLog | None = None,
+    ):
         self.output_dir = output_dir
         self.extra_fields = extra_fields or {}
+        self.telemetry = telemetry
+        self.changes = changes
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
     def write(self, filename: str, records: list[BaseModel]) -> Path:
         path = self.output_dir / filename
+        start = time.perf_counter()
         with open(path, "w") as f:
             for record in records:
                 data = record.model_dump(mode="json")
                 data.update(self.extra_fields)
                 f.write(json.dumps(data) + "\n")
+        self._record(path, len(records), start)
         return path
+
+    def write_lines(self, filename: str, lines: Iterable[str]) -> Path:
+        """Write pre-formatted JSONL text (newline-terminated) in bulk."""
+        path = self.output_dir / filename
+        start = time.perf_counter()
+        count = 0
+        with open(path, "w") as f:
+            for chunk in lines:
+                count += chunk.count("\n")
+                f.write(chunk)
+        self._record(path, count, start)
+        return path
+
+    def _record(self, path: Path, records: int, start: float) -> None:
+        if self.telemetry is not None:
+            self.telemetry.record_write(
+                path.name, records, path.stat().st_size, time.perf_counter() - start,
+            )
+        if self.changes is not None and path.name in RECORD_KEYS:
+            self.changes.diff(path)
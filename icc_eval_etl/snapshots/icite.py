@@ -0,0 +1,99 @@
+import logging
+import os
+from pathlib import Path
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".duckdb"
+# The API returns these as PMID lists; CSV snapshots store space-separated text.
+PMID_LIST_COLUMNS = ("cited_by", "references", "cited_by_clin")
+LOOKUP_CHUNK = 100_000
+
+
+def _reader(snapshot: str) -> str:
+    quoted = snapshot.replace("'", "''")
+    if ".json" in snapshot.lower():
+        return f"read_json_auto('{quoted}', maximum_object_size=1073741824)"
+    return f"read_csv('{quoted}', header = true)"
+
+
+def _index_select(con: duckdb.DuckDBPyConnection, snapshot: str) -> str:
+    columns = con.execute(f"DESCRIBE SELECT * FROM {_reader(snapshot)}").fetchall()
+    replaced = []
+    for name, column_type, *_ in columns:
+        # "references" is a reserved word
+        col = '"' + name.replace('"', '""') + '"'
+        if name in PMID_LIST_COLUMNS and column_type == "VARCHAR":
+            replaced.append(
+                f"CASE WHEN trim(coalesce({col}, '')) = '' THEN []::BIGINT[] "
+                f"ELSE list_transform(string_split(trim({col}), ' '), x -> x::BIGINT) END AS {col}"
+            )
+        elif column_type.startswith("DECIMAL"):
+            replaced.append(f"{col}::DOUBLE AS {col}")
+    replace = f" REPLACE ({', '.join(replaced)})" if replaced else ""
+    return f"SELECT *{replace} FROM {_reader(snapshot)} WHERE pmid IS NOT NULL ORDER BY pmid"
+
+
+def index_path_for(snapshot: Path) -> Path:
+    return snapshot if snapshot.suffix == INDEX_SUFFIX else snapshot.with_name(snapshot.name + INDEX_SUFFIX)
+
+
+def ensure_icite_index(snapshot: Path) -> Path:
+    """Index an iCite snapshot (CSV or JSON, optionally gzipped) into a PMID-sorted DuckDB file.
+
+    Returns the index path, ``<snapshot>.duckdb`` next to the snapshot.
+    An existing index built from the same file size and mtime is reused;
+    a ``.duckdb`` path is taken to be an index already.
+    """
+    index = index_path_for(snapshot)
+    if snapshot == index:
+        return index
+    stat = snapshot.stat()
+    if index.exists():
+        with duckdb.connect(str(index), read_only=True) as con:
+            built_from = con.execute("SELECT size, mtime FROM _snapshot").fetchone()
+        if built_from == (stat.st_size, stat.st_mtime):
+            logger.info("Using iCite snapshot index %s", index)
+            return index
+        logger.info("iCite snapshot %s changed since it was indexed; rebuilding", snapshot)
+
+    logger.info("Indexing iCite snapshot %s into %s (one-off)", snapshot, index)
+    partial = index.with_name(index.name + ".partial")
+    partial.unlink(missing_ok=True)
+    with duckdb.connect(str(partial)) as con:
+        con.execute(f"CREATE TABLE icite AS {_index_select(con, str(snapshot))}")
+        con.execute(
+            "CREATE TABLE _snapshot AS SELECT ? AS source, ?::BIGINT AS size, ?::DOUBLE AS mtime, now() AS indexed_at",
+            [str(snapshot), stat.st_size, stat.st_mtime],
+        )
+        rows = con.execute("SELECT count(*) FROM icite").fetchone()[0]
+    os.replace(partial, index)
+    logger.info("Indexed %d iCite records", rows)
+    return index
+
+
+class ICiteSnapshot:
+    """Read-only bulk PMID lookups against an index built by ensure_icite_index."""
+
+    def __init__(self, index: Path):
+        self.index = index
+        self._con = duckdb.connect(str(index), read_only=True)
+
+    def lookup(self, pmids: list[int]) -> dict[int, dict]:
+        """Snapshot rows for the PMIDs it has, as dicts in the API's record shape."""
+        found: dict[int, dict] = {}
+        for i in range(0, len(pmids), LOOKUP_CHUNK):
+            cursor = self._con.execute(
+                "SELECT * FROM icite WHERE pmid IN (SELECT unnest(?::BIGINT[]))",
+                [pmids[i : i + LOOKUP_CHUNK]],
+            )
+            columns = [d[0] for d in cursor.description]
+            for row in cursor.fetchall():
+                record = dict(zip(columns, row))
+                found[record["pmid"]] = record
+        return found
+
+    def close(self) -> None:
+        self._con.close()
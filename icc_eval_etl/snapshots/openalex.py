@@ -0,0 +1,198 @@
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sqlite3
+from array import array
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "pmid_index.sqlite"
+# PRAGMA user_version of the index layout; older indexes are rebuilt.
+INDEX_VERSION = 1
+# ids.pmid sits near the top of each work; matching it avoids parsing every line.
+_PMID = re.compile(rb'"pmid":\s*"https://pubmed\.ncbi\.nlm\.nih\.gov/(\d+)"')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS partitions (
+    id    INTEGER PRIMARY KEY,
+    path  TEXT    NOT NULL UNIQUE,
+    size  INTEGER NOT NULL,
+    mtime REAL    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS works (
+    pmid        INTEGER NOT NULL,
+    partition   INTEGER NOT NULL,
+    line_offset INTEGER NOT NULL,
+    PRIMARY KEY (pmid, partition)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS works_partition ON works (partition);
+"""
+
+
+def _index_partition(path: str) -> tuple[bytes, bytes]:
+    """(pmids, uncompressed line offsets) for every work with a PMID in one partition."""
+    pmids, offsets = array("q"), array("q")
+    offset = 0
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            match = _PMID.search(line)
+            if match:
+                pmids.append(int(match.group(1)))
+                offsets.append(offset)
+            offset += len(line)
+    return pmids.tobytes(), offsets.tobytes()
+
+
+def _read_partition(path: str, offsets: list[int]) -> list[bytes]:
+    """Lines at sorted uncompressed offsets; gzip seeks forward by decompressing."""
+    lines = []
+    with gzip.open(path, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            lines.append(f.readline())
+    return lines
+
+
+def pmid_from_ids(ids: dict | None) -> int | None:
+    """PMID from a work's ids.pmid, which OpenAlex gives as a PubMed URL."""
+    url = (ids or {}).get("pmid")
+    if not url:
+        return None
+    try:
+        return int(url.rstrip("/").rsplit("/", 1)[-1])
+    except ValueError:
+        return None
+
+
+class OpenAlexSnapshot:
+    """PMID lookups against a local OpenAlex works snapshot (partitioned gzip JSONL).
+
+    ``root`` is the snapshot's ``data/works`` directory (or the snapshot
+    root containing it). A PMID -> (partition, offset) index is built in a
+    process pool on first use and updated for new or changed partitions;
+    lookups then read only the partitions holding requested PMIDs, in
+    parallel, and parse only the matching lines. The index keeps every
+    partition a PMID appears in and lookups take the newest, so removing a
+    partition falls back to the next newest. ``workers`` sizes the pool
+    (default: one per CPU).
+    """
+
+    def __init__(self, root: Path, index: Path | None = None, workers: int | None = None):
+        self.root = root / "data" / "works" if (root / "data" / "works").is_dir() else root
+        self.index = index or self.root / INDEX_FILENAME
+        self.workers = workers or os.cpu_count() or 1
+        # Lookups run in a worker thread (asyncio.to_thread), one at a time.
+        self._con = sqlite3.connect(self.index, timeout=60, check_same_thread=False)
+        if self._con.execute("PRAGMA user_version").fetchone()[0] < INDEX_VERSION:
+            # Version 0 kept one partition per PMID, so removed partitions lost PMIDs.
+            self._con.executescript("DROP TABLE IF EXISTS works; DROP TABLE IF EXISTS partitions;")
+            self._con.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self._con.executescript(_SCHEMA)
+        self._checked = False
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Kept for the snapshot's lifetime; steps 8 and 9 both look up works.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def ensure_index(self) -> None:
+        """Index partitions that are new or changed since the last run; drop removed ones."""
+        partitions = sorted(self.root.rglob("*.gz"))
+        known = {path: (pid, size, mtime) for pid, path, size, mtime in self._con.execute("SELECT * FROM partitions")}
+        current = {str(p) for p in partitions}
+        stale = [path for path, (pid, size, mtime) in known.items() if path not in current]
+        todo = []
+        for path in partitions:
+            stat = path.stat()
+            entry = known.get(str(path))
+            if entry is None or entry[1:] != (stat.st_size, stat.st_mtime):
+                todo.append((path, stat))
+                if entry is not None:
+                    stale.append(str(path))
+        with self._con:
+            for path in stale:
+                pid = known[path][0]
+                self._con.execute("DELETE FROM works WHERE partition = ?", (pid,))
+                self._con.execute("DELETE FROM partitions WHERE id = ?", (pid,))
+        if todo:
+            logger.info("Indexing %d OpenAlex snapshot partition(s) on %d worker(s)", len(todo), self.workers)
+            for (path, stat), (pmids, offsets) in zip(
+                todo, self._pool().map(_index_partition, [str(p) for p, _ in todo])
+            ):
+                self._add_partition(path, stat, pmids, offsets)
+            total = self._con.execute("SELECT count(DISTINCT pmid) FROM works").fetchone()[0]
+            logger.info("OpenAlex snapshot index %s covers %d PMIDs", self.index, total)
+        self._checked = True
+
+    def _add_partition(self, path: Path, stat: os.stat_result, pmids: bytes, offsets: bytes) -> None:
+        pmid_array, offset_array = array("q"), array("q")
+        pmid_array.frombytes(pmids)
+        offset_array.frombytes(offsets)
+        with self._con:
+            pid = self._con.execute(
+                "INSERT INTO partitions (path, size, mtime) VALUES (?, ?, ?)",
+                (str(path), stat.st_size, stat.st_mtime),
+            ).lastrowid
+            # Within a partition the last line for a PMID wins.
+            self._con.executemany(
+                "INSERT OR REPLACE INTO works (pmid, partition, line_offset) VALUES (?, ?, ?)",
+                ((pmid, pid, offset) for pmid, offset in zip(pmid_array, offset_array)),
+            )
+
+    def _locate(self, pmids: list[int]) -> dict[str, list[int]]:
+        """Sorted line offsets to read per partition path, for the indexed PMIDs.
+
+        Partition paths sort in updated_date order, so a PMID's newest work
+        is the one in its greatest path.
+        """
+        self._con.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (pmid INTEGER PRIMARY KEY)")
+        with self._con:
+            self._con.execute("DELETE FROM wanted")
+            self._con.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", ((p,) for p in pmids))
+        rows = self._con.execute(
+            "SELECT path, line_offset FROM ("
+            "  SELECT p.path, w.line_offset, row_number() OVER (PARTITION BY w.pmid ORDER BY p.path DESC) AS n"
+            "  FROM wanted JOIN works w USING (pmid) JOIN partitions p ON p.id = w.partition"
+            ") WHERE n = 1 ORDER BY path, line_offset"
+        )
+        located: dict[str, list[int]] = defaultdict(list)
+        for path, offset in rows:
+            located[path].append(offset)
+        return located
+
+    def lookup(self, pmids: list[int]) -> dict[int, dict]:
+        """Works for the PMIDs the snapshot has, keyed by PMID."""
+        if not self._checked:
+            self.ensure_index()
+        located = self._locate(pmids)
+        if not located:
+            return {}
+        wanted = set(pmids)
+        found: dict[int, dict] = {}
+        paths = list(located)
+        if len(paths) == 1:
+            batches = [_read_partition(paths[0], located[paths[0]])]
+        else:
+            batches = self._pool().map(_read_partition, paths, [located[p] for p in paths])
+        for lines in batches:
+            for line in lines:
+                work = json.loads(line)
+                pmid = pmid_from_ids(work.get("ids"))
+                if pmid in wanted:
+                    found[pmid] = work
+        return found
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+        self._con.close()
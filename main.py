@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import os
 from pathlib import Path
 
 import typer
@@ -7,25 +8,139 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+from icc_eval_etl.clients.concurrency import parse_bounds
 from icc_eval_etl.config import load_config
+from icc_eval_etl.entity_store import EntityStore
 from icc_eval_etl.pipeline.orchestrator import run_pipeline
+from icc_eval_etl.pipeline.planner import plan_run
+from icc_eval_etl.pipeline.repair import RATE_FACTOR, run_repair
+from icc_eval_etl.pipeline.sharding import plan_shards, run_sharded
+from icc_eval_etl.snapshots.icite import ensure_icite_index
+from icc_eval_etl.snapshots.openalex import OpenAlexSnapshot
 
 app = typer.Typer()
 
 
-@app.command()
+def _configure_logging(verbose: bool) -> None:
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+
+@app.callback(invoke_without_command=True)
 def main(
-    config: Path = typer.Option("collection.yaml", "--config", "-c", help="Path to collection YAML"),
+    ctx: typer.Context,
+    config: list[Path] = typer.Option([Path("collection.yaml")], "--config", "-c", help="Path to collection YAML (repeat for several collections)"),
     output_dir: Path = typer.Option("output", "--output-dir", "-o", help="Output directory for JSONL files"),
+    citation_depth: int = typer.Option(1, "--citation-depth", min=1, help="Citation hops to crawl from grant publications"),
+    max_citing_pmids: int | None = typer.Option(None, "--max-citing-pmids", help="Cap on citing PMIDs crawled across all hops"),
+    max_requests_per_level: int | None = typer.Option(None, "--max-requests-per-level", help="Cap on iCite requests per crawl hop"),
+    trace_spans: bool = typer.Option(False, "--trace-spans", help="Include per-request trace spans in run_report.json"),
+    profile: bool = typer.Option(False, "--profile", help="Profile each step (cProfile, peak memory, event-loop stalls) into <output-dir>/profile/"),
+    slow_callback_ms: float = typer.Option(100.0, "--slow-callback-ms", help="Event-loop stall threshold for --profile"),
+    shards: int | None = typer.Option(None, "--shards", min=1, help="Split the combined core projects into N shards (default: one per --config)"),
+    workers: int | None = typer.Option(None, "--workers", min=1, help="Processes running shards in parallel (default: min(shards, CPUs))"),
+    store: Path | None = typer.Option(None, "--store", help="SQLite entity store shared across collections (iCite, OpenAlex, Europe PMC)"),
+    icite_snapshot: Path | None = typer.Option(None, "--icite-snapshot", help="Local iCite snapshot (CSV/JSON, indexed on first use) to serve iCite lookups"),
+    openalex_snapshot: Path | None = typer.Option(None, "--openalex-snapshot", help="Local OpenAlex works snapshot directory (partitioned gzip JSONL) to serve steps 8-9"),
+    openalex_index: Path | None = typer.Option(None, "--openalex-index", help="PMID index for --openalex-snapshot (default: <snapshot>/data/works/pmid_index.sqlite)"),
+    plan: bool = typer.Option(False, "--plan", help="Print projected requests and wall time without running (sizes from <output-dir> or NIH Reporter)"),
+    concurrency: list[str] = typer.Option([], "--concurrency", help="Adaptive in-flight bounds for a host as HOST=FLOOR:CEILING (repeatable)"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable debug logging"),
 ) -> None:
     """Fetch NIH grant evaluation data and write JSONL output."""
-    logging.basicConfig(
-        level=logging.DEBUG if verbose else logging.INFO,
-        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    if ctx.invoked_subcommand is not None:
+        return
+    _configure_logging(verbose)
+    try:
+        bounds = parse_bounds(concurrency)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--concurrency")
+    collections = [load_config(path) for path in config]
+    if plan:
+        # Shards share per-host rates, so the combined collection is planned as one run.
+        run_plan = asyncio.run(plan_run(
+            plan_shards(collections, 1)[0],
+            output_dir,
+            citation_depth=citation_depth,
+            max_citing_pmids=max_citing_pmids,
+            max_requests_per_level=max_requests_per_level,
+            store_path=store,
+            icite_snapshot=icite_snapshot,
+            openalex_snapshot=openalex_snapshot,
+            sharded=len(plan_shards(collections, shards or len(collections))) > 1,
+        ))
+        typer.echo(run_plan.format())
+        return
+    options = dict(
+        citation_depth=citation_depth,
+        max_citing_pmids=max_citing_pmids,
+        max_requests_per_level=max_requests_per_level,
+        trace_spans=trace_spans,
+        profile=profile,
+        slow_callback_seconds=slow_callback_ms / 1000.0,
+        store_path=store,
+        # Indexed here, once, so shard processes only ever open it read-only.
+        icite_snapshot=ensure_icite_index(icite_snapshot) if icite_snapshot else None,
+        openalex_snapshot=openalex_snapshot,
+        openalex_index=openalex_index,
+        concurrency=bounds or None,
     )
-    collection = load_config(config)
-    asyncio.run(run_pipeline(collection, output_dir))
+    if openalex_snapshot is not None:
+        snapshot = OpenAlexSnapshot(openalex_snapshot, openalex_index)
+        snapshot.ensure_index()
+        snapshot.close()
+    shard_configs = plan_shards(collections, shards or len(collections))
+    if len(shard_configs) == 1:
+        asyncio.run(run_pipeline(shard_configs[0], output_dir, **options))
+        return
+    report = run_sharded(
+        collections,
+        output_dir,
+        shards=len(shard_configs),
+        workers=workers or min(len(shard_configs), os.cpu_count() or 1),
+        log_level=logging.DEBUG if verbose else logging.INFO,
+        **options,
+    )
+    if report["status"] != "ok":
+        raise typer.Exit(code=1)
+
+
+@app.command("compact-store")
+def compact_store(
+    store: Path = typer.Option(..., "--store", help="SQLite entity store to compact"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable debug logging"),
+) -> None:
+    """Drop expired entity store entries and reclaim space."""
+    _configure_logging(verbose)
+    if not store.exists():
+        raise typer.BadParameter(f"{store} does not exist", param_hint="--store")
+    entity_store = EntityStore(store)
+    try:
+        entity_store.compact()
+        for source, counts in entity_store.stats().items():
+            typer.echo(f"{source}: {counts['entries']} entries ({counts['negative']} negative)")
+    finally:
+        entity_store.close()
+
+
+@app.command("repair")
+def repair(
+    output_dir: Path = typer.Option("output", "--output-dir", "-o", help="Output directory of the run to repair"),
+    rate_factor: float = typer.Option(RATE_FACTOR, "--rate-factor", min=0.01, max=1.0, help="Fraction of each client's normal request rate"),
+    store: Path | None = typer.Option(None, "--store", help="SQLite entity store shared across collections (iCite, OpenAlex, Europe PMC)"),
+    citation_depth: int | None = typer.Option(None, "--citation-depth", min=1, help="Citation hops to crawl from recovered grant iCite records (default: the depth of the last run)"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable debug logging"),
+) -> None:
+    """Re-fetch the items in <output-dir>/failed_items.jsonl and merge them into the outputs."""
+    _configure_logging(verbose)
+    ledger = asyncio.run(run_repair(
+        output_dir, rate_factor=rate_factor, store_path=store, citation_depth=citation_depth,
+    ))
+    if ledger:
+        typer.echo(f"{len(ledger)} item(s) still failing, see {output_dir / 'failed_items.jsonl'}")
+        raise typer.Exit(code=1)
 
 
 if __name__ == "__main__":
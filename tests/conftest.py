@@ -0,0 +1,14 @@
+import pytest
+
+from benchmarks.fake_apis import FakeAPIs
+from benchmarks.synthetic import SyntheticCorpus
+
+
+@pytest.fixture
+def corpus() -> SyntheticCorpus:
+    return SyntheticCorpus(1000, seed=1)
+
+
+@pytest.fixture
+def apis(corpus: SyntheticCorpus) -> FakeAPIs:
+    return FakeAPIs(corpus)
@@ -0,0 +1,76 @@
+import duckdb
+import pytest
+
+from database_mcp_server.catalog import CATALOG_TABLE, Catalog, build_catalog
+from database_mcp_server.db import ReadOnlyDatabase
+from database_mcp_server.server import build_tool_description
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A database with two small tables and no catalog, as materialized before the catalog existed."""
+    path = tmp_path / "icc-eval.duckdb"
+    con = duckdb.connect(str(path))
+    con.execute(
+        "CREATE TABLE publications AS SELECT * FROM (VALUES "
+        "(1, 'Cancer genomics atlas', 2020), (2, NULL, 2021), (3, 'Mouse models', 2021), (4, 'Unrelated', NULL)"
+        ") t(pmid, title, pub_year)"
+    )
+    con.execute("CREATE TABLE projects AS SELECT * FROM (VALUES (10, 'U54OD000000')) t(appl_id, core_project_num)")
+    con.close()
+    return path
+
+
+def _build(path, tables):
+    con = duckdb.connect(str(path))
+    build_catalog(con, tables)
+    con.close()
+
+
+def test_catalog_has_column_statistics(db_path):
+    _build(db_path, ["projects", "publications"])
+    catalog = Catalog.load(ReadOnlyDatabase(db_path))
+
+    assert catalog.table_names() == ["projects", "publications"]
+    assert not catalog.has_table(CATALOG_TABLE)
+    assert catalog.column_names("publications") == ["pmid", "title", "pub_year"]
+    assert catalog.row_count("publications") == 4
+    assert catalog.row_count("projects") == 1
+    title, pub_year = catalog.columns("publications")[1:]
+    assert title["column_type"] == "VARCHAR"
+    assert title["null_fraction"] == pytest.approx(0.25)
+    assert (pub_year["min_value"], pub_year["max_value"]) == ("2020", "2021")
+    assert pub_year["approx_distinct"] == 2
+
+
+def test_catalog_is_rebuilt_not_appended(db_path):
+    _build(db_path, ["projects", "publications"])
+    _build(db_path, ["projects"])
+    catalog = Catalog.load(ReadOnlyDatabase(db_path))
+    assert catalog.table_names() == ["projects"]
+
+
+@pytest.mark.parametrize("in_memory", [False, True])
+def test_catalog_falls_back_to_describe(db_path, in_memory, caplog):
+    catalog = Catalog.load(ReadOnlyDatabase(db_path, in_memory=in_memory))
+
+    assert "re-run materialize" in caplog.text
+    assert catalog.table_names() == ["projects", "publications"]
+    assert catalog.columns("projects") == [
+        {"column_name": "appl_id", "column_type": "INTEGER"},
+        {"column_name": "core_project_num", "column_type": "VARCHAR"},
+    ]
+    assert catalog.row_count("projects") is None
+
+
+def test_tool_description_lists_catalog_columns_in_documented_order(db_path):
+    _build(db_path, ["projects", "publications"])
+    con = duckdb.connect(str(db_path))
+    con.execute("CREATE TABLE extra AS SELECT 1 AS x")
+    build_catalog(con, ["extra", "publications", "projects"])
+    con.close()
+
+    description = build_tool_description(Catalog.load(ReadOnlyDatabase(db_path)))
+    headings = [line for line in description.splitlines() if line.startswith("### ")]
+    assert headings == ["### projects (1 rows)", "### publications (4 rows)", "### extra (1 rows)"]
+    assert "Columns: pmid, title, pub_year" in description
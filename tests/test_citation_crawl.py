@@ -0,0 +1,89 @@
+import asyncio
+from array import array
+
+import pytest
+
+from icc_eval_etl.clients.icite import ICiteClient
+from icc_eval_etl.models.icite import ICiteRecord
+from icc_eval_etl.pipeline.citation_crawl import crawl_citations
+from icc_eval_etl.pipeline.citation_graph import CitationGraph
+
+
+class _Interrupted(Exception):
+    pass
+
+
+class _RecordingICite:
+    """Wraps an ICiteClient, counting fetch_metrics calls and failing call number ``fail_on``."""
+
+    def __init__(self, client: ICiteClient, fail_on: int | None = None):
+        self.client = client
+        self.fail_on = fail_on
+        self.calls = 0
+
+    async def fetch_metrics(self, pmids: list[int]) -> list[ICiteRecord]:
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise _Interrupted(f"interrupted at call {self.calls}")
+        return await self.client.fetch_metrics(pmids)
+
+
+def _seed(client: ICiteClient, corpus) -> tuple[CitationGraph, array]:
+    seeds = array("q", corpus.grant_pmids)
+    records = asyncio.run(client.fetch_metrics(seeds.tolist()))
+    return CitationGraph.from_icite(records), seeds
+
+
+def _crawl(icite, graph, seeds, checkpoint_dir=None, depth=3):
+    crawl = asyncio.run(crawl_citations(icite, graph, seeds, depth=depth, checkpoint_dir=checkpoint_dir))
+    return list(crawl.edge_lines()), sorted((r.pmid, r.hop) for r in crawl.records())
+
+
+@pytest.fixture
+def client(apis) -> ICiteClient:
+    return ICiteClient(transport=apis.transport, rate_limit=1000)
+
+
+@pytest.mark.parametrize("interrupt_at", [2, 3])
+def test_interrupted_crawl_resumes_to_same_output(client, corpus, tmp_path, interrupt_at):
+    graph, seeds = _seed(client, corpus)
+    expected = _crawl(client, graph, seeds)
+
+    checkpoints = tmp_path / "crawl_checkpoints"
+    with pytest.raises(_Interrupted):
+        _crawl(_RecordingICite(client, fail_on=interrupt_at), graph, seeds, checkpoints)
+    assert (checkpoints / f"level_{interrupt_at - 1}.jsonl").exists()
+
+    resumed = _RecordingICite(client)
+    assert _crawl(resumed, graph, seeds, checkpoints) == expected
+    # Completed hops came from the checkpoint; only the rest were fetched.
+    assert resumed.calls == 3 - (interrupt_at - 1)
+    assert not checkpoints.exists()
+
+
+def test_changed_seed_graph_invalidates_checkpoint(client, corpus, tmp_path):
+    graph, seeds = _seed(client, corpus)
+    checkpoints = tmp_path / "crawl_checkpoints"
+    with pytest.raises(_Interrupted):
+        _crawl(_RecordingICite(client, fail_on=2), graph, seeds, checkpoints)
+
+    # New upstream citations of one grant publication since the interrupted run.
+    records = asyncio.run(client.fetch_metrics(seeds.tolist()))
+    records[0].cited_by = sorted({*records[0].cited_by, *corpus.citing_pmids[-5:]})
+    changed = CitationGraph.from_icite(records)
+    expected = _crawl(client, changed, seeds)
+
+    rerun = _RecordingICite(client)
+    assert _crawl(rerun, changed, seeds, checkpoints) == expected
+    assert rerun.calls == 3
+
+
+def test_completed_crawl_is_not_reused(client, corpus, tmp_path):
+    graph, seeds = _seed(client, corpus)
+    checkpoints = tmp_path / "crawl_checkpoints"
+    _crawl(client, graph, seeds, checkpoints, depth=1)
+    assert not checkpoints.exists()
+
+    rerun = _RecordingICite(client)
+    _crawl(rerun, graph, seeds, checkpoints, depth=1)
+    assert rerun.calls == 1
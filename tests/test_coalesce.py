@@ -0,0 +1,161 @@
+import asyncio
+
+import httpx
+
+from benchmarks.fake_apis import ICITE_HOST
+from icc_eval_etl.clients.coalesce import Coalescer
+from icc_eval_etl.clients.icite import ICiteClient
+
+
+class _Source:
+    """A fetch function that records its batches; PMIDs in ``failing`` are left out of the result."""
+
+    def __init__(self, failing: set[int] = frozenset(), error: Exception | None = None):
+        self.batches: list[list[int]] = []
+        self.failing = set(failing)
+        self.error = error
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def fetch(self, pmids: list[int]) -> dict[int, str | None]:
+        self.batches.append(list(pmids))
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        # Even PMIDs are "not found": a resolved None, unlike a failure.
+        return {p: (f"v{p}" if p % 2 else None) for p in pmids if p not in self.failing}
+
+
+def test_callers_in_one_iteration_share_one_fetch():
+    source = _Source()
+
+    async def run():
+        coalescer = Coalescer("test", source.fetch)
+        return await asyncio.gather(coalescer.get_many([1, 2, 3]), coalescer.get_many([3, 5, 5]))
+
+    (first, shared_first), (second, shared_second) = asyncio.run(run())
+    assert source.batches == [[1, 2, 3, 5]]
+    assert first == {1: "v1", 2: None, 3: "v3"} and shared_first == 0
+    assert second == {3: "v3", 5: "v5"} and shared_second == 1
+
+
+def test_in_flight_pmids_are_joined_not_refetched():
+    source = _Source()
+    source.release.clear()
+
+    async def run():
+        coalescer = Coalescer("test", source.fetch)
+        first = asyncio.create_task(coalescer.get_many([1, 3]))
+        await asyncio.sleep(0.01)
+        assert source.batches == [[1, 3]]
+        second = asyncio.create_task(coalescer.get_many([3, 7]))
+        await asyncio.sleep(0.01)
+        source.release.set()
+        return await first, await second
+
+    first, (second, shared) = asyncio.run(run())
+    assert source.batches == [[1, 3], [7]]
+    assert first == ({1: "v1", 3: "v3"}, 0)
+    assert second == {3: "v3", 7: "v7"} and shared == 1
+
+
+def test_completed_values_are_memoized_for_the_run():
+    source = _Source()
+
+    async def run():
+        coalescer = Coalescer("test", source.fetch)
+        await coalescer.get_many([1, 2])
+        return await coalescer.get_many([1, 2, 3])
+
+    values, shared = asyncio.run(run())
+    assert source.batches == [[1, 2], [3]]
+    assert values == {1: "v1", 2: None, 3: "v3"} and shared == 2
+
+
+def test_failed_pmids_are_not_memoized():
+    source = _Source(failing={3})
+
+    async def run():
+        coalescer = Coalescer("test", source.fetch)
+        first = await coalescer.get_many([1, 3])
+        source.failing.clear()
+        return first, await coalescer.get_many([1, 3])
+
+    (first, _), (second, shared) = asyncio.run(run())
+    assert first == {1: "v1"}
+    assert second == {1: "v1", 3: "v3"} and shared == 1
+    assert source.batches == [[1, 3], [3]]
+
+
+def test_fetch_error_reaches_every_waiter_and_is_not_memoized():
+    source = _Source(error=RuntimeError("boom"))
+
+    async def run():
+        coalescer = Coalescer("test", source.fetch)
+        results = await asyncio.gather(coalescer.get_many([1]), coalescer.get_many([1, 3]), return_exceptions=True)
+        source.error = None
+        return results, await coalescer.get_many([1, 3])
+
+    results, (values, shared) = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert values == {1: "v1", 3: "v3"} and shared == 0
+    assert source.batches == [[1, 3], [1, 3]]
+
+
+def test_cancelled_caller_does_not_cancel_a_shared_fetch():
+    source = _Source()
+    source.release.clear()
+
+    async def run():
+        coalescer = Coalescer("test", source.fetch)
+        first = asyncio.create_task(coalescer.get_many([1]))
+        second = asyncio.create_task(coalescer.get_many([1]))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        source.release.set()
+        return await second
+
+    assert asyncio.run(run()) == ({1: "v1"}, 1)
+    assert source.batches == [[1]]
+
+
+def test_icite_client_fetches_each_pmid_once_per_run(apis, corpus):
+    pmids = list(corpus.grant_pmids[:10])
+
+    async def run():
+        client = ICiteClient(transport=apis.transport, rate_limit=1000)
+        try:
+            first, second = await asyncio.gather(client.fetch_metrics(pmids), client.fetch_metrics(pmids[5:]))
+            third = await client.fetch_metrics(pmids)
+            return first, second, third
+        finally:
+            await client.close()
+
+    first, second, third = asyncio.run(run())
+    assert apis.requests[ICITE_HOST] == 1
+    assert sorted(r.pmid for r in first) == sorted(r.pmid for r in third)
+    assert {r.pmid for r in second} <= {r.pmid for r in first}
+
+
+def test_icite_client_refetches_pmids_of_a_failed_batch(apis, corpus):
+    pmids = list(corpus.grant_pmids[:10])
+    failing = [True]
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        if failing[0]:
+            return httpx.Response(400, text="injected failure")
+        return await apis.handle(request)
+
+    async def run():
+        client = ICiteClient(transport=httpx.MockTransport(handle), rate_limit=1000)
+        try:
+            first = await client.fetch_metrics(pmids)
+            failing[0] = False
+            return first, await client.fetch_metrics(pmids)
+        finally:
+            await client.close()
+
+    first, second = asyncio.run(run())
+    assert first == []
+    assert second and apis.requests[ICITE_HOST] == 1
+
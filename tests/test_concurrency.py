@@ -0,0 +1,115 @@
+import asyncio
+
+import httpx
+import pytest
+
+from icc_eval_etl.clients.concurrency import INITIAL_LIMIT, MIN_LATENCY_SAMPLES, AdaptiveLimiter, parse_bounds
+from icc_eval_etl.pipeline.telemetry import RunTelemetry
+
+OK = httpx.Response(200)
+
+
+def _saturate(limiter: AdaptiveLimiter) -> None:
+    """Take every slot, as requests queued behind the limit would."""
+    async def run():
+        for _ in range(limiter.limit):
+            await limiter.acquire()
+
+    asyncio.run(run())
+
+
+def test_parse_bounds():
+    assert parse_bounds(["api.test=2:16", "other.test=1:1"]) == {"api.test": (2, 16), "other.test": (1, 1)}
+    for spec in ("api.test", "api.test=4", "api.test=a:b", "api.test=0:4", "api.test=8:4"):
+        with pytest.raises(ValueError):
+            parse_bounds([spec])
+
+
+def test_limit_starts_inside_bounds():
+    assert AdaptiveLimiter("api.test", 1, 32).limit == INITIAL_LIMIT
+    assert AdaptiveLimiter("api.test", 8, 32).limit == 8
+    assert AdaptiveLimiter("api.test", 1, 2).limit == 2
+
+
+def test_saturated_healthy_window_increases_limit_by_one():
+    telemetry = RunTelemetry()
+    limiter = AdaptiveLimiter("api.test", 1, 32, telemetry)
+    _saturate(limiter)
+    for _ in range(INITIAL_LIMIT - 1):
+        limiter.record(limiter.epoch, OK, 0.1)
+    assert limiter.limit == INITIAL_LIMIT
+    limiter.record(limiter.epoch, OK, 0.1)
+    assert limiter.limit == INITIAL_LIMIT + 1
+
+    event = telemetry.events[-1]
+    assert (event["name"], event["previous"], event["limit"]) == ("concurrency", INITIAL_LIMIT, INITIAL_LIMIT + 1)
+
+
+def test_unsaturated_limit_does_not_grow():
+    limiter = AdaptiveLimiter("api.test", 1, 32)
+    for _ in range(10 * INITIAL_LIMIT):
+        limiter.record(limiter.epoch, OK, 0.1)
+    assert limiter.limit == INITIAL_LIMIT
+
+
+def test_limit_does_not_grow_past_ceiling():
+    limiter = AdaptiveLimiter("api.test", 1, INITIAL_LIMIT)
+    _saturate(limiter)
+    for _ in range(2 * INITIAL_LIMIT):
+        limiter.record(limiter.epoch, OK, 0.1)
+    assert limiter.limit == INITIAL_LIMIT
+
+
+@pytest.mark.parametrize("response", [httpx.Response(429), httpx.Response(503), None])
+def test_congestion_halves_limit(response):
+    limiter = AdaptiveLimiter("api.test", 1, 32)
+    limiter.record(limiter.epoch, response, 0.1)
+    assert limiter.limit == INITIAL_LIMIT // 2
+    assert limiter.epoch == 1
+
+
+def test_one_burst_of_errors_cuts_once():
+    limiter = AdaptiveLimiter("api.test", 1, 32)
+    epoch = limiter.epoch  # every attempt of the burst was sent before the first cut
+    for _ in range(4):
+        limiter.record(epoch, httpx.Response(503), 0.1)
+    assert limiter.limit == INITIAL_LIMIT // 2
+
+    limiter.record(limiter.epoch, httpx.Response(503), 0.1)
+    assert limiter.limit == INITIAL_LIMIT // 4
+
+
+def test_limit_does_not_drop_below_floor():
+    limiter = AdaptiveLimiter("api.test", 2, 32)
+    for _ in range(5):
+        limiter.record(limiter.epoch, None, 0.1)
+    assert limiter.limit == 2
+
+
+def test_latency_spike_cuts_limit_once_baseline_is_known():
+    limiter = AdaptiveLimiter("api.test", 1, 32)
+    for _ in range(MIN_LATENCY_SAMPLES - 1):
+        limiter.record(limiter.epoch, OK, 0.05)
+    limiter.record(limiter.epoch, OK, 2.0)  # too few samples for a baseline: not a spike
+    assert limiter.limit == INITIAL_LIMIT
+    # Slower than the baseline but under LATENCY_SPIKE_MIN: jitter.
+    limiter.record(limiter.epoch, OK, 0.4)
+    assert limiter.limit == INITIAL_LIMIT
+    limiter.record(limiter.epoch, OK, 5.0)
+    assert limiter.limit == INITIAL_LIMIT // 2
+
+
+def test_waiters_get_slots_freed_by_an_increase():
+    limiter = AdaptiveLimiter("api.test", 1, 32)
+    limiter.limit = 1
+
+    async def run():
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        limiter.record(limiter.epoch, OK, 0.1)
+        await asyncio.wait_for(waiter, 1)
+
+    asyncio.run(run())
+    assert limiter.limit == 2
@@ -0,0 +1,41 @@
+import duckdb
+import pytest
+
+from database_mcp_server.db import ReadOnlyDatabase
+
+
+@pytest.fixture(params=[False, True], ids=["file", "in_memory"])
+def db(tmp_path, request):
+    path = tmp_path / "icc-eval.duckdb"
+    con = duckdb.connect(str(path))
+    con.execute("CREATE TABLE projects AS SELECT range AS appl_id FROM range(5)")
+    con.close()
+    db = ReadOnlyDatabase(path, in_memory=request.param)
+    yield db
+    db.close()
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT appl_id FROM projects",
+    "WITH p AS (SELECT * FROM projects) SELECT appl_id FROM p",
+    "DESCRIBE projects",
+    "SELECT ');' AS appl_id",
+])
+def test_read_queries_run(db, sql):
+    assert db.execute_query(sql, limit=2)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT 1) AS x; DROP TABLE projects; SELECT * FROM (SELECT 1",
+    "SELECT 1) AS x; CREATE TABLE extra AS SELECT 1; SELECT * FROM (SELECT 1",
+    "DROP TABLE projects",
+])
+def test_writes_are_rejected(db, sql):
+    with pytest.raises(ValueError):
+        db.execute_query(sql)
+    assert db.get_table_names() == ["projects"]
+    assert len(db.execute_query("SELECT * FROM projects")) == 5
+
+
+def test_limit_is_applied(db):
+    assert len(db.execute_query("SELECT * FROM projects", limit=3)) == 3
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from icc_eval_etl.clients.openalex import OpenAlexClient
+from icc_eval_etl.entity_store import EntityStore, store_entries
+from icc_eval_etl.models.openalex import OpenAlexWork
+
+
+def _work(work_id: str, pmid: int) -> dict:
+    return {"id": f"https://openalex.org/{work_id}", "ids": {"pmid": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}"}}
+
+
+# PMID 1 has two works (e.g. a preprint and the published article), PMID 3 has none.
+WORKS = {1: [_work("W1", 1), _work("W1b", 1)], 2: [_work("W2", 2)], 3: []}
+
+
+class _OpenAlex:
+    """OpenAlex /works stand-in serving WORKS; counts the requests it answers."""
+
+    def __init__(self):
+        self.requests = 0
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        pmids = [int(p) for p in request.url.params["filter"].removeprefix("ids.pmid:").split("|")]
+        first_page = request.url.params["cursor"] == "*"
+        results = [w for p in pmids for w in WORKS[p]] if first_page else []
+        return httpx.Response(200, json={"meta": {"next_cursor": "1" if results else None}, "results": results})
+
+
+def _fetch(store: EntityStore, api: _OpenAlex, pmids: list[int]) -> list[str]:
+    async def run():
+        client = OpenAlexClient(transport=httpx.MockTransport(api.handle), store=store, rate_limit=1000)
+        try:
+            return await client.fetch_works(pmids)
+        finally:
+            await client.close()
+
+    return sorted(w.id for w in asyncio.run(run()))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EntityStore(tmp_path / "store.sqlite")
+    yield store
+    store.close()
+
+
+def test_store_keeps_every_work_of_a_pmid(store):
+    api = _OpenAlex()
+    cold = _fetch(store, api, [1, 2, 3])
+    assert cold == ["https://openalex.org/W1", "https://openalex.org/W1b", "https://openalex.org/W2"]
+
+    requests = api.requests
+    assert _fetch(store, api, [1, 2, 3]) == cold
+    assert api.requests == requests
+    assert len(store.get_many("openalex", [1])[1]) == 2
+    assert store.get_many("openalex", [3]) == {3: None}
+
+
+def test_single_work_payloads_are_refetched(store):
+    # Written before OpenAlex payloads were lists: only one of PMID 1's works survived.
+    store.put_many("openalex", {1: _work("W1", 1), 2: [_work("W2", 2)]})
+    api = _OpenAlex()
+
+    works = _fetch(store, api, [1, 2])
+    assert works == ["https://openalex.org/W1", "https://openalex.org/W1b", "https://openalex.org/W2"]
+    assert api.requests == 2  # PMID 1 only: one page of results, then the empty one
+    assert len(store.get_many("openalex", [1])[1]) == 2
+
+
+def test_store_entries_groups_records_per_pmid():
+    works = [OpenAlexWork.model_validate(w) for ws in WORKS.values() for w in ws]
+    pmid_of = lambda w: int(w.ids["pmid"].rsplit("/", 1)[-1])  # noqa: E731
+
+    entries = store_entries([1, 2, 3], works, pmid_of, many=True)
+    assert [len(entries[1]), len(entries[2]), entries[3]] == [2, 1, None]
+    # Without ``many`` the last record for a PMID wins, as for iCite and Europe PMC.
+    assert store_entries([1], works[:2], pmid_of)[1]["id"] == "https://openalex.org/W1b"
+
+
+def test_store_is_used_off_the_event_loop(store, monkeypatch):
+    threads = set()
+    for name in ("get_many", "put_many"):
+        method = getattr(store, name)
+
+        def recording(*args, method=method):
+            threads.add(threading.current_thread())
+            return method(*args)
+
+        monkeypatch.setattr(store, name, recording)
+
+    _fetch(store, _OpenAlex(), [1, 2])
+    assert threads and threading.main_thread() not in threads
@@ -0,0 +1,95 @@
+import json
+
+import duckdb
+import pytest
+
+from benchmarks.synthetic import write_jsonl_outputs
+from database_mcp_server.materialize import SNAPSHOT_TABLE, VIEW_NAMES, apply_changes, materialize
+from icc_eval_etl.pipeline.writers import RECORD_KEYS, ChangeLog
+
+
+def _snapshot(output_dir):
+    """Record a run's changesets for every output file, as run_pipeline does; returns the manifest."""
+    log = ChangeLog.start(output_dir)
+    for filename in RECORD_KEYS:
+        log.diff(output_dir / filename)
+    return log.manifest
+
+
+def _new_key(value):
+    if isinstance(value, int):
+        return value + 10**9
+    # Europe PMC sends numeric ids as strings; the views cast them.
+    return str(int(value) + 10**9) if value.isdigit() else f"{value}-new"
+
+
+def _edit(path, key_fields):
+    """Delete the first record, revise the second and add a copy of the third under a new key."""
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    deleted, revised, copied = records[:3]
+    for field, value in revised.items():
+        if field not in key_fields and isinstance(value, str):
+            revised[field] = value + " (revised)"
+            break
+    added = {**copied, **{k: _new_key(copied[k]) for k in key_fields if copied.get(k) is not None}}
+    path.write_text("".join(json.dumps(r) + "\n" for r in records[1:] + [added]))
+
+
+def _query(db_path, sql):
+    con = duckdb.connect(str(db_path), read_only=True)
+    try:
+        return con.execute(sql).fetchall()
+    finally:
+        con.close()
+
+
+def _rows(db_path, table):
+    return sorted(map(repr, _query(db_path, f"SELECT * FROM {table}")))
+
+
+@pytest.fixture
+def output_dir(tmp_path, corpus, monkeypatch):
+    # The view definitions read output/<file> relative to the working directory.
+    monkeypatch.chdir(tmp_path)
+    output_dir = tmp_path / "output"
+    write_jsonl_outputs(corpus, output_dir)
+    return output_dir
+
+
+def test_applied_changes_match_a_full_rebuild(output_dir, tmp_path):
+    changes_dir = output_dir / "changes"
+    _snapshot(output_dir)
+    db_path = tmp_path / "applied.duckdb"
+    materialize(db_path, changes_dir=changes_dir)
+
+    for filename, key_fields in RECORD_KEYS.items():
+        _edit(output_dir / filename, key_fields)
+    manifest = _snapshot(output_dir)
+    counts = apply_changes(db_path, changes_dir)
+    assert counts and all(c["deleted"] and c["inserted"] for c in counts.values())
+
+    rebuilt = tmp_path / "rebuilt.duckdb"
+    materialize(rebuilt, changes_dir=changes_dir)
+    for table in VIEW_NAMES:
+        assert _rows(db_path, table) == _rows(rebuilt, table), table
+    assert _query(db_path, f"SELECT snapshot_id FROM {SNAPSHOT_TABLE}") == [(manifest["snapshot"],)]
+    # Applying the same changesets again is a no-op.
+    assert apply_changes(db_path, changes_dir) == {}
+
+
+def test_changes_from_another_base_are_refused(output_dir, tmp_path):
+    changes_dir = output_dir / "changes"
+    _snapshot(output_dir)
+    db_path = tmp_path / "stale.duckdb"
+    materialize(db_path, changes_dir=changes_dir)
+    before = {table: _rows(db_path, table) for table in VIEW_NAMES}
+
+    # Two runs later the changesets start from a snapshot the database never saw.
+    _edit(output_dir / "projects.jsonl", RECORD_KEYS["projects.jsonl"])
+    _snapshot(output_dir)
+    _edit(output_dir / "icite.jsonl", RECORD_KEYS["icite.jsonl"])
+    _snapshot(output_dir)
+
+    with pytest.raises(ValueError, match="rebuild it with materialize"):
+        apply_changes(db_path, changes_dir)
+    assert {table: _rows(db_path, table) for table in VIEW_NAMES} == before
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+from starlette.testclient import TestClient
+
+from database_mcp_server import server
+from database_mcp_server.catalog import Catalog
+from database_mcp_server.metrics import METRICS, ServerMetrics
+from database_mcp_server.warmup import Startup
+
+
+def _samples(text: str) -> dict[str, float]:
+    """Metric lines of a Prometheus text exposition, sample name (with labels) -> value."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_instrumented_tool_records_calls_errors_and_latency():
+    metrics = ServerMetrics()
+
+    @metrics.instrument_tool("echo")
+    def echo(value):
+        if value is None:
+            raise ValueError("no value")
+        return value
+
+    assert echo(1) == 1
+    assert echo(2) == 2
+    with pytest.raises(ValueError):
+        echo(None)
+
+    samples = _samples(metrics.render())
+    assert samples['icc_mcp_tool_calls_total{tool="echo"}'] == 3
+    assert samples['icc_mcp_tool_errors_total{tool="echo",kind="exception"}'] == 1
+    assert samples['icc_mcp_tool_latency_seconds_count{tool="echo"}'] == 3
+    assert samples['icc_mcp_tool_latency_seconds_bucket{tool="echo",le="+Inf"}'] == 3
+    assert metrics.first_call_seconds is not None
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = ServerMetrics()
+    for rows in (0, 5, 50, 50000):
+        metrics.record_query("SELECT 1", execute_seconds=0.0, serialize_seconds=0.0, rows=rows, nbytes=10)
+
+    samples = _samples(metrics.render())
+    assert [samples[f'icc_mcp_query_rows_bucket{{le="{le}"}}'] for le in ("0", "1", "10", "100", "10000", "+Inf")] == [
+        1, 1, 2, 3, 3, 4,
+    ]
+    assert samples["icc_mcp_query_rows_sum"] == 50055
+    assert samples["icc_mcp_query_rows_count"] == 4
+
+
+def test_slow_queries_are_counted(caplog):
+    metrics = ServerMetrics()
+    metrics.slow_query_seconds = 0.5
+    metrics.record_query("SELECT 1", execute_seconds=0.1, serialize_seconds=0.1, rows=1, nbytes=10)
+    metrics.record_query("SELECT   2\nFROM t", execute_seconds=0.4, serialize_seconds=0.2, rows=1, nbytes=10)
+
+    assert metrics.slow_queries.value() == 1
+    assert "SELECT 2 FROM t" in caplog.text
+
+
+def test_gauges_skip_missing_and_failing_values():
+    metrics = ServerMetrics()
+    metrics.add_gauge("icc_test_set", "Set.", lambda: 2.5)
+    metrics.add_gauge("icc_test_unset", "Unset.", lambda: None)
+    metrics.add_gauge("icc_test_failing", "Failing.", lambda: 1 / 0)
+
+    samples = _samples(metrics.render())
+    assert samples["icc_test_set"] == 2.5
+    assert "icc_test_unset" not in samples
+    assert "icc_test_failing" not in samples
+
+
+def test_label_values_are_escaped():
+    metrics = ServerMetrics()
+    metrics.tool_calls.inc(tool='a"b\\c\nd')
+    assert 'icc_mcp_tool_calls_total{tool="a\\"b\\\\c\\nd"} 1' in metrics.render()
+
+
+def test_metrics_route_serves_tool_metrics(monkeypatch):
+    catalog = Catalog({"projects": [{"column_name": "appl_id", "column_type": "BIGINT", "row_count": 1}]})
+    monkeypatch.setattr(server, "_catalog", catalog)
+    calls = METRICS.tool_calls.value(tool="list_tables")
+    assert server.list_tables() == '["projects"]'
+
+    app = server.build_server(catalog, Startup(time.perf_counter())).streamable_http_app()
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(response.text)
+    assert samples['icc_mcp_tool_calls_total{tool="list_tables"}'] == calls + 1
+    assert "# TYPE icc_mcp_tool_latency_seconds histogram" in response.text
@@ -0,0 +1,69 @@
+import gzip
+import json
+import os
+import sqlite3
+
+import pytest
+
+from icc_eval_etl.snapshots.openalex import INDEX_VERSION, OpenAlexSnapshot
+
+
+def _write_partition(root, updated_date, works):
+    path = root / "data" / "works" / f"updated_date={updated_date}" / "part_000.gz"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt") as f:
+        for work_id, pmid in works:
+            ids = {"openalex": f"https://openalex.org/{work_id}"}
+            if pmid is not None:
+                ids["pmid"] = f"https://pubmed.ncbi.nlm.nih.gov/{pmid}"
+            f.write(json.dumps({"id": f"https://openalex.org/{work_id}", "ids": ids}) + "\n")
+    return path
+
+
+def _lookup(root, pmids):
+    snapshot = OpenAlexSnapshot(root, workers=1)
+    try:
+        return {pmid: work["id"].rsplit("/", 1)[-1] for pmid, work in snapshot.lookup(pmids).items()}
+    finally:
+        snapshot.close()
+
+
+@pytest.fixture
+def root(tmp_path):
+    _write_partition(tmp_path, "2024-01-01", [("W1old", 1), ("W2", 2), ("W0", None)])
+    _write_partition(tmp_path, "2024-06-01", [("W1new", 1), ("W3", 3)])
+    return tmp_path
+
+
+def test_newest_partition_wins(root):
+    assert _lookup(root, [1, 2, 3, 4]) == {1: "W1new", 2: "W2", 3: "W3"}
+
+
+def test_reindexed_older_partition_does_not_win(root):
+    _lookup(root, [1])
+    older = _write_partition(root, "2024-01-01", [("W1old", 1), ("W2", 2), ("W4", 4)])
+    os.utime(older, (0, 0))
+
+    assert _lookup(root, [1, 2, 4]) == {1: "W1new", 2: "W2", 4: "W4"}
+
+
+def test_removed_partition_falls_back_to_older_record(root):
+    assert _lookup(root, [1, 3]) == {1: "W1new", 3: "W3"}
+    (root / "data" / "works" / "updated_date=2024-06-01" / "part_000.gz").unlink()
+
+    assert _lookup(root, [1, 2, 3]) == {1: "W1old", 2: "W2"}
+
+
+def test_index_from_before_per_partition_keys_is_rebuilt(root):
+    index = root / "data" / "works" / "pmid_index.sqlite"
+    con = sqlite3.connect(index)
+    con.executescript(
+        "CREATE TABLE partitions (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, size INTEGER, mtime REAL);"
+        "CREATE TABLE works (pmid INTEGER PRIMARY KEY, partition INTEGER, line_offset INTEGER) WITHOUT ROWID;"
+    )
+    con.close()
+
+    assert _lookup(root, [1, 2]) == {1: "W1new", 2: "W2"}
+    con = sqlite3.connect(index)
+    assert con.execute("PRAGMA user_version").fetchone()[0] == INDEX_VERSION
+    con.close()
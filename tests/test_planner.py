@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from icc_eval_etl.clients import github
+from icc_eval_etl.models.config import CollectionConfig
+from icc_eval_etl.pipeline.planner import LATENCY, _github_seconds, plan_run
+
+
+def test_paced_github_searches_take_the_client_rate():
+    assert _github_seconds(60, github.RATE_LIMIT, paced=True) == pytest.approx(60 / github.RATE_LIMIT)
+
+
+def test_unpaced_github_searches_burst_until_the_window_runs_out():
+    window = round(60 * github.RATE_LIMIT)
+    assert _github_seconds(0, github.RATE_LIMIT, paced=False) == 0
+    assert _github_seconds(window, github.RATE_LIMIT, paced=False) == pytest.approx(window * LATENCY)
+    assert _github_seconds(2 * window + 1, github.RATE_LIMIT, paced=False) == pytest.approx(120 + LATENCY)
+
+
+def test_plan_estimates_github_at_the_rate_of_the_run_mode(apis, corpus, monkeypatch):
+    monkeypatch.setenv("GITHUB_TOKEN", "token")
+    config = CollectionConfig.model_validate(corpus.collection_config())
+    searches = len(corpus.core_project_nums)
+
+    single, sharded = (
+        asyncio.run(plan_run(config, transport=apis.transport, sharded=sharded)).steps[-1] for sharded in (False, True)
+    )
+    assert single.name == sharded.name == "github"
+    assert single.requests == sharded.requests == searches
+    # Fewer searches than one window: a single run is bound by latency, a sharded one by the pacing.
+    assert single.seconds == pytest.approx(searches * LATENCY)
+    assert sharded.seconds == pytest.approx(searches / github.RATE_LIMIT)
@@ -0,0 +1,159 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+
+from benchmarks.fake_apis import ICITE_HOST, OPENALEX_HOST, FakeAPIs
+from icc_eval_etl.models.config import CollectionConfig
+from icc_eval_etl.pipeline.failure_ledger import FAILED_ITEMS_FILENAME, FailureLedger
+from icc_eval_etl.pipeline.orchestrator import run_pipeline
+from icc_eval_etl.pipeline.repair import run_repair
+
+CITATION_FILES = ["icite.jsonl", "citation_links.jsonl", "citing_icite.jsonl", "citing_openalex.jsonl"]
+OUTPUT_FILES = [*CITATION_FILES, "openalex.jsonl"]
+
+
+class _Interrupted(Exception):
+    pass
+
+
+class _FailingAPIs:
+    """FakeAPIs that answer 400 (not retried) to requests to ``hosts`` naming any PMID in ``fail``.
+
+    With ``interrupt``, those requests raise _Interrupted instead, which no client catches.
+    """
+
+    def __init__(
+        self, apis: FakeAPIs, fail: set[int], hosts: tuple[str, ...] = (ICITE_HOST, OPENALEX_HOST),
+        interrupt: bool = False,
+    ):
+        self.apis = apis
+        self.fail = fail
+        self.hosts = hosts
+        self.interrupt = interrupt
+
+    @property
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        if request.url.host == ICITE_HOST:
+            pmids = params.get("pmids", "").split(",")
+        elif request.url.host == OPENALEX_HOST:
+            pmids = params.get("filter", "").removeprefix("ids.pmid:").split("|")
+        else:
+            pmids = []
+        if request.url.host in self.hosts and any(p.isdigit() and int(p) in self.fail for p in pmids):
+            if self.interrupt:
+                raise _Interrupted(str(request.url))
+            return httpx.Response(400, text="injected failure")
+        return await self.apis.handle(request)
+
+
+def _run(corpus, output_dir: Path, transport: httpx.AsyncBaseTransport) -> None:
+    config = CollectionConfig.model_validate(corpus.collection_config())
+    asyncio.run(run_pipeline(config, output_dir, transport=transport, rate_limit=1000, citation_depth=2))
+
+
+def _repair(output_dir: Path, transport: httpx.AsyncBaseTransport) -> FailureLedger:
+    return asyncio.run(run_repair(output_dir, rate_factor=1000, transport=transport))
+
+
+def _lines(path: Path) -> list[str]:
+    with open(path) as f:
+        return sorted(f)
+
+
+def _keys(ledger: FailureLedger) -> set[tuple[str, int | str]]:
+    return set(ledger.entries)
+
+
+@pytest.fixture
+def clean(corpus, apis, tmp_path) -> Path:
+    output_dir = tmp_path / "clean"
+    _run(corpus, output_dir, apis.transport)
+    return output_dir
+
+
+def test_ledger_round_trip(tmp_path):
+    ledger = FailureLedger()
+    error = httpx.ConnectError("refused")
+    ledger.record("icite", [1, 2], error, file="icite.jsonl")
+    ledger.record("github", ["a/b"], error, file="github_core.jsonl")
+    ledger.record("icite", [2], error, file="icite.jsonl")
+    assert ledger.entries[("icite.jsonl", 2)]["attempts"] == 2
+
+    loaded = FailureLedger.load(ledger.write(tmp_path))
+    assert loaded.entries == ledger.entries
+
+    loaded.resolve("icite.jsonl", [1, 2, 3])
+    assert _keys(loaded) == {("github_core.jsonl", "a/b")}
+    loaded.resolve("github_core.jsonl", ["a/b"])
+    loaded.write(tmp_path)
+    assert (tmp_path / FAILED_ITEMS_FILENAME).read_text() == ""
+    assert not FailureLedger.load(tmp_path / FAILED_ITEMS_FILENAME)
+
+
+def test_partial_repair_keeps_failing_keys(corpus, apis, clean, tmp_path):
+    first, last = corpus.grant_pmids[0], corpus.citing_pmids[-1]
+    output_dir = tmp_path / "out"
+    _run(corpus, output_dir, _FailingAPIs(apis, {first, last}, hosts=(OPENALEX_HOST,)).transport)
+    failed = _keys(FailureLedger.load(output_dir / FAILED_ITEMS_FILENAME))
+    assert {file for file, _ in failed} == {"openalex.jsonl", "citing_openalex.jsonl"}
+
+    # Only the batch naming the last PMID still fails.
+    ledger = _repair(output_dir, _FailingAPIs(apis, {last}, hosts=(OPENALEX_HOST,)).transport)
+    remaining = _keys(ledger)
+    assert remaining and remaining < failed
+    assert _keys(FailureLedger.load(output_dir / FAILED_ITEMS_FILENAME)) == remaining
+    assert all(entry["attempts"] == 2 for entry in ledger.entries.values())
+    assert {file for file, _ in remaining} == {"citing_openalex.jsonl"}
+    assert ("citing_openalex.jsonl", last) in remaining
+
+    ledger = _repair(output_dir, apis.transport)
+    assert not ledger
+    for name in OUTPUT_FILES:
+        assert _lines(output_dir / name) == _lines(clean / name), name
+
+
+def test_repair_merges_into_existing_outputs(corpus, apis, clean, tmp_path):
+    output_dir = tmp_path / "out"
+    fail = {corpus.grant_pmids[0], *corpus.citing_pmids[:5]}
+    _run(corpus, output_dir, _FailingAPIs(apis, fail, hosts=(OPENALEX_HOST,)).transport)
+    before = {name: _lines(output_dir / name) for name in OUTPUT_FILES}
+    assert before["openalex.jsonl"] != _lines(clean / "openalex.jsonl")
+
+    assert not _repair(output_dir, apis.transport)
+    for name in OUTPUT_FILES:
+        after = _lines(output_dir / name)
+        assert set(before[name]) <= set(after), name
+        assert after == _lines(clean / name), name
+
+
+def test_repair_rebuilds_citations_of_recovered_grant_icite(corpus, apis, clean, tmp_path):
+    output_dir = tmp_path / "out"
+    _run(corpus, output_dir, _FailingAPIs(apis, set(corpus.grant_pmids[:3]), hosts=(ICITE_HOST,)).transport)
+    failed = _keys(FailureLedger.load(output_dir / FAILED_ITEMS_FILENAME))
+    assert {file for file, _ in failed} == {"icite.jsonl"}
+    assert _lines(output_dir / "citation_links.jsonl") != _lines(clean / "citation_links.jsonl")
+
+    assert not _repair(output_dir, apis.transport)
+    for name in CITATION_FILES:
+        assert _lines(output_dir / name) == _lines(clean / name), name
+    assert (output_dir / "citation_graph.bin").read_bytes() == (clean / "citation_graph.bin").read_bytes()
+
+
+def test_grant_icite_keys_stay_failed_until_citations_are_rebuilt(corpus, apis, tmp_path):
+    output_dir = tmp_path / "out"
+    grant = set(corpus.grant_pmids[:3])
+    _run(corpus, output_dir, _FailingAPIs(apis, grant, hosts=(ICITE_HOST,)).transport)
+    failed = _keys(FailureLedger.load(output_dir / FAILED_ITEMS_FILENAME))
+
+    # Grant records come back but the crawl from them is interrupted: nothing is resolved.
+    citing = {p for pmid in grant for p in corpus.cited_by(pmid)}
+    assert citing
+    with pytest.raises(_Interrupted):
+        _repair(output_dir, _FailingAPIs(apis, citing, hosts=(ICITE_HOST,), interrupt=True).transport)
+    assert _keys(FailureLedger.load(output_dir / FAILED_ITEMS_FILENAME)) == failed
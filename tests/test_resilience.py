@@ -0,0 +1,155 @@
+import asyncio
+
+import httpx
+import pytest
+from tenacity import wait_none
+
+from icc_eval_etl.clients.github import MAX_ATTEMPTS, GitHubClient
+from icc_eval_etl.clients.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    MAX_FAILED_PROBES,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    Resilience,
+    RetryBudget,
+)
+from icc_eval_etl.pipeline.telemetry import RunTelemetry
+
+OK = httpx.Response(200)
+FAILED = httpx.Response(503)
+
+
+def _breaker(budget: RetryBudget | None = None, telemetry: RunTelemetry | None = None) -> CircuitBreaker:
+    return CircuitBreaker("api.test", budget, telemetry, failure_threshold=2, cooldown=0.01)
+
+
+def test_breaker_opens_after_consecutive_host_failures():
+    breaker = _breaker()
+    breaker.record(FAILED)
+    breaker.record(OK)
+    breaker.record(FAILED)
+    # 4xx and 429 answers show the host is up, so they also end a run of failures.
+    breaker.record(httpx.Response(429))
+    breaker.record(FAILED)
+    assert breaker.state == CLOSED
+    breaker.record(None)
+    assert breaker.state == OPEN
+
+
+def test_breaker_probes_after_cooldown_and_closes_on_success():
+    telemetry = RunTelemetry()
+    breaker = _breaker(telemetry=telemetry)
+
+    async def run():
+        breaker.record(FAILED)
+        breaker.record(FAILED)
+        await breaker.acquire()
+        assert breaker.state == HALF_OPEN
+        # Everyone else waits for the probe's outcome.
+        waiter = asyncio.create_task(breaker.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        breaker.record(OK)
+        await waiter
+
+    asyncio.run(run())
+    assert breaker.state == CLOSED
+    states = [(e["previous"], e["state"]) for e in telemetry.events if e["name"] == "circuit_breaker"]
+    assert states == [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)]
+
+
+def test_failed_probe_reopens_with_longer_cooldown():
+    breaker = _breaker()
+
+    async def run():
+        breaker.record(FAILED)
+        breaker.record(FAILED)
+        await breaker.acquire()
+        breaker.record(FAILED)
+        assert breaker.state == OPEN
+        assert breaker._cooldown == pytest.approx(0.02)
+        await breaker.acquire()
+        breaker.record(OK)
+
+    asyncio.run(run())
+    assert breaker.state == CLOSED
+    assert breaker._cooldown == pytest.approx(0.01)
+
+
+def test_breaker_fails_fast_after_repeated_failed_probes():
+    breaker = _breaker()
+
+    async def run():
+        breaker.record(FAILED)
+        breaker.record(FAILED)
+        for _ in range(MAX_FAILED_PROBES):
+            await breaker.acquire()
+            breaker.record(FAILED)
+        with pytest.raises(CircuitOpenError):
+            await breaker.acquire()
+
+    asyncio.run(run())
+
+
+def test_breaker_fails_fast_once_the_budget_is_spent():
+    budget = RetryBudget(ratio=0, min_retries=1)
+    breaker = _breaker(budget)
+
+    async def run():
+        breaker.record(FAILED)
+        breaker.record(FAILED)
+        assert budget.try_spend("client")
+        with pytest.raises(CircuitOpenError):
+            await breaker.acquire()
+
+    asyncio.run(run())
+
+
+def test_retry_budget_scales_with_requests_and_reports_exhaustion_once():
+    telemetry = RunTelemetry()
+    budget = RetryBudget(ratio=0.5, min_retries=2, telemetry=telemetry)
+    assert budget.try_spend("a") and budget.try_spend("a")
+    assert not budget.try_spend("a")
+
+    for _ in range(6):
+        budget.record_request()
+    assert budget.try_spend("b")
+    assert not budget.try_spend("b") and not budget.try_spend("c")
+    assert budget.retries == 3
+    events = [e for e in telemetry.events if e["name"] == "retry_budget_exhausted"]
+    assert len(events) == 1 and events[0]["client"] == "a"
+
+
+def _search_failing_github(monkeypatch, resilience: Resilience) -> int:
+    """Search a GitHub that always answers 503; returns the number of requests made."""
+    monkeypatch.setattr(GitHubClient._request.retry, "wait", wait_none())
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(503)
+
+    async def run():
+        client = GitHubClient(transport=httpx.MockTransport(handle), rate_limit=1000, resilience=resilience)
+        try:
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.search_repos_by_topic("nih")
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+    return len(requests)
+
+
+def test_github_last_attempt_does_not_spend_retry_budget(monkeypatch):
+    resilience = Resilience(budget=RetryBudget(min_retries=100))
+    assert _search_failing_github(monkeypatch, resilience) == MAX_ATTEMPTS
+    assert resilience.budget.retries == MAX_ATTEMPTS - 1
+
+
+def test_github_stops_retrying_when_the_budget_runs_out(monkeypatch):
+    resilience = Resilience(budget=RetryBudget(ratio=0, min_retries=2))
+    assert _search_failing_github(monkeypatch, resilience) == 3
+    assert resilience.budget.retries == 2
@@ -0,0 +1,57 @@
+import duckdb
+import pytest
+
+from database_mcp_server.db import ReadOnlyDatabase
+from database_mcp_server.search import FTS_INDEXES, search
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A database with the searchable tables but no FTS indexes (fts could not be installed at materialize)."""
+    path = tmp_path / "icc-eval.duckdb"
+    con = duckdb.connect(str(path))
+    con.execute(
+        "CREATE TABLE publications AS SELECT * FROM (VALUES "
+        "(1, 'Cancer genomics atlas', 'tumour sequencing', 2020, 'Nature', '10.1/a'), "
+        "(2, 'Mouse models', 'cancer cancer', 2021, 'Cell', '10.1/b'), "
+        "(3, 'Unrelated', 'nothing here', 2022, 'Science', '10.1/c')"
+        ") t(pmid, title, abstract_text, pub_year, journal_title, doi)"
+    )
+    con.execute(
+        "CREATE TABLE projects AS SELECT * FROM (VALUES "
+        "(10, 'U54OD000000', 'Cancer data commons', 2023, 'Smith, A', 'sharing cancer data')"
+        ") t(appl_id, core_project_num, project_title, fiscal_year, contact_pi_name, abstract_text)"
+    )
+    con.close()
+    return path
+
+
+@pytest.mark.parametrize("in_memory", [False, True])
+def test_search_falls_back_to_ilike_without_index(db_path, in_memory):
+    db = ReadOnlyDatabase(db_path, in_memory=in_memory)
+    # As in the Docker image: the extension loads, but the database has no index.
+    db.has_fts = True
+    assert not db.has_fts_index(FTS_INDEXES["publications"].schema)
+
+    hits = search(db, FTS_INDEXES["publications"], "cancer genomics", 10)
+    assert [h["pmid"] for h in hits] == [1, 2]
+    assert hits[0]["score"] == 2
+
+    hits = search(db.cursor(), FTS_INDEXES["projects"], "cancer", 10)
+    assert [h["appl_id"] for h in hits] == [10]
+
+
+def test_search_uses_bm25_when_index_exists(db_path):
+    con = duckdb.connect(str(db_path))
+    try:
+        con.execute("LOAD fts")
+    except duckdb.Error:
+        pytest.skip("fts extension not available")
+    con.execute("PRAGMA create_fts_index('publications', 'pmid', 'title', 'abstract_text')")
+    con.close()
+
+    db = ReadOnlyDatabase(db_path)
+    assert db.has_fts_index(FTS_INDEXES["publications"].schema)
+    assert not db.has_fts_index(FTS_INDEXES["projects"].schema)
+    assert {h["pmid"] for h in search(db, FTS_INDEXES["publications"], "cancer", 10)} == {1, 2}
+    assert [h["appl_id"] for h in search(db, FTS_INDEXES["projects"], "cancer", 10)] == [10]
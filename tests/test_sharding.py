@@ -0,0 +1,33 @@
+import pytest
+
+from icc_eval_etl.models.config import CollectionConfig
+from icc_eval_etl.pipeline.sharding import plan_shards
+
+
+def _config(*ids: str) -> CollectionConfig:
+    return CollectionConfig(core_project_identifiers=dict.fromkeys(ids))
+
+
+def _ids(shards: list[CollectionConfig]) -> list[list[str]]:
+    return [list(c.core_project_identifiers) for c in shards]
+
+
+@pytest.mark.parametrize("shards", [1, 3])
+def test_no_core_projects_gives_one_empty_shard(shards):
+    assert _ids(plan_shards([_config()], shards)) == [[]]
+    assert _ids(plan_shards([], shards)) == [[]]
+
+
+def test_one_core_project():
+    assert _ids(plan_shards([_config("u54od000000")], 1)) == [["U54OD000000"]]
+
+
+def test_contiguous_shards_union_collections():
+    configs = [_config("A1", "B2", "C3"), _config("c3", "D4", "E5")]
+    assert _ids(plan_shards(configs, 1)) == [["A1", "B2", "C3", "D4", "E5"]]
+    assert _ids(plan_shards(configs, 2)) == [["A1", "B2", "C3"], ["D4", "E5"]]
+    assert _ids(plan_shards(configs, 5)) == [["A1"], ["B2"], ["C3"], ["D4"], ["E5"]]
+
+
+def test_more_shards_than_core_projects():
+    assert _ids(plan_shards([_config("A1", "B2")], 8)) == [["A1"], ["B2"]]
@@ -0,0 +1,40 @@
+import time
+
+import duckdb
+import pytest
+
+from database_mcp_server.db import ReadOnlyDatabase
+from database_mcp_server.warmup import Startup, warm_up
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "icc-eval.duckdb"
+    con = duckdb.connect(str(path))
+    con.execute("CREATE TABLE projects AS SELECT 1 AS appl_id")
+    con.close()
+    db = ReadOnlyDatabase(path)
+    yield db
+    db.close()
+
+
+def test_failing_queries_are_counted_and_do_not_hold_back_readiness(db):
+    startup = Startup(time.perf_counter())
+    warm_up(db, ["SELECT * FROM projects", "SELECT * FROM missing"], startup)
+
+    assert startup.ready.is_set()
+    assert startup.warmup_errors >= 1
+    assert startup.warmup_seconds is not None
+
+
+def test_ready_even_when_warm_up_cannot_start(db, monkeypatch, caplog):
+    def broken_cursor():
+        raise duckdb.ConnectionException("connection closed")
+
+    monkeypatch.setattr(db, "cursor", broken_cursor)
+    startup = Startup(time.perf_counter())
+    warm_up(db, ["SELECT * FROM projects"], startup)
+
+    assert startup.ready.is_set() and startup.probe()
+    assert startup.warmup_errors == 1
+    assert "Warm-up aborted" in caplog.text